@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models import Q
+from blog.utils.authentication import refresh_token_for_user
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from blog.media.fields import ImageVariantsField
+from blog.media.models import ImageJob
 
 User = get_user_model()
 
@@ -22,10 +25,27 @@ class SignUpSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         return super().validate(attrs)
+
+    def validate_email(self, value):
+        # Sign-in matches emails case-insensitively, so must sign-up. The
+        # user_email_lower_unique constraint catches concurrent sign-ups
+        email_taken = User.objects.alias(email_lower=Lower("email")).filter(
+            email_lower=value.lower()
+        ).exists()
+        if email_taken:
+            raise serializers.ValidationError("user with this email already exists.")
+        return value
     
 
     def create(self, validated_data):
-        user = User.objects.create(**validated_data)
+        try:
+            with transaction.atomic():
+                user = User.objects.create(**validated_data)
+        except IntegrityError:
+            # Lost a race with another sign-up of the same email or username
+            raise serializers.ValidationError(
+                "A user with this email or username already exists."
+            )
         user.set_password(validated_data["password"])
         user.save()
 
@@ -46,8 +66,9 @@ class SignInSerializer(serializers.Serializer):
         """
         
         
-        user = User.objects.filter(Q(email=attrs["email_or_username"]) | Q(username=attrs["email_or_username"])).first()
+        user = User.objects.get_by_login(attrs["email_or_username"])
         if user:
+            # NOTE: re-hashes the password when PASSWORD_HASHERS or its cost changed
             if user.check_password(attrs["password"]):
                 return user
             else: 
@@ -63,7 +84,7 @@ class SignInSerializer(serializers.Serializer):
         
 
     def to_representation(self, instance):
-        refresh = RefreshToken.for_user(instance)
+        refresh = refresh_token_for_user(instance)
         return {
                 "refresh_token": str(refresh),
                 "access_token": str(refresh.access_token),
@@ -85,38 +106,37 @@ class ChangePasswordSerializer(serializers.Serializer):
         This is for validating the values the user provides in order to change their password
         """
         user = self.context["request"].user
-     
 
         if attrs["new_password"] != attrs["confirm_password"]:
             raise serializers.ValidationError({
                 "message": "New password not same as confirm password"
             })
 
-        if user.check_password(attrs["new_password"]):
+        # The only hash verification of the request: once the old password
+        # is known to be right, "same as old" is a plain comparison
+        if not user.check_password(attrs["old_password"]):
+            raise serializers.ValidationError({
+                "message" : "Invalid old password"
+            })
+
+        if attrs["new_password"] == attrs["old_password"]:
             raise serializers.ValidationError({
                 "messsage": "New pasword can't be same old password"
                 }
                 )
 
-        if user.check_password(attrs["old_password"]) is False:
-            raise serializers.ValidationError({
-                "message" : "Invalid old password"
-            })
-
-        elif (attrs["old_password"] != attrs["new_password"]) and (
-            attrs["new_password"] == attrs["confirm_password"]
-        ):
-            return attrs
+        return attrs
     
     def save(self, **kwargs):
         user = self.context['request'].user
         user.set_password(self.validated_data['confirm_password'])
-        user.save()
+        user.save(update_fields=['password'])
         return user 
 
     
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(required=False)
+    image_variants = ImageVariantsField()
     
     class Meta:
         model = User
@@ -125,6 +145,7 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name',
             'username',
             'image',
+            'image_variants',
         ]
 
     def validate_username(self, value):
@@ -136,3 +157,13 @@ class UserSerializer(serializers.ModelSerializer):
             })
         
         return value
+
+    def update(self, instance, validated_data):
+        if validated_data.get("image"):
+            # Variants of the previous photo must not be served for the new one
+            instance.image_variants = {}
+        instance = super().update(instance, validated_data)
+
+        if validated_data.get("image"):
+            ImageJob.objects.enqueue([instance], "image")
+        return instance
@@ -4,6 +4,7 @@ from blog.accounts.api.v1.views import (
     SignInAPIView,
     ChangePasswordAPIView,
     RetrieveUpdateProfileAPIView,
+    FollowAPIView,
 )
 
 app_name = 'accounts'
@@ -12,5 +13,6 @@ urlpatterns = [
     path('sign-up/', SignUpAPIView.as_view(), name='sign_up'),
     path('sign-in/', SignInAPIView.as_view(), name='sign_in'),
     path('change-password/', ChangePasswordAPIView.as_view(), name='change_password'),
-    path('retrieve-update-profile/', RetrieveUpdateProfileAPIView.as_view(), name='retrieve_update_profile')
+    path('retrieve-update-profile/', RetrieveUpdateProfileAPIView.as_view(), name='retrieve_update_profile'),
+    path('follow/<str:username>/', FollowAPIView.as_view(), name='follow'),
 ]
\ No newline at end of file
@@ -1,4 +1,9 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from blog.accounts.models import Follow
 from blog.accounts.api.v1.serializers import (
     SignUpSerializer,
     SignInSerializer,
@@ -6,11 +11,17 @@ from blog.accounts.api.v1.serializers import (
     UserSerializer,
 )
 from rest_framework.response import Response
+from blog.posts import timeline
+from blog.utils.throttling import AccountTokenBucketThrottle, IPTokenBucketThrottle
+
+User = get_user_model()
 
 
 class SignUpAPIView(generics.CreateAPIView):
     serializer_class = SignUpSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (IPTokenBucketThrottle,)
+    throttle_scope = "sign_up"
     http_method_names = ("post", )
 
     def post(self, request, *args, **kwargs):
@@ -19,6 +30,9 @@ class SignUpAPIView(generics.CreateAPIView):
 class SignInAPIView(generics.GenericAPIView):
     serializer_class = SignInSerializer
     permission_classes = (permissions.AllowAny,)
+    # One bucket per client IP and one per account tried, from any IP
+    throttle_classes = (IPTokenBucketThrottle, AccountTokenBucketThrottle)
+    throttle_scope = "sign_in"
     http_method_names = ("post", )
 
   
@@ -52,7 +66,8 @@ class RetrieveUpdateProfileAPIView(generics.RetrieveUpdateAPIView,):
     serializer_class = UserSerializer
     
     def get_object(self):
-        return self.request.user
+        # request.user only carries the profile as signed into the token
+        return User.objects.get(pk=self.request.user.pk)
 
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -60,3 +75,36 @@ class RetrieveUpdateProfileAPIView(generics.RetrieveUpdateAPIView,):
     def put(self, request, *args, **kwargs):
         return super().put(request, *args, **kwargs)
 
+
+class FollowAPIView(generics.GenericAPIView):
+    """
+        POST follows the user in the url, DELETE unfollows them
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    http_method_names = ("post", "delete")
+
+    def get_object(self):
+        return get_object_or_404(User, username=self.kwargs["username"])
+
+    def post(self, request, *args, **kwargs):
+        following = self.get_object()
+        if following == request.user:
+            raise ValidationError({"message": "You can't follow yourself"})
+
+        with transaction.atomic():
+            created = Follow.objects.follow(request.user, following)
+            if created:
+                timeline.on_follow(request.user, following)
+
+        return Response(
+            {"message": f"You are following {following.username}"},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def delete(self, request, *args, **kwargs):
+        following = self.get_object()
+        with transaction.atomic():
+            if Follow.objects.unfollow(request.user, following):
+                timeline.on_unfollow(request.user, following)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
@@ -0,0 +1,20 @@
+import factory
+from django.contrib.auth import get_user_model
+from factory.django import DjangoModelFactory
+
+User = get_user_model()
+
+# Every user made by UserFactory signs in with this password
+PASSWORD = "factory-password"
+
+
+class UserFactory(DjangoModelFactory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: f"user_{n}")
+    # CustomUser.email is at most 20 characters
+    email = factory.Sequence(lambda n: f"u{n}@example.io")
+    first_name = factory.Faker("first_name")
+    last_name = factory.Faker("last_name")
+    password = factory.django.Password(PASSWORD)
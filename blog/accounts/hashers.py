@@ -0,0 +1,40 @@
+"""
+Password hashers whose cost comes from settings (PASSWORD_HASHER_COSTS),
+so every environment can tune it without a code change.
+
+They keep the algorithm names of the Django hashers they extend, so stored
+hashes stay valid. When the preferred hasher or its cost changes, Django's
+check_password() re-hashes the password on the next successful sign-in.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def get_cost(algorithm: str, name: str, default: int) -> int:
+    return settings.PASSWORD_HASHER_COSTS.get(algorithm, {}).get(name, default)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return get_cost(self.algorithm, "iterations", hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return get_cost(self.algorithm, "work_factor", hashers.ScryptPasswordHasher.work_factor)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return get_cost(self.algorithm, "time_cost", hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return get_cost(self.algorithm, "memory_cost", hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return get_cost(self.algorithm, "parallelism", hashers.Argon2PasswordHasher.parallelism)
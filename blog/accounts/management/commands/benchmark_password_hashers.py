@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hashers, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from blog.utils.throttling import unthrottled_buckets
+
+User = get_user_model()
+
+PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time one password verification with every configured hasher at its "
+        "PASSWORD_HASHER_COSTS, then the full sign-in endpoint with the "
+        "preferred one, and report sign-ins per second per core."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Hash verification"))
+        for hasher in get_hashers():
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as exc:
+                # e.g. argon2-cffi is not installed
+                self.stdout.write(f"  {hasher.algorithm}: unavailable ({exc})")
+                continue
+
+            latency = self.measure(lambda: hasher.verify(PASSWORD, encoded), repeat)
+            self.stdout.write(
+                f"  {hasher.algorithm:14} {self.format_cost(hasher):40} "
+                f"{latency:8.2f} ms  {1000 / latency:8.1f} verifications/s/core"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSign-in endpoint"))
+        latency = self.measure_sign_in(repeat)
+        self.stdout.write(
+            f"  {settings.PASSWORD_HASHER:14} {latency:8.2f} ms  "
+            f"{1000 / latency:8.1f} sign-ins/s/core"
+        )
+
+    def measure(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def measure_sign_in(self, repeat):
+        client = Client()
+        url = reverse("accounts:sign_in")
+        data = {"email_or_username": "benchmark_sign_in", "password": PASSWORD}
+
+        def sign_in():
+            response = client.post(url, data)
+            if response.status_code != 200:
+                raise CommandError(f"Sign-in failed: HTTP {response.status_code}")
+
+        # Every sign-in is for the same account from the same IP, which the
+        # sign_in throttle would cut off after its burst
+        overrides = {"ALLOWED_HOSTS": ["testserver"], "THROTTLE_BUCKETS": unthrottled_buckets()}
+        with override_settings(**overrides), transaction.atomic():
+            User.objects.create(
+                username="benchmark_sign_in",
+                email="sign_in@example.com",
+                first_name="Benchmark",
+                password=make_password(PASSWORD),
+            )
+            latency = self.measure(sign_in, repeat)
+            transaction.set_rollback(True)
+        return latency
+
+    def format_cost(self, hasher):
+        costs = settings.PASSWORD_HASHER_COSTS.get(hasher.algorithm, {})
+        return ", ".join(f"{name}={getattr(hasher, name)}" for name in costs)
@@ -0,0 +1,102 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed up to --users throwaway users and report the median latency of "
+        "the sign-in credential lookup as the table grows, next to the old "
+        "email OR username query. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000)
+        parser.add_argument("--checkpoints", type=int, default=4)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        total, checkpoints = options["users"], options["checkpoints"]
+        # Logarithmic steps, e.g. 1,000 / 10,000 / 100,000 / 1,000,000
+        sizes = sorted({max(1, total // 10 ** power) for power in range(checkpoints)})
+
+        with transaction.atomic():
+            seeded = 0
+            for size in sizes:
+                self.seed(seeded, size)
+                seeded = size
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+
+                identifiers = self.sample_identifiers(rng, seeded, options["repeat"])
+                legacy, legacy_found = self.measure(self.legacy_lookup, identifiers)
+                current, current_found = self.measure(User.objects.get_by_login, identifiers)
+                self.stdout.write(
+                    f"{seeded:>10,} users  "
+                    f"email OR username: {legacy:7.3f} ms ({legacy_found:.0%} found)  "
+                    f"get_by_login: {current:7.3f} ms ({current_found:.0%} found)"
+                )
+
+            self.stdout.write(self.style.MIGRATE_HEADING("\nQuery plans"))
+            for label, queryset in self.get_plan_querysets(identifiers[0]).items():
+                plan = queryset.explain().replace("\n", "\n    ")
+                self.stdout.write(f"  {label}:\n    {plan}")
+
+            transaction.set_rollback(True)
+
+    def seed(self, start, stop):
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f"lookup_{i}",
+                    # CustomUser.email is at most 20 characters
+                    email=f"u{i}@x.io",
+                    first_name="Lookup",
+                    password="!",
+                )
+                for i in range(start, stop)
+            ),
+            batch_size=5000,
+        )
+
+    def sample_identifiers(self, rng, seeded, repeat):
+        identifiers = []
+        for _ in range(repeat):
+            i = rng.randrange(seeded)
+            # Mixed case on purpose: sign-in must not depend on it
+            identifiers.append(rng.choice([f"U{i}@X.io", f"LOOKUP_{i}"]))
+        return identifiers
+
+    def legacy_lookup(self, identifier):
+        return User.objects.filter(Q(email=identifier) | Q(username=identifier)).first()
+
+    def measure(self, lookup, identifiers):
+        timings, found = [], 0
+        for identifier in identifiers:
+            start = time.perf_counter()
+            found += lookup(identifier) is not None
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), found / len(identifiers)
+
+    def get_plan_querysets(self, identifier):
+        return {
+            "email OR username": User.objects.filter(
+                Q(email=identifier) | Q(username=identifier)
+            ),
+            "get_by_login (email)": User.objects.alias(
+                email_lower=Lower("email")
+            ).filter(email_lower=identifier.lower()),
+            "get_by_login (username)": User.objects.alias(
+                username_lower=Lower("username")
+            ).filter(username_lower=identifier.lower()),
+        }
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:19
+
+import blog.accounts.models
+import blog.media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.media.storage.get_content_addressed_storage, upload_to=blog.accounts.models.user_images_upload_location),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:36
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_login_lookup_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_email_lower_unique'),
+        ),
+        migrations.RemoveIndex(
+            model_name='customuser',
+            name='user_email_lower_idx',
+        ),
+    ]
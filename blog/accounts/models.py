@@ -1,6 +1,13 @@
-from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.contrib.auth.models import AbstractUser, UserManager
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from blog.media.storage import get_content_addressed_storage
 from blog.utils.base_class import BaseModel
+from blog.utils.constants import USER_CACHE_TIMEOUT
+from blog.utils.metrics import record_cache_lookup
 # Create your models here.
 
 
@@ -8,19 +15,173 @@ def user_images_upload_location(instance, filename: str) -> str:
     """Get Location for user profile photo upload."""
     return f"accounts/images/{filename}"
 
+class CustomUserManager(UserManager):
+    def get_by_login(self, identifier: str):
+        """
+        The user an email or username signs in, ignoring case, or None.
+
+        Both are matched on LOWER(column) so each lookup is a single seek on
+        its functional index; an OR across the two columns would not use them.
+        Usernames may contain "@" too, so an identifier that looks like an
+        email falls back to the username index when no email matches.
+        """
+        identifier = identifier.strip()
+        if "@" in identifier:
+            user = self.alias(email_lower=Lower("email")).filter(
+                email_lower=identifier.lower()
+            ).first()
+            if user is not None:
+                return user
+
+        users = list(
+            self.alias(username_lower=Lower("username")).filter(
+                username_lower=identifier.lower()
+            )
+        )
+        if len(users) == 1:
+            return users[0]
+        # Usernames are unique case-sensitively, "Bob" and "bob" can both exist
+        return next((user for user in users if user.username == identifier), None)
+
+
 class CustomUser(AbstractUser, BaseModel):
     """
         # NOTE: username, last_name, password inherited forom AbstractUser
     """
     email = models.EmailField(max_length=20, unique=True)
     first_name = models.CharField(max_length=25, null=False, blank=False)
-    image = models.ImageField(upload_to=user_images_upload_location, blank=True)
+    image = models.ImageField(
+        upload_to=user_images_upload_location,
+        storage=get_content_addressed_storage,
+        blank=True,
+    )
+    # NOTE: filled by the image job workers, see blog/media/processing.py
+    image_variants = models.JSONField(default=dict, blank=True)
+    # NOTE: denormalized from Follow, see FollowQuerySet
+    followers_count = models.IntegerField(default=0)
 
 
     USERNAME_FIELD = "username"
 
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Sign-in matches emails ignoring case, so they must be unique
+            # that way; the constraint's index serves get_by_login too
+            models.UniqueConstraint(Lower("email"), name="user_email_lower_unique"),
+        ]
+        indexes = [
+            # Case-insensitive sign-in, see CustomUserManager.get_by_login
+            models.Index(Lower("username"), name="user_username_lower_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.username}"
 
 
+class ClaimsUser(CustomUser):
+    """
+    A CustomUser materialized from the claims of a signed access token, see
+    blog.utils.authentication.StatelessJWTAuthentication. Fields missing
+    from the claims are deferred and, on first access, loaded all at once
+    from a short-lived cache shared by every request of the user.
+    """
+
+    class Meta:
+        proxy = True
+
+    @staticmethod
+    def cache_key(pk) -> str:
+        return f"user:{pk}"
+
+    @classmethod
+    def get_cached_values(cls, pk) -> dict:
+        """
+        Every concrete field but the password hash, which stays out of the
+        cache: only its md5 is kept, under "password_md5", to compare with
+        the revoke claim of the tokens (SIMPLE_JWT's CHECK_REVOKE_TOKEN).
+        """
+        values = cache.get(cls.cache_key(pk))
+        record_cache_lookup(hit=values is not None)
+        if values is None:
+            attnames = [field.attname for field in cls._meta.concrete_fields]
+            values = cls.objects.filter(pk=pk).values(*attnames).first()
+            if values is None:
+                raise cls.DoesNotExist
+            values["password_md5"] = get_md5_hash_password(values.pop("password"))
+            cache.set(cls.cache_key(pk), values, timeout=USER_CACHE_TIMEOUT)
+        return values
+
+    def save(self, *args, **kwargs):
+        # The claims can be older than the row, never write them back unasked
+        if kwargs.get("update_fields") is None:
+            raise ValueError("ClaimsUser.save() requires update_fields")
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, using=None, fields=None):
+        deferred = self.get_deferred_fields()
+        if fields is None or "password" in fields or not deferred.issuperset(fields):
+            return super().refresh_from_db(using=using, fields=fields)
+
+        for attname, value in self.get_cached_values(self.pk).items():
+            if attname in deferred:
+                setattr(self, attname, value)
+
+
+class FollowQuerySet(models.QuerySet):
+    def follow(self, follower, following) -> bool:
+        """
+        Make ``follower`` follow ``following`` and keep its followers_count
+        in step. Returns False when the relation already existed.
+        """
+        with transaction.atomic():
+            _, created = self.get_or_create(follower=follower, following=following)
+            if created:
+                CustomUser.objects.filter(pk=following.pk).update(
+                    followers_count=F("followers_count") + 1
+                )
+        following.refresh_from_db(fields=["followers_count"])
+        return created
+
+    def unfollow(self, follower, following) -> bool:
+        """Undo follow(). Returns False when there was nothing to undo."""
+        with transaction.atomic():
+            deleted, _ = self.filter(follower=follower, following=following).delete()
+            if deleted:
+                CustomUser.objects.filter(pk=following.pk).update(
+                    followers_count=F("followers_count") - 1
+                )
+        following.refresh_from_db(fields=["followers_count"])
+        return bool(deleted)
+
+
+class Follow(BaseModel):
+    follower = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="following_relations"
+    )
+    following = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="follower_relations"
+    )
+
+    objects = FollowQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["follower", "following"], name="unique_follow"
+            ),
+            models.CheckConstraint(
+                check=~Q(follower=F("following")), name="follow_not_self"
+            ),
+        ]
+        indexes = [
+            # Fan-out reads every follower of an author
+            models.Index(fields=["following", "follower"], name="follow_following_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.follower} -> {self.following}"
+
+
 
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog.accounts.api.v1.serializers import UserSerializer
+from blog.accounts.models import ClaimsUser
+
+from blog.utils.cache import bump_versions
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=ClaimsUser)
+def invalidate_embedded_profiles(sender, instance, created, update_fields=None, **kwargs):
+    # Cached feeds and comment lists embed author profiles. Saves of other
+    # fields (last_login, a rehashed password) leave them as they are.
+    if created:
+        return
+    if update_fields is None or not update_fields.isdisjoint(UserSerializer.Meta.fields):
+        bump_versions("profiles")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=ClaimsUser)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=ClaimsUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    cache.delete(ClaimsUser.cache_key(instance.pk))
+
@@ -0,0 +1,73 @@
+import pytest
+from django.urls import reverse
+from rest_framework_simplejwt.settings import api_settings
+
+from blog.accounts.factories import UserFactory
+from blog.accounts.models import CustomUser
+
+NEW_POST = {
+    "title": "New post", "content": "content", "category": "travel",
+    "post_state": "published",
+}
+
+
+def create_post(client):
+    return client.post(reverse("posts:create_post"), NEW_POST, format="json")
+
+
+def failure_code(response):
+    # simplejwt puts its own code next to the detail, as an error on "code"
+    assert response.status_code == 401
+    errors = {error["attr"]: error["detail"] for error in response.json()["errors"]}
+    return errors["code"]
+
+
+@pytest.mark.django_db
+def test_safe_requests_trust_the_claims(client_for):
+    user = UserFactory()
+    client = client_for(user)
+    user.is_active = False
+    user.save()
+
+    assert client.get(reverse("posts:user_posts")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_inactive_user_cannot_write(client_for):
+    user = UserFactory()
+    client = client_for(user)
+    user.is_active = False
+    user.save()
+
+    response = create_post(client)
+
+    assert failure_code(response) == "user_inactive"
+
+
+@pytest.mark.django_db
+def test_deleted_user_cannot_write(client_for):
+    user = UserFactory()
+    client = client_for(user)
+    # Warm the user cache, the delete has to clear it
+    assert create_post(client).status_code == 201
+    CustomUser.objects.get(pk=user.pk).delete()
+
+    response = create_post(client)
+
+    assert failure_code(response) == "user_not_found"
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_older_tokens(monkeypatch, client_for):
+    # Overriding SIMPLE_JWT would not reach the api_settings imported already
+    monkeypatch.setattr(api_settings, "CHECK_REVOKE_TOKEN", True)
+    user = UserFactory()
+    client = client_for(user)
+    assert create_post(client).status_code == 201
+
+    user.set_password("a-new-password")
+    user.save()
+
+    response = create_post(client)
+    assert failure_code(response) == "password_changed"
+    assert create_post(client_for(user)).status_code == 201
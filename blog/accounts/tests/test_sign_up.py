@@ -0,0 +1,42 @@
+import pytest
+from django.db import IntegrityError
+from django.urls import reverse
+
+from blog.accounts.api.v1.serializers import SignUpSerializer
+from blog.accounts.factories import UserFactory
+from blog.accounts.models import CustomUser
+
+
+@pytest.mark.django_db
+def test_emails_are_unique_ignoring_case():
+    UserFactory(email="Taken@x.io")
+
+    with pytest.raises(IntegrityError):
+        UserFactory(email="taken@X.IO")
+
+
+@pytest.mark.django_db
+def test_sign_up_rejects_an_email_taken_in_another_case(api_client):
+    UserFactory(email="Taken@x.io")
+
+    response = api_client.post(reverse("accounts:sign_up"), {
+        "first_name": "New", "last_name": "User", "username": "new_user",
+        "email": "taken@X.IO", "password": "long-enough-password",
+    }, format="json")
+
+    assert response.status_code == 400
+    assert CustomUser.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_sign_up_losing_a_race_is_a_400(api_client, monkeypatch):
+    UserFactory(email="Taken@x.io")
+    # The other sign-up committed after this one's validation ran
+    monkeypatch.setattr(SignUpSerializer, "validate_email", lambda self, value: value)
+
+    response = api_client.post(reverse("accounts:sign_up"), {
+        "first_name": "New", "last_name": "User", "username": "new_user",
+        "email": "taken@X.IO", "password": "long-enough-password",
+    }, format="json")
+
+    assert response.status_code == 400
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MediaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'blog.media'
+
+    def ready(self):
+        from blog.media import signals  # noqa: F401
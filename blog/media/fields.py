@@ -0,0 +1,17 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Render a ``{variant name: storage name}`` dict as absolute URLs.
+    It stays empty until the image job for the upload has run.
+    """
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        variants = {}
+        for name, path in value.items():
+            url = default_storage.url(path)
+            variants[name] = request.build_absolute_uri(url) if request else url
+        return variants
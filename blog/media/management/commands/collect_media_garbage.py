@@ -0,0 +1,117 @@
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.media.models import MediaBlob
+from blog.media.storage import CONTENT_ADDRESSED_FIELDS, content_addressed_storage
+
+SWEEP_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed media blobs that no image field references any "
+        "more, and blob files left without a MediaBlob row by a rolled back upload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-period", type=int, default=3600,
+            help="Seconds an unreferenced blob is kept, covering uploads still in flight",
+        )
+        parser.add_argument(
+            "--recount", action="store_true",
+            help="Rebuild every ref_count from the image fields before collecting",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            self.recount()
+
+        cutoff = timezone.now() - timedelta(seconds=options["grace_period"])
+        orphans = MediaBlob.objects.filter(ref_count__lte=0, last_modified_at__lt=cutoff)
+
+        freed, deleted = 0, 0
+        for blob in orphans.iterator():
+            if not options["dry_run"]:
+                with transaction.atomic():
+                    # The row goes first and the file only with it: an upload
+                    # re-registering the blob meanwhile refreshed it (skipped
+                    # here) or waits for this transaction and then puts the
+                    # file back, see ContentAddressedStorage._save()
+                    if not orphans.filter(id=blob.id).delete()[0]:
+                        continue
+                    content_addressed_storage.purge(blob.name)
+            freed += blob.size
+            deleted += 1
+
+        swept, swept_size = self.sweep(cutoff.timestamp(), options["dry_run"])
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} blobs, {freed} bytes, and {swept} files without "
+            f"a blob row, {swept_size} bytes"
+        ))
+
+    def sweep(self, cutoff, dry_run):
+        """
+        Remove the blob files older than ``cutoff`` (a timestamp) that have
+        no MediaBlob row, and leftover ``.upload`` temporary files: uploads
+        whose transaction rolled back store their file but not their row.
+        """
+        root = content_addressed_storage.path(content_addressed_storage.prefix)
+        swept, size = 0, 0
+
+        def remove(names):
+            nonlocal swept, size
+            known = set(MediaBlob.objects.filter(name__in=names).values_list("name", flat=True))
+            for name, path in names.items():
+                if name in known:
+                    continue
+                try:
+                    stat = os.stat(path)
+                    # Touched again by an upload of the same content since
+                    if stat.st_mtime >= cutoff:
+                        continue
+                    if not dry_run:
+                        os.remove(path)
+                except FileNotFoundError:
+                    continue
+                swept += 1
+                size += stat.st_size
+
+        batch = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    if os.stat(path).st_mtime >= cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                name = os.path.relpath(path, content_addressed_storage.location).replace(os.sep, "/")
+                batch[name] = path
+                if len(batch) == SWEEP_BATCH_SIZE:
+                    remove(batch)
+                    batch = {}
+        if batch:
+            remove(batch)
+        return swept, size
+
+    def recount(self):
+        references = Counter()
+        for model_label, field_name in CONTENT_ADDRESSED_FIELDS:
+            rows = apps.get_model(model_label)._default_manager.filter(
+                **{f"{field_name}__startswith": f"{content_addressed_storage.prefix}/"}
+            ).values_list(field_name, flat=True).iterator()
+            references.update(rows)
+
+        for blob in MediaBlob.objects.iterator():
+            if blob.ref_count != references[blob.name]:
+                MediaBlob.objects.filter(id=blob.id).update(ref_count=references[blob.name])
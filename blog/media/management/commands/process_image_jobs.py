@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.media.models import ImageJob
+from blog.media.processing import process_job
+
+
+class Command(BaseCommand):
+    help = "Run a pool of workers that generate image variants from the ImageJob queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument("--max-attempts", type=int, default=3)
+        parser.add_argument("--stale-after", type=int, default=600, help="Seconds")
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once the queue is drained"
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options["stale_after"])
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                ImageJob.objects.requeue_stale(stale_after, options["max_attempts"])
+                jobs = ImageJob.objects.claim(options["batch_size"])
+
+                if not jobs:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                list(pool.map(lambda job: self.run(job, options["max_attempts"]), jobs))
+                self.stdout.write(f"Processed {len(jobs)} image jobs")
+
+    def run(self, job, max_attempts):
+        try:
+            process_job(job, max_attempts)
+        finally:
+            # Each pool thread holds its own connection
+            close_old_connections()
@@ -0,0 +1,140 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
+from blog.utils.base_class import BaseModel
+
+
+class ImageJobQuerySet(models.QuerySet):
+    def enqueue(self, instances: list, field_name: str) -> list:
+        """Queue variant generation for an image field of each instance, in one INSERT."""
+        return self.bulk_create(
+            ImageJob(
+                content_type=ContentType.objects.get_for_model(instance),
+                object_id=instance.pk,
+                field_name=field_name,
+            )
+            for instance in instances
+        )
+
+    def claim(self, batch_size: int) -> list:
+        """
+        Move up to batch_size pending jobs to processing. The conditional
+        UPDATE makes a job go to exactly one worker, on any database.
+        """
+        candidates = self.filter(status=ImageJob.PENDING).order_by(
+            "created_at"
+        ).values_list("id", flat=True)[:batch_size]
+
+        claimed = []
+        for job_id in list(candidates):
+            if self.filter(id=job_id, status=ImageJob.PENDING).update(
+                status=ImageJob.PROCESSING,
+                attempts=F("attempts") + 1,
+                last_modified_at=timezone.now(),
+            ):
+                claimed.append(job_id)
+        return list(self.filter(id__in=claimed).select_related("content_type"))
+
+    def requeue_stale(self, older_than, max_attempts: int) -> int:
+        """Give jobs of crashed workers back to the queue."""
+        stale = self.filter(
+            status=ImageJob.PROCESSING, last_modified_at__lt=timezone.now() - older_than
+        )
+        stale.filter(attempts__gte=max_attempts).update(
+            status=ImageJob.FAILED, error="Worker did not finish the job"
+        )
+        return stale.update(status=ImageJob.PENDING)
+
+
+class ImageJob(BaseModel):
+    PENDING, PROCESSING, DONE, FAILED = "pending", "processing", "done", "failed"
+    STATUS_CHOICES = [
+        (PENDING, "pending"),
+        (PROCESSING, "processing"),
+        (DONE, "done"),
+        (FAILED, "failed"),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    # NOTE: variants are stored on the instance in "<field_name>_variants"
+    field_name = models.CharField(max_length=50)
+    status = models.CharField(max_length=15, default=PENDING, choices=STATUS_CHOICES)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    objects = ImageJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=Q(status="pending"),
+                name="imagejob_pending_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.content_type.model}:{self.object_id}:{self.field_name} ({self.status})"
+
+
+class MediaBlobQuerySet(models.QuerySet):
+    def register(self, name: str, size: int):
+        """
+        Record a stored blob in one upsert. Re-uploading existing content
+        refreshes it, so collect_media_garbage leaves it alone until its
+        reference is added. An upsert rather than get_or_create(): it waits
+        for a concurrent collect_media_garbage deleting the row and then
+        inserts it again, instead of updating a row that is gone.
+        """
+        self.bulk_create(
+            [MediaBlob(name=name, size=size)],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["last_modified_at"],
+        )
+
+    def add_references(self, names: list):
+        self._move_references(names, 1)
+
+    def remove_references(self, names: list):
+        self._move_references(names, -1)
+
+    def _move_references(self, names, step):
+        counts = {}
+        for name in names:
+            if name:
+                counts[name] = counts.get(name, 0) + step
+        # One UPDATE per distinct delta, usually a single one for all names
+        by_delta = {}
+        for name, delta in counts.items():
+            by_delta.setdefault(delta, []).append(name)
+        for delta, delta_names in by_delta.items():
+            self.filter(name__in=delta_names).update(
+                ref_count=F("ref_count") + delta, last_modified_at=timezone.now()
+            )
+
+
+class MediaBlob(BaseModel):
+    """
+    A file stored once under its content hash by ContentAddressedStorage and
+    shared by every image field row that references it.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.IntegerField(default=0)
+
+    objects = MediaBlobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["last_modified_at"],
+                condition=Q(ref_count__lte=0),
+                name="mediablob_orphan_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.ref_count} references)"
@@ -0,0 +1,95 @@
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+
+from blog.media.models import ImageJob
+from blog.utils.constants import IMAGE_VARIANTS, IMAGE_VARIANT_QUALITY
+
+
+def strip_metadata(content):
+    """
+    Return the upload ``content`` without its EXIF (GPS included) and XMP
+    metadata, re-encoded in its own format with its orientation applied.
+    Images without such metadata and files Pillow can't read are returned
+    as they are.
+    """
+    try:
+        content.seek(0)
+        with Image.open(content) as upload:
+            exif = upload.getexif()
+            if not exif and "xmp" not in upload.info and "XML:com.adobe.xmp" not in upload.info:
+                return content
+
+            options = {"exif": b"", "icc_profile": upload.info.get("icc_profile")}
+            if getattr(upload, "is_animated", False):
+                image, options["save_all"] = upload, True
+            elif exif.get(ExifTags.Base.Orientation, 1) == 1:
+                image = upload
+                if upload.format == "JPEG":
+                    # Re-use the upload's quantization, no further quality loss
+                    options["quality"] = "keep"
+            else:
+                image = ImageOps.exif_transpose(upload)
+                if upload.format == "JPEG":
+                    options["quality"] = 95
+
+            buffer = io.BytesIO()
+            image.save(buffer, upload.format, **options)
+    except (UnidentifiedImageError, OSError):
+        return content
+    finally:
+        content.seek(0)
+    return ContentFile(buffer.getvalue(), name=content.name)
+
+
+def generate_variants(field_file, location: str) -> dict:
+    """
+    Write a WebP rendition of the image for every entry in IMAGE_VARIANTS
+    under ``location`` and return ``{variant name: storage name}``.
+    Variants are derived per object and overwritten on re-runs, so they go
+    to the default storage rather than the content-addressed one.
+    Renditions are re-encoded from pixels only, so EXIF/GPS metadata of the
+    upload is dropped (its orientation is applied first).
+    """
+    with field_file.open("rb"):
+        with Image.open(field_file) as upload:
+            image = ImageOps.exif_transpose(upload)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    variants = {}
+    for name, max_size in IMAGE_VARIANTS.items():
+        variant = image.copy()
+        variant.thumbnail((max_size, max_size))
+        buffer = io.BytesIO()
+        variant.save(buffer, "WEBP", quality=IMAGE_VARIANT_QUALITY)
+
+        path = f"{location}/{name}.webp"
+        default_storage.delete(path)
+        variants[name] = default_storage.save(path, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def process_job(job: ImageJob, max_attempts: int):
+    instance = job.content_type.model_class()._default_manager.filter(
+        pk=job.object_id
+    ).first()
+
+    try:
+        field_file = getattr(instance, job.field_name, None)
+        if field_file:
+            variants_field = f"{job.field_name}_variants"
+            location = "variants/{}/{}/{}".format(
+                job.content_type.model, job.object_id, job.field_name
+            )
+            setattr(instance, variants_field, generate_variants(field_file, location))
+            # save() rather than update() so post_save invalidates cached feeds,
+            # last_modified_at moves the validators of conditional GETs
+            instance.save(update_fields=[variants_field, "last_modified_at"])
+    except Exception as error:
+        job.status = ImageJob.FAILED if job.attempts >= max_attempts else ImageJob.PENDING
+        job.error = repr(error)
+    else:
+        job.status, job.error = ImageJob.DONE, ""
+    job.save(update_fields=["status", "error", "last_modified_at"])
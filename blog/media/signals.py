@@ -0,0 +1,98 @@
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from blog.media.storage import CONTENT_ADDRESSED_FIELDS
+
+
+def delete_variant_files(paths: list):
+    """Remove the variant files of deleted rows once the delete committed."""
+    def delete_files():
+        for path in paths:
+            default_storage.delete(path)
+
+    if paths:
+        transaction.on_commit(delete_files)
+
+
+def collect_release(origin, key, storage, name, variants):
+    """
+    Remember the blob and variants of a row about to be deleted by the
+    delete() call ``origin``, until release_collected() frees them.
+    Rows are keyed so a delete() retried after a failure collects them once.
+    """
+    release = origin.__dict__.get("_blob_release")
+    if release is None or release["released"]:
+        release = origin.__dict__["_blob_release"] = {"rows": {}, "released": False}
+    release["rows"][key] = (storage, name, variants)
+
+
+def release_collected(origin):
+    """
+    Drop the references of every row a delete() removed, in one UPDATE per
+    storage however many rows it cascaded to. Runs on the first post_delete
+    of the call: all its pre_delete signals were sent and its rows deleted.
+    """
+    release = origin.__dict__.get("_blob_release")
+    if release is None or release["released"]:
+        return
+    release["released"] = True
+    names, paths = {}, []
+    for storage, name, variants in release.pop("rows").values():
+        names.setdefault(storage, []).append(name)
+        paths.extend(variants.values())
+    for storage, storage_names in names.items():
+        storage.remove_references(storage_names)
+    delete_variant_files(paths)
+
+
+def track_blob_references(model, field_name):
+    """
+    Keep MediaBlob.ref_count in step with one content-addressed image field,
+    and delete the variants of the field with its row.
+    """
+    storage = model._meta.get_field(field_name).storage
+    previous_attr = f"_previous_{field_name}"
+    variants_field = f"{field_name}_variants"
+
+    def remember_previous_file(sender, instance, update_fields=None, **kwargs):
+        if instance._state.adding or (update_fields and field_name not in update_fields):
+            return
+        setattr(instance, previous_attr, sender._default_manager.filter(
+            pk=instance.pk
+        ).values_list(field_name, flat=True).first())
+
+    def move_references(sender, instance, created, update_fields=None, **kwargs):
+        name = getattr(instance, field_name).name
+        if created:
+            storage.add_references([name])
+        elif hasattr(instance, previous_attr):
+            previous = instance.__dict__.pop(previous_attr)
+            if previous != name:
+                storage.add_references([name])
+                storage.remove_references([previous])
+
+    def collect_reference(sender, instance, origin=None, **kwargs):
+        if origin is not None:
+            collect_release(
+                origin, (sender._meta.label, field_name, instance.pk), storage,
+                getattr(instance, field_name).name, getattr(instance, variants_field) or {},
+            )
+
+    def drop_reference(sender, instance, origin=None, **kwargs):
+        if origin is not None:
+            release_collected(origin)
+            return
+        storage.remove_references([getattr(instance, field_name).name])
+        delete_variant_files(list((getattr(instance, variants_field) or {}).values()))
+
+    uid = f"blob_references_{model._meta.label}_{field_name}"
+    pre_save.connect(remember_previous_file, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(move_references, sender=model, weak=False, dispatch_uid=uid)
+    pre_delete.connect(collect_reference, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(drop_reference, sender=model, weak=False, dispatch_uid=uid)
+
+
+for model_label, field_name in CONTENT_ADDRESSED_FIELDS:
+    track_blob_references(apps.get_model(model_label), field_name)
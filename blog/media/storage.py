@@ -0,0 +1,106 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Image fields whose files are stored content-addressed and reference counted
+CONTENT_ADDRESSED_FIELDS = [
+    ("posts.PostImage", "image"),
+    ("posts.CommentToPostImages", "post_image"),
+    ("accounts.CustomUser", "image"),
+]
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Store each file once under ``cas/<aa>/<bb>/<sha256><ext>``.
+
+    Images are stored without their EXIF/XMP metadata (GPS position, camera
+    serial...), which the variants drop as well, see strip_metadata().
+
+    The upload is hashed while it is streamed to a temporary file, which
+    then either becomes the blob or is dropped when identical content is
+    already stored. Blobs are shared, so delete() never removes one; unused
+    blobs are removed by the collect_media_garbage command instead, as are
+    files whose MediaBlob row was rolled back with the upload's
+    transaction. Blob names never change content, so they can be served
+    as immutable.
+    """
+    prefix = "cas"
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content, see _save()
+        return name
+
+    def _save(self, name, content):
+        from blog.media.models import MediaBlob
+        from blog.media.processing import strip_metadata
+
+        content = strip_metadata(content)
+        extension = os.path.splitext(name)[1].lower()
+        directory = self.path(self.prefix)
+        os.makedirs(directory, exist_ok=True)
+
+        digest, size = hashlib.sha256(), 0
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".upload")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+
+            hexdigest = digest.hexdigest()
+            blob_name = f"{self.prefix}/{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{extension}"
+            blob_path = self.path(blob_name)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+            # The row first: collect_media_garbage purges a file only while
+            # it holds the deleted row, so once this returns the file found
+            # (or placed) below stays
+            MediaBlob.objects.register(blob_name, size)
+            try:
+                # A fresh mtime keeps the orphan file sweep off it until the
+                # row commits, or after a rollback for another grace period
+                os.utime(blob_path)
+            except FileNotFoundError:
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, blob_path)
+            else:
+                os.remove(temp_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return blob_name
+
+    def delete(self, name):
+        if not self.is_blob(name):
+            super().delete(name)
+
+    def purge(self, name):
+        """Remove a blob file, only for collect_media_garbage."""
+        super().delete(name)
+
+    def is_blob(self, name) -> bool:
+        return bool(name) and name.startswith(f"{self.prefix}/")
+
+    def add_references(self, names):
+        from blog.media.models import MediaBlob
+        MediaBlob.objects.add_references([name for name in names if self.is_blob(name)])
+
+    def remove_references(self, names):
+        from blog.media.models import MediaBlob
+        MediaBlob.objects.remove_references([name for name in names if self.is_blob(name)])
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def get_content_addressed_storage():
+    return content_addressed_storage
@@ -0,0 +1,82 @@
+import os
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from blog.media.models import MediaBlob
+from blog.media.storage import content_addressed_storage as storage
+from blog.posts.factories import PostFactory
+from blog.posts.models import PostImage
+
+
+def age(name=None, seconds=7200):
+    """Make a blob (or every blob) look ``seconds`` old, row and file."""
+    then = timezone.now() - timedelta(seconds=seconds)
+    blobs = MediaBlob.objects.all() if name is None else MediaBlob.objects.filter(name=name)
+    blobs.update(last_modified_at=then)
+    for directory, _, filenames in os.walk(storage.path(storage.prefix)):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if name is None or path == storage.path(name):
+                os.utime(path, (then.timestamp(), then.timestamp()))
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_one_blob():
+    post = PostFactory()
+    first = PostImage.objects.create(post=post, image=ContentFile(b"same bytes", name="a.png"))
+    second = PostImage.objects.create(post=post, image=ContentFile(b"same bytes", name="b.png"))
+
+    assert first.image.name == second.image.name
+    assert MediaBlob.objects.get(name=first.image.name).ref_count == 2
+
+
+@pytest.mark.django_db
+def test_unreferenced_blobs_are_deleted_with_their_file():
+    post = PostFactory()
+    kept = PostImage.objects.create(post=post, image=ContentFile(b"kept", name="kept.png"))
+    dropped = PostImage.objects.create(post=post, image=ContentFile(b"dropped", name="dropped.png"))
+    dropped.delete()
+    age()
+
+    call_command("collect_media_garbage", stdout=StringIO())
+
+    assert list(MediaBlob.objects.values_list("name", flat=True)) == [kept.image.name]
+    assert storage.exists(kept.image.name)
+    assert not storage.exists(dropped.image.name)
+
+
+@pytest.mark.django_db
+def test_blob_uploaded_again_after_it_became_an_orphan_is_kept():
+    post = PostFactory()
+    image = PostImage.objects.create(post=post, image=ContentFile(b"again", name="a.png"))
+    image.delete()
+    age()
+    # Same content again, still within the upload that will reference it
+    assert storage.save("b.png", ContentFile(b"again")) == image.image.name
+
+    call_command("collect_media_garbage", stdout=StringIO())
+
+    assert MediaBlob.objects.filter(name=image.image.name).exists()
+    assert storage.exists(image.image.name)
+
+
+@pytest.mark.django_db
+def test_files_of_rolled_back_uploads_are_swept():
+    with transaction.atomic():
+        name = storage.save("rolled-back.png", ContentFile(b"rolled back"))
+        transaction.set_rollback(True)
+    assert storage.exists(name)
+    assert not MediaBlob.objects.filter(name=name).exists()
+
+    call_command("collect_media_garbage", stdout=StringIO())
+    assert storage.exists(name), "still within the grace period"
+
+    age(name)
+    call_command("collect_media_garbage", stdout=StringIO())
+    assert not storage.exists(name)
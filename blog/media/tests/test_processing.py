@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image
+
+from blog.media.models import ImageJob
+from blog.media.processing import process_job
+from blog.media.storage import content_addressed_storage as storage
+from blog.posts.factories import PostFactory
+from blog.posts.models import PostImage
+
+
+def jpeg_with_gps(orientation=1):
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = "Camera"
+    exif[ExifTags.Base.Orientation] = orientation
+    exif.get_ifd(ExifTags.IFD.GPSInfo)[ExifTags.GPS.GPSLatitude] = (48.0, 51.0, 24.0)
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 4), "red").save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("orientation, size", [(1, (8, 4)), (6, (4, 8))])
+def test_stored_originals_have_no_exif(orientation, size):
+    image = PostImage.objects.create(
+        post=PostFactory(), image=ContentFile(jpeg_with_gps(orientation), name="photo.jpg")
+    )
+
+    with storage.open(image.image.name) as stored, Image.open(stored) as original:
+        assert original.format == "JPEG"
+        assert not original.getexif()
+        assert original.size == size
+
+
+@pytest.mark.django_db
+def test_files_without_metadata_are_stored_unchanged():
+    content = b"not an image"
+    image = PostImage.objects.create(post=PostFactory(), image=ContentFile(content, name="a.png"))
+
+    with storage.open(image.image.name) as stored:
+        assert stored.read() == content
+
+
+@pytest.mark.django_db
+def test_variant_files_are_deleted_with_their_row(django_capture_on_commit_callbacks):
+    post = PostFactory()
+    image = PostImage.objects.create(post=post, image=ContentFile(jpeg_with_gps(), name="a.jpg"))
+    [job] = ImageJob.objects.enqueue([image], "image")
+    process_job(job, max_attempts=1)
+    paths = list(PostImage.objects.get(id=image.id).image_variants.values())
+    assert paths and all(default_storage.exists(path) for path in paths)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+
+    assert not any(default_storage.exists(path) for path in paths)
@@ -0,0 +1,11 @@
+from django.views.static import serve
+
+
+def serve_immutable(request, path, document_root=None):
+    """
+    Development server for content-addressed blobs. Their content never
+    changes under a name, so clients may cache them forever.
+    """
+    response = serve(request, path, document_root=document_root)
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
@@ -0,0 +1,163 @@
+"""
+Async variants of the read-heavy post and comment endpoints, meant to be
+served by an ASGI server (see config/asgi.py).
+
+The DRF generic views are synchronous, so every database or cache round
+trip pins a worker thread. These views await the async ORM and cache
+instead and only run the (CPU bound) serializers synchronously over rows
+that are already loaded, so a single worker can keep many slow requests
+in flight. They respond exactly like their sync counterparts.
+"""
+import functools
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from blog.posts.api.v1.fast_serializers import FastPostCommentSerializer, FastPostSerializer
+from blog.posts.api.v1.filters import FullTextSearchFilter
+from blog.posts.api.v1.permissions import IsPostOwner
+from blog.posts.api.v1.serializers import PostSerializer
+from blog.posts.models import Post, PostComment
+from blog.utils.authentication import AsyncJWTAuthentication
+from blog.utils.cache import aget_versions, response_cache_key
+from blog.utils.conditional import make_etag, not_modified_response, set_validators
+from blog.utils.constants import RESPONSE_CACHE_TIMEOUT
+from blog.utils.metrics import record_cache_lookup
+from blog.utils.pagination import KeysetPagination, OldestFirstKeysetPagination
+from blog.utils.renderers import FastJSONRenderer
+
+renderer = FastJSONRenderer()
+authentication = AsyncJWTAuthentication()
+
+
+def render(data, status=200, headers=None) -> HttpResponse:
+    response = HttpResponse(
+        renderer.render(data), status=status, content_type=renderer.media_type
+    )
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def handle_exception(exc, request):
+    """Render an APIException through the configured EXCEPTION_HANDLER."""
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        exc.auth_header = authentication.authenticate_header(request)
+
+    response = api_settings.EXCEPTION_HANDLER(exc, {"view": None, "request": request})
+    if response is None:
+        raise exc
+    # Not the unrendered Response's text/html Content-Type, render() sets its own
+    headers = {
+        name: value for name, value in response.headers.items() if name != "Content-Type"
+    }
+    return render(response.data, status=response.status_code, headers=headers)
+
+
+def async_api_view(login_required=True):
+    """
+    Turn ``async def view(request, ...)`` into a GET-only JSON endpoint:
+    the request is wrapped in a DRF Request (query_params, absolute URIs
+    for the serializers) and authenticated with the same JWT settings.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(http_request, *args, **kwargs):
+            if http_request.method != "GET":
+                return render(
+                    {"detail": f'Method "{http_request.method}" not allowed.'},
+                    status=405,
+                    headers={"Allow": "GET"},
+                )
+
+            request = Request(http_request)
+            try:
+                user_auth = await authentication.aauthenticate(http_request)
+                request.user = user_auth[0] if user_auth else AnonymousUser()
+                if login_required and not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return handle_exception(exc, request)
+
+        return wrapper
+    return decorator
+
+
+async def get_cached_response(name, scopes, request, get_data) -> HttpResponse:
+    """Async counterpart of VersionedCacheMixin.get_cached_response()."""
+    cache_key = response_cache_key(
+        name, scopes, await aget_versions(*scopes), request.build_absolute_uri()
+    )
+    etag = make_etag(cache_key)
+    not_modified = not_modified_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    data = await cache.aget(cache_key)
+    record_cache_lookup(hit=data is not None)
+    if data is None:
+        data = await get_data()
+        await cache.aset(cache_key, data, timeout=RESPONSE_CACHE_TIMEOUT)
+    return render(data, headers={"ETag": etag})
+
+
+async def get_page_data(paginator, queryset, request, fast_serializer_class):
+    serializer = fast_serializer_class(context={"request": request})
+    page_queryset = paginator.get_page_queryset(serializer.get_queryset(queryset), request)
+    page = paginator.set_page([row async for row in page_queryset])
+    return paginator.get_paginated_data(await serializer.aget_data(page))
+
+
+@async_api_view(login_required=False)
+async def all_posts(request):
+    """Async AllPostAPIView: published posts, newest first, ``?search=`` aware."""
+    async def get_data():
+        queryset = FullTextSearchFilter().filter_queryset(
+            request, Post.objects.filter(post_state="published").with_feed_data(), None
+        )
+        return await get_page_data(KeysetPagination(), queryset, request, FastPostSerializer)
+
+    return await get_cached_response("all_posts", ["posts", "profiles"], request, get_data)
+
+
+@async_api_view()
+async def post_detail(request, id):
+    """Async UpdatePostAPIView (GET): a single post, only for its author."""
+    posts = Post.objects.filter(id=id, author_id=request.user.id)
+    etag, last_modified = await posts.aget_validators()
+    if etag is None:
+        if await Post.objects.filter(id=id).aexists():
+            raise exceptions.PermissionDenied(IsPostOwner.message)
+        raise exceptions.NotFound()
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        post = await posts.with_feed_data().aget()
+    except Post.DoesNotExist:
+        raise exceptions.NotFound()
+
+    return set_validators(
+        render(PostSerializer(post, context={"request": request}).data), etag, last_modified
+    )
+
+
+@async_api_view()
+async def post_comments(request, post_id):
+    """Async PostCommentAPIView (GET): top level comments, oldest first."""
+    async def get_data():
+        queryset = PostComment.objects.filter(
+            post_id=post_id, parent_comment=None
+        ).select_related("user_that_comment").prefetch_related("comment_to_post_images")
+        return await get_page_data(
+            OldestFirstKeysetPagination(), queryset, request, FastPostCommentSerializer
+        )
+
+    scopes = [f"post:{post_id}", "profiles"]
+    return await get_cached_response("post_comments", scopes, request, get_data)
@@ -0,0 +1,227 @@
+"""
+Read-only serializers for the feed endpoints.
+
+PostSerializer and PostCommentSerializer build a model instance per row and
+run every DRF field's ``to_representation`` for it, which is most of the
+CPU a large feed page costs. The serializers here read the page as
+``values_list()`` rows instead, load the images of the whole page with one
+more values query and build the response dicts directly. The output is the
+same as the DRF serializers', key for key, so a response rendered either
+way is identical. Only the columns of the requested fields are read, so a
+``?fields=id,title,excerpt`` page never loads content, authors or images.
+"""
+from collections import defaultdict
+from operator import attrgetter
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from blog.posts.models import CommentToPostImages, Post, PostComment, PostImage
+from blog.utils.renderers import FastJSONRenderer
+from blog.utils.sparse_fields import requested_fields
+
+User = get_user_model()
+
+USER_FIELDS = ("first_name", "last_name", "username", "image", "image_variants")
+AUTHOR_COLUMNS = tuple(f"author__{field}" for field in USER_FIELDS)
+COMMENTER_COLUMNS = tuple(f"user_that_comment__{field}" for field in USER_FIELDS)
+
+
+class FastSerializer:
+    """
+    Base class: ``field_columns`` maps the output fields, in output order,
+    to the ``values_list()`` columns they are rendered from. A field is
+    rendered by its ``get_<field>(row)`` method, or as its only column when
+    there is none. ``related_field`` is rendered from get_related_queryset(),
+    which loads it for the whole page, grouped on its first column.
+
+    ``?fields=`` and ``?exclude=`` (see blog/utils/sparse_fields.py) narrow
+    the fields, and with them the columns read and the queries run.
+    """
+    model = None
+    field_columns = {}
+    related_field = None
+    # Read whatever the fields, keyset pagination builds cursors from them
+    key_columns = ("id", "created_at")
+    user_image_storage = User._meta.get_field("image").storage
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.request = self.context.get("request")
+
+        self.field_names = list(self.field_columns)
+        if self.request is not None:
+            requested = requested_fields(self.request, self.field_names)
+            if requested is not None:
+                self.field_names = requested
+
+        self.columns = list(dict.fromkeys([
+            *self.key_columns,
+            *(column for name in self.field_names for column in self.field_columns[name]),
+        ]))
+        self.getters = [
+            (name, getattr(self, f"get_{name}", None) or attrgetter(self.field_columns[name][0]))
+            for name in self.field_names
+        ]
+        self.related = {}
+
+    def get_queryset(self, queryset):
+        """``queryset`` as named rows, which keyset pagination can page through."""
+        return queryset.prefetch_related(None).values_list(*self.columns, named=True)
+
+    def get_related_queryset(self, ids):
+        raise NotImplementedError("FastSerializer requires get_related_queryset()")
+
+    def loads_related(self, rows) -> bool:
+        return bool(rows) and self.related_field in self.field_names
+
+    def group(self, related_rows) -> dict:
+        grouped = defaultdict(list)
+        for row in related_rows:
+            grouped[row[0]].append(row)
+        return grouped
+
+    def get_data(self, rows) -> list:
+        if self.loads_related(rows):
+            self.related = self.group(self.get_related_queryset([row.id for row in rows]))
+        return self.to_representation(rows)
+
+    async def aget_data(self, rows) -> list:
+        """get_data() through the async ORM."""
+        if self.loads_related(rows):
+            related_queryset = self.get_related_queryset([row.id for row in rows])
+            self.related = self.group([row async for row in related_queryset])
+        return self.to_representation(rows)
+
+    def to_representation(self, rows) -> list:
+        getters = self.getters
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+    def file_url(self, storage, name):
+        """What DRF's FileField renders for a stored file name."""
+        if not name:
+            return None
+        url = storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request else url
+
+    def variants(self, variants):
+        """What ImageVariantsField renders."""
+        return {name: self.file_url(default_storage, path) for name, path in variants.items()}
+
+    def user(self, first_name, last_name, username, image, image_variants):
+        """What UserSerializer renders."""
+        return {
+            "first_name": first_name,
+            "last_name": last_name,
+            "username": username,
+            "image": self.file_url(self.user_image_storage, image),
+            "image_variants": self.variants(image_variants),
+        }
+
+
+class FastPostSerializer(FastSerializer):
+    """PostSerializer's output for feeds of Post.objects querysets."""
+    model = Post
+    field_columns = {
+        "id": ("id",),
+        "title": ("title",),
+        "content": ("content",),
+        "excerpt": ("excerpt",),
+        "category": ("category",),
+        "post_state": ("post_state",),
+        "author": AUTHOR_COLUMNS,
+        "images": (),
+        "upvote_count": ("upvote_count",),
+        "downvote_count": ("downvote_count",),
+        "score": ("upvote_count", "downvote_count"),
+    }
+    related_field = "images"
+    image_storage = PostImage._meta.get_field("image").storage
+    author_columns = attrgetter(*AUTHOR_COLUMNS)
+
+    def get_related_queryset(self, ids):
+        return PostImage.objects.filter(post_id__in=ids).values_list(
+            "post_id", "id", "image", "image_variants"
+        )
+
+    def get_id(self, row):
+        return str(row.id)
+
+    def get_author(self, row):
+        return self.user(*self.author_columns(row))
+
+    def get_images(self, row):
+        file_url, variants, image_storage = self.file_url, self.variants, self.image_storage
+        return [
+            {
+                "id": str(image_id),
+                "image": file_url(image_storage, image),
+                "variants": variants(image_variants),
+            }
+            for _, image_id, image, image_variants in self.related.get(row.id, ())
+        ]
+
+    def get_score(self, row):
+        return row.upvote_count - row.downvote_count
+
+
+class FastPostCommentSerializer(FastSerializer):
+    """PostCommentSerializer's output for comment lists."""
+    model = PostComment
+    field_columns = {
+        "id": ("id",),
+        "user_that_comment": COMMENTER_COLUMNS,
+        "comment": ("comment",),
+        "parent_comment": ("parent_comment_id",),
+        "comment_to_post_images": (),
+    }
+    related_field = "comment_to_post_images"
+    image_storage = CommentToPostImages._meta.get_field("post_image").storage
+    commenter_columns = attrgetter(*COMMENTER_COLUMNS)
+
+    def get_related_queryset(self, ids):
+        return CommentToPostImages.objects.filter(comment_to_post_id__in=ids).values_list(
+            "comment_to_post_id", "post_image", "post_image_variants"
+        )
+
+    def get_id(self, row):
+        return str(row.id)
+
+    def get_user_that_comment(self, row):
+        return self.user(*self.commenter_columns(row))
+
+    def get_parent_comment(self, row):
+        return None if row.parent_comment_id is None else str(row.parent_comment_id)
+
+    def get_comment_to_post_images(self, row):
+        file_url, variants, image_storage = self.file_url, self.variants, self.image_storage
+        return [
+            {
+                "post_image": file_url(image_storage, image),
+                "variants": variants(image_variants),
+            }
+            for _, image, image_variants in self.related.get(row.id, ())
+        ]
+
+
+class FastListMixin:
+    """
+    list() through ``fast_serializer_class`` instead of get_serializer():
+    the page is read as rows and rendered without model instances or DRF
+    fields. Writes still go through serializer_class.
+    """
+    fast_serializer_class = None
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.fast_serializer_class(context=self.get_serializer_context())
+        queryset = serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        if self.paginator is None:
+            return Response(serializer.get_data(list(queryset)))
+
+        page_queryset = self.paginator.get_page_queryset(queryset, request)
+        page = self.paginator.set_page(list(page_queryset))
+        return self.get_paginated_response(serializer.get_data(page))
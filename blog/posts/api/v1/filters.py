@@ -0,0 +1,28 @@
+from rest_framework.filters import BaseFilterBackend
+
+from blog.posts.search import get_search_backend, search_terms
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Restrict a post queryset to the posts whose title or content match
+    ``?search=`` using the full-text index instead of ``LIKE '%term%'``.
+    """
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search_terms(request.query_params.get(self.search_param, ""))
+        if not terms:
+            return queryset
+        return queryset.filter(id__in=get_search_backend().matching_ids(terms))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search over post titles and content.",
+                "schema": {"type": "string"},
+            },
+        ]
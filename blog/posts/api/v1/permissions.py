@@ -10,7 +10,7 @@ class IsPostOwner(BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # Allow access only for post owners
-       return  obj.author == request.user 
+       return obj.author_id == request.user.id
 
 class IsPostCommentOwner(BasePermission):
     message = "You aren' the owner of the comment"
@@ -20,7 +20,7 @@ class IsPostCommentOwner(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         # Allow access only for post comment owner
-        return obj.user_that_comment == request.user
+        return obj.user_that_comment_id == request.user.id
     
 
 class IsReactionOwner(BasePermission):
@@ -31,5 +31,5 @@ class IsReactionOwner(BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # Allow access only for reaction owner
-        return obj.user_that_react == request.user
+        return obj.user_that_react_id == request.user.id
 
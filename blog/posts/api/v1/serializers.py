@@ -8,25 +8,38 @@ from blog.posts.models import (
     
 )
 
+from django.db import transaction
 from django.utils import timezone
 from blog.accounts.api.v1.serializers import (
     UserSerializer
 )
+from blog.utils.cache import bump_versions
+from blog.utils.files import bulk_create_with_files
+from blog.utils.sparse_fields import SparseFieldsMixin
+from blog.media.fields import ImageVariantsField
+from blog.media.models import ImageJob
+from blog.posts import timeline
 
 class PostImageSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField(source="image_variants")
+
     class Meta:
         model = PostImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "variants"]
 
 
-class PostSerializer(serializers.ModelSerializer):
-    images = PostImageSerializer(many=True, read_only=True)
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    images = PostImageSerializer(source="post_images", many=True, read_only=True)
     uploaded_images = serializers.ListField(
         child=serializers.ImageField(required=False),
+        write_only=True,
         required=False,
     )
     author = UserSerializer(read_only=True)
     content = serializers.CharField(required=False)
+    upvote_count = serializers.IntegerField(read_only=True)
+    downvote_count = serializers.IntegerField(read_only=True)
+    score = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Post
@@ -34,15 +47,20 @@ class PostSerializer(serializers.ModelSerializer):
             "id", 
             "title",
             "content", 
+            "excerpt",
             "category",
             "post_state",
             "author",
             "content",
             "images", 
             "uploaded_images",
+            "upvote_count",
+            "downvote_count",
+            "score",
             ]
     
 
+    @transaction.atomic
     def create(self, validated_data):
 
         post_obj = Post.objects.create(
@@ -55,12 +73,33 @@ class PostSerializer(serializers.ModelSerializer):
 
         post_images = validated_data.pop("uploaded_images", None)
 
-        if post_images is not None:
-            for post_image in post_images:
-                PostImage.objects.create(post=post_obj, image=post_image)
+        if post_images:
+            post_image_objs = bulk_create_with_files(
+                PostImage,
+                [PostImage(post=post_obj, image=post_image) for post_image in post_images],
+                "image",
+            )
+            ImageJob.objects.enqueue(post_image_objs, "image")
 
+        timeline.on_post_state_change(post_obj, was_published=False)
         return post_obj
 
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        was_published = instance.post_state == "published"
+        columns = {field.name for field in Post._meta.concrete_fields}
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Only the edited columns (Post.save() adds excerpt): the counters on
+        # the instance can be older than the row, writing them back would undo
+        # concurrent F() updates. hot_score only depends on the counters and
+        # created_at, which an edit doesn't change
+        instance.save(update_fields=[
+            *(name for name in validated_data if name in columns), "last_modified_at"
+        ])
+        timeline.on_post_state_change(instance, was_published)
+        return instance
+
     
 
 
@@ -81,15 +120,18 @@ class UpdatePostSerializer(serializers.ModelSerializer):
     
 
 class CommentToPostImagesSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField(source="post_image_variants")
+
     class Meta:
         model = CommentToPostImages
         fields = [
             # "comment_to_post",
-            "post_image"
+            "post_image",
+            "variants",
         ]
 
 
-class PostCommentSerializer(serializers.ModelSerializer):
+class PostCommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     comment_to_post_images = CommentToPostImagesSerializer(read_only=True, many=True)
     user_that_comment = UserSerializer(read_only=True)
     uploaded_comment_to_post_images = serializers.ListField(
@@ -103,11 +145,20 @@ class PostCommentSerializer(serializers.ModelSerializer):
             "id",
             "user_that_comment",
             "comment",
+            "parent_comment",
             "comment_to_post_images",
             "uploaded_comment_to_post_images",
         ]
 
+    def validate_parent_comment(self, value):
+        post_id = self.instance.post_id if self.instance else self.context.get("post_id")
+        if value is not None and str(value.post_id) != str(post_id):
+            raise serializers.ValidationError({
+                "message": "Parent comment belongs to another post"
+            })
+        return value
   
+    @transaction.atomic
     def create(self, validated_data):
         uploaded_comment_to_post_images = validated_data.pop(
             "uploaded_comment_to_post_images", None
@@ -116,19 +167,94 @@ class PostCommentSerializer(serializers.ModelSerializer):
 
         comment_to_post_obj = PostComment.objects.create(
             post_id=self.context['post_id'],
+            parent_comment=validated_data.get("parent_comment"),
             comment=validated_data["comment"],
             user_that_comment=self.context["request"].user,
         )
+        Post.objects.filter(id=self.context['post_id']).update_comment_count()
 
-        if uploaded_comment_to_post_images is not None:
-            for comment_to_post_image in uploaded_comment_to_post_images:
-                CommentToPostImages.objects.create(
-                    comment_to_post=comment_to_post_obj,
-                    post_image=comment_to_post_image,
-                )
+        if uploaded_comment_to_post_images:
+            comment_image_objs = bulk_create_with_files(
+                CommentToPostImages,
+                [
+                    CommentToPostImages(
+                        comment_to_post=comment_to_post_obj,
+                        post_image=comment_to_post_image,
+                    )
+                    for comment_to_post_image in uploaded_comment_to_post_images
+                ],
+                "post_image",
+            )
+            ImageJob.objects.enqueue(comment_image_objs, "post_image")
         return comment_to_post_obj
 
 
+class CommentTreeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Read-only nested rendering of PostComment.objects.tree() nodes
+    """
+    comment_to_post_images = CommentToPostImagesSerializer(read_only=True, many=True)
+    user_that_comment = UserSerializer(read_only=True)
+    reply_count = serializers.IntegerField(read_only=True)
+    replies = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PostComment
+        fields = [
+            "id",
+            "user_that_comment",
+            "comment",
+            "created_at",
+            "comment_to_post_images",
+            "reply_count",
+            "replies",
+        ]
+
+    def get_replies(self, obj):
+        return CommentTreeSerializer(obj.replies, many=True, context=self.context).data
+
+
+class ImportReactionSerializer(serializers.Serializer):
+    user = serializers.CharField()
+    reaction = serializers.ChoiceField(choices=PostReaction.REACTION_CHOICES)
+    created_at = serializers.DateTimeField(required=False)
+
+
+class ImportCommentSerializer(serializers.Serializer):
+    user = serializers.CharField()
+    comment = serializers.CharField()
+    created_at = serializers.DateTimeField(required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Built on first use, so replies nest as deep as the data does
+        fields["replies"] = ImportCommentSerializer(many=True, required=False)
+        return fields
+
+
+class ImportPostSerializer(serializers.Serializer):
+    """
+    One record of a bulk import, see blog/posts/importer.py. Users are
+    referenced by username and resolved for a whole chunk at once.
+    """
+    author = serializers.CharField()
+    title = serializers.CharField(max_length=200)
+    content = serializers.CharField()
+    category = serializers.ChoiceField(choices=Post.CATEGORY_CHOICES)
+    post_state = serializers.ChoiceField(
+        choices=Post.POST_CHOICES, default=Post.POST_CHOICES[0][0]
+    )
+    created_at = serializers.DateTimeField(required=False)
+    comments = ImportCommentSerializer(many=True, required=False)
+    reactions = ImportReactionSerializer(many=True, required=False)
+
+    def validate_reactions(self, value):
+        users = [reaction["user"] for reaction in value]
+        if len(set(users)) != len(users):
+            raise serializers.ValidationError("A user can only react once to a post.")
+        return value
+
+
 class PostReactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = PostReaction
@@ -140,19 +266,28 @@ class PostReactionSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         return super().validate(attrs)
 
+    @transaction.atomic
     def create(self, validated_data):
-        post_reaction_obj, created = PostReaction.objects.get_or_create(
-            post=validated_data["post"],
-            user_that_react=self.context["request"].user,
-            defaults={
-                "user_that_react": self.context["request"].user,
-                "reaction": validated_data["reaction"],
-            },
+        post, reaction = validated_data["post"], validated_data["reaction"]
+        reaction_id, outcome = PostReaction.objects.upsert(
+            post.id, self.context["request"].user.id, reaction
         )
+        post_objs = Post.objects.filter(id=post.id)
+
+        if outcome == PostReaction.CREATED:
+            post_objs.update_reaction_counts(added=reaction)
+        elif outcome == PostReaction.FLIPPED:
+            # Only two reactions exist, a flip always comes from the other one
+            previous_reaction = "downvote" if reaction == "upvote" else "upvote"
+            post_objs.update_reaction_counts(added=reaction, removed=previous_reaction)
 
-        if not created:
-            post_reaction_obj.reaction = validated_data["reaction"]
-            post_reaction_obj.save()
-            return post_reaction_obj
-        
-        return post_reaction_obj
\ No newline at end of file
+        if outcome != PostReaction.UNCHANGED:
+            # The raw upsert bypasses post_save, see blog/posts/signals.py
+            bump_versions(*post.cache_scopes())
+
+        return PostReaction(
+            id=reaction_id,
+            post=post,
+            user_that_react=self.context["request"].user,
+            reaction=reaction,
+        )
\ No newline at end of file
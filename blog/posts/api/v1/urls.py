@@ -6,11 +6,18 @@ from blog.posts.api.v1.views import (
     UserPostsAPIView,
     PublishedPostAPIView,
     PostCommentAPIView,
+    PostCommentTreeAPIView,
     EditCommentAPIView,
     PostReactionAPIView,
     DeleteReactionAPIView,
-    AllPostAPIView
+    AllPostAPIView,
+    SearchPostAPIView,
+    HomeTimelineAPIView,
+    TrendingPostAPIView,
+    ExportAPIView,
+    ImportPostsAPIView,
 )
+from blog.posts.api.v1 import async_views
 
 app_name = "posts"
 
@@ -20,9 +27,19 @@ urlpatterns = [
     path('delete-post/<uuid:id>/', DeletePostAPIView.as_view(), name='delete_post'),
     path('user-posts/', UserPostsAPIView.as_view(), name='user_posts'),
     path('all-posts/', AllPostAPIView.as_view(), name='all_posts'),
+    path('search/', SearchPostAPIView.as_view(), name='search_posts'),
+    path('timeline/', HomeTimelineAPIView.as_view(), name='home_timeline'),
+    path('trending/', TrendingPostAPIView.as_view(), name='trending_posts'),
     path('posts/<str:username>/', PublishedPostAPIView.as_view(), name='user_published_posts'),
     path('post-comment/<uuid:post_id>/', PostCommentAPIView.as_view(), name='post_comment' ),
+    path('post-comment-tree/<uuid:post_id>/', PostCommentTreeAPIView.as_view(), name='post_comment_tree'),
     path('edit-comment/<uuid:comment_id>/', EditCommentAPIView.as_view(), name='edit_comment'),
     path('post-reaction/', PostReactionAPIView.as_view(), name='post_reaction'),
-    path('delete-reaction/<uuid:reaction_id>/', DeleteReactionAPIView.as_view(), name='delete_reaction')
+    path('delete-reaction/<uuid:reaction_id>/', DeleteReactionAPIView.as_view(), name='delete_reaction'),
+    path('export/<str:name>/', ExportAPIView.as_view(), name='export'),
+    path('import/', ImportPostsAPIView.as_view(), name='import_posts'),
+    # NOTE: async views, only worth it when served under ASGI (config/asgi.py)
+    path('async/all-posts/', async_views.all_posts, name='async_all_posts'),
+    path('async/post/<uuid:id>/', async_views.post_detail, name='async_post_detail'),
+    path('async/post-comment/<uuid:post_id>/', async_views.post_comments, name='async_post_comment'),
 ]
\ No newline at end of file
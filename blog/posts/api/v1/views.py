@@ -1,21 +1,51 @@
+import uuid
+
 from rest_framework import generics, permissions
 from rest_framework import filters
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.utils.urls import replace_query_param
 from blog.posts.api.v1.serializers import (
     PostSerializer,
     PostCommentSerializer,
+    CommentTreeSerializer,
     PostReactionSerializer,
 )
 from blog.posts.models import Post
 from rest_framework.response import Response
 from blog.posts.models import PostComment, PostReaction
+from blog.posts.api.v1.fast_serializers import (
+    FastListMixin,
+    FastPostCommentSerializer,
+    FastPostSerializer,
+)
+from blog.posts.api.v1.filters import FullTextSearchFilter
+from blog.posts.export import (
+    CONTENT_TYPES,
+    EXPORTS,
+    astream_export,
+    format_timestamp,
+    parse_timestamp,
+    stream_export,
+)
+from blog.posts.importer import import_records, read_ndjson
+from blog.posts.search import get_search_backend, search_terms
+from blog.posts.timeline import home_timeline
 from blog.posts.api.v1.permissions import(
     IsPostOwner,
     IsPostCommentOwner,
     IsReactionOwner
 )
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.db.models import prefetch_related_objects
 from django.contrib.auth import get_user_model
+from blog.utils.cache import VersionedCacheMixin, bump_versions
+from blog.utils.conditional import not_modified_response, set_validators
+from blog.utils.constants import IMPORT_MAX_REPORTED_ERRORS
+from blog.utils.pagination import KeysetPagination, OldestFirstKeysetPagination
+from blog.utils.throttling import UserTokenBucketThrottle
 
 User = get_user_model()
 
@@ -37,7 +67,12 @@ class UpdatePostAPIView(generics.RetrieveUpdateAPIView):
     
     def get(self, request, *args, **kwargs):
         self.check_object_permissions(request, obj=self.get_object()) # Checks if a user owns a post to be retrieved
-        return super().get(request, *args, **kwargs)
+        # NOTE: revalidated from an aggregate query, see PostQuerySet.get_validators
+        etag, last_modified = Post.objects.filter(id=self.kwargs['id']).get_validators()
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(super().get(request, *args, **kwargs), etag, last_modified)
     
     def put(self, request, *args, **kwargs):
         self.check_object_permissions(request, obj=self.get_object()) # Checks if a user owns a post to be retrieved
@@ -54,74 +89,172 @@ class DeletePostAPIView(generics.DestroyAPIView):
         self.check_object_permissions(request, obj=self.get_object()) # Checks if a user owns a post to be retrieved        
         return super().delete(request, *args, **kwargs)
 
-class UserPostsAPIView(generics.ListAPIView):
+class UserPostsAPIView(VersionedCacheMixin, FastListMixin, generics.ListAPIView):
     """
         View for user to retrieve all there drafts or published posts
-        # NOTE: default pagination set in REST_FRAMEWORK_SETTINGS
+        # NOTE: keyset paginated, page size defaults to PAGE_SIZE in REST_FRAMEWORK settings
     """
     permission_classes = [permissions.IsAuthenticated, ]
     serializer_class = PostSerializer
+    fast_serializer_class = FastPostSerializer
+    pagination_class = KeysetPagination
     filter_backends = [filters.SearchFilter]
     search_fields = ['post_state', 'title', 'content', 'category']
 
     def get_queryset(self):
         user_posts = Post.objects.filter(
             author=self.request.user
-            ).select_related('author')
+            ).with_feed_data()
         return user_posts
+
+    def get_cache_scopes(self):
+        # "author:<id>" is never bumped, it keeps each user's pages apart
+        return [f"author:{self.request.user.id}", "posts", "profiles"]
     
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-class PublishedPostAPIView(generics.ListAPIView):
+class PublishedPostAPIView(VersionedCacheMixin, FastListMixin, generics.ListAPIView):
     """
         View for user to retrieve all published posts or a user
     """
 
     serializer_class = PostSerializer
+    fast_serializer_class = FastPostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [filters.SearchFilter]
     search_fields = ['title', 'content', 'category']
     
     def get_queryset(self):
-        user = User.objects.filter(username=self.kwargs['username']).first()     
         user_posts = Post.objects.filter(
-             author=user,
+             author__username=self.kwargs['username'],
              post_state='published'
-             )
+             ).with_feed_data()
         
         return user_posts
+
+    def get_cache_scopes(self):
+        return ["posts", "profiles"]
     
-    @method_decorator(cache_page(60 * 5), name='post_five_mins_cache')
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-class AllPostAPIView(generics.ListAPIView):
+class AllPostAPIView(VersionedCacheMixin, FastListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = PostSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['author__username', 'title', 'content', 'category']
+    fast_serializer_class = FastPostSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [FullTextSearchFilter]
 
     def get_queryset(self):
-        post_objects = Post.objects.filter(post_state='published')
+        post_objects = Post.objects.filter(post_state='published').with_feed_data()
         return post_objects
+
+    def get_cache_scopes(self):
+        return ["posts", "profiles"]
     
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
     
 
-class PostCommentAPIView(generics.ListCreateAPIView):
+class HomeTimelineAPIView(generics.ListAPIView):
+    """
+        View for the signed in user's home timeline: published posts of the users they follow
+        # NOTE: precomputed on publish, see blog/posts/timeline.py
+    """
     permission_classes = [permissions.IsAuthenticated]
+    serializer_class = PostSerializer
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginator.paginate_with(
+            lambda position, limit: home_timeline(request.user, position, limit),
+            request,
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class TrendingPostAPIView(FastListMixin, generics.ListAPIView):
+    """
+        View for the hottest published posts, see blog.posts.models.hot_score
+        # NOTE: hot_score is stored and indexed, the top ?limit= posts are an index range scan
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    serializer_class = PostSerializer
+    fast_serializer_class = FastPostSerializer
+    pagination_class = None
+    default_limit = 20
+    max_limit = 100
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    def get_queryset(self):
+        return Post.objects.filter(
+            post_state='published'
+        ).order_by('-hot_score', '-id').with_feed_data()[:self.get_limit()]
+
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class SearchPostAPIView(generics.ListAPIView):
+    """
+        View for ranked full-text search over published posts, best match first
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    serializer_class = PostSerializer
+    pagination_class = None
+    filter_backends = []
+    default_limit = 20
+    max_limit = 100
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    def get_queryset(self):
+        terms = search_terms(self.request.query_params.get('q', ''))
+        if not terms:
+            return []
+
+        ranked_ids = get_search_backend().ranked_ids(terms, self.get_limit())
+        posts = Post.objects.filter(id__in=ranked_ids).with_feed_data().in_bulk()
+        return [posts[post_id] for post_id in ranked_ids if post_id in posts]
+
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class PostCommentAPIView(VersionedCacheMixin, FastListMixin, generics.ListCreateAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle]
+    throttle_scope = "comment"
     serializer_class = PostCommentSerializer
+    fast_serializer_class = FastPostCommentSerializer
+    pagination_class = OldestFirstKeysetPagination
 
     def get_queryset(self):
         post = Post.objects.filter(id=self.kwargs["post_id"]).first()
         comments_to_post_objs = PostComment.objects.filter(
             post=post, parent_comment=None
-        ).order_by('created_at')
+        ).select_related(
+            'user_that_comment'
+        ).prefetch_related('comment_to_post_images').order_by('created_at')
         return comments_to_post_objs
 
-    @method_decorator(cache_page(60 * 5), name='users_posts_five_mins_cache')
+    def get_cache_scopes(self):
+        return [f"post:{self.kwargs['post_id']}", "profiles"]
+
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
@@ -137,6 +270,75 @@ class PostCommentAPIView(generics.ListCreateAPIView):
         context['post_id'] = self.kwargs['post_id']
         return context
     
+class PostCommentTreeAPIView(VersionedCacheMixin, generics.GenericAPIView):
+    """
+        View for retrieving a post's threaded comments, nested up to ?depth= levels.
+        # NOTE: ?parent=<comment id> returns the replies of that comment and
+        # ?after=<comment id> the siblings following it, so each level pages on its own
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CommentTreeSerializer
+    default_depth, max_depth = 3, 10
+    default_children_limit, max_children_limit = 20, 100
+
+    def get_int_param(self, name, default, maximum):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except ValueError:
+            raise ValidationError({name: "A valid integer is required."})
+        return min(max(value, 1), maximum)
+
+    def get_uuid_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            raise ValidationError({name: "Must be a valid UUID."})
+
+    def get_cache_scopes(self):
+        return [f"post:{self.kwargs['post_id']}", "profiles"]
+
+    def get(self, request, *args, **kwargs):
+        return self.get_cached_response(lambda: self.get_tree_response(request))
+
+    def get_tree_response(self, request):
+        children_limit = self.get_int_param(
+            'children_limit', self.default_children_limit, self.max_children_limit
+        )
+        comments = PostComment.objects.tree(
+            self.kwargs['post_id'],
+            parent_id=self.get_uuid_param('parent'),
+            after_id=self.get_uuid_param('after'),
+            max_depth=self.get_int_param('depth', self.default_depth, self.max_depth),
+            children_limit=children_limit,
+        )
+
+        all_comments, pending = [], list(comments)
+        while pending:
+            comment = pending.pop()
+            all_comments.append(comment)
+            pending.extend(comment.replies)
+        serializer = self.get_serializer(comments, many=True)
+        # Only load what ?fields= / ?exclude= leave in, see SparseFieldsMixin
+        prefetch_related_objects(all_comments, *(
+            lookup for lookup in ('user_that_comment', 'comment_to_post_images')
+            if lookup in serializer.child.fields
+        ))
+
+        next_link = None
+        if len(comments) == children_limit:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'after', comments[-1].id
+            )
+
+        return Response({
+            'next': next_link,
+            'results': serializer.data,
+        })
+
+
 class EditCommentAPIView(generics.RetrieveUpdateAPIView):
     serializer_class = PostCommentSerializer
     permission_classes = [permissions.IsAuthenticated, IsPostCommentOwner]
@@ -156,6 +358,8 @@ class EditCommentAPIView(generics.RetrieveUpdateAPIView):
 
 class PostReactionAPIView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle]
+    throttle_scope = "reaction"
     serializer_class = PostReactionSerializer
 
     def post(self, request, *args, **kwargs):
@@ -171,4 +375,79 @@ class DeleteReactionAPIView(generics.RetrieveDestroyAPIView):
     
     def delete(self, request, *args, **kwargs):
         self.check_object_permissions(request, obj=self.get_object())
-        return super().delete(request, *args, **kwargs)
\ No newline at end of file
+        return super().delete(request, *args, **kwargs)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # A concurrent delete of the same reaction already moved the counter
+        if instance.delete()[0] != 1:
+            return
+        Post.objects.filter(id=instance.post_id).update_reaction_counts(
+            removed=instance.reaction
+        )
+        # Child deletes send no cache signal, see blog/posts/signals.py
+        bump_versions("posts")
+
+
+class ExportAPIView(generics.GenericAPIView):
+    """
+        View streaming every post, comment or reaction as NDJSON, or CSV with ?output=csv, for analytics
+        # NOTE: ?since=<X-Export-Until of a previous export> only exports the rows modified after it
+        # (and a few minutes before, which may repeat rows), see blog/posts/export.py
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_since(self):
+        value = self.request.query_params.get('since')
+        if value is None:
+            return None
+        try:
+            return parse_timestamp(value)
+        except ValueError as error:
+            raise ValidationError({'since': str(error)})
+
+    def get(self, request, *args, **kwargs):
+        name = self.kwargs['name']
+        if name not in EXPORTS:
+            raise NotFound()
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in CONTENT_TYPES:
+            raise ValidationError({'output': f"Must be one of: {', '.join(CONTENT_TYPES)}."})
+
+        since, until = self.get_since(), timezone.now()
+        # Under ASGI a sync iterator would be read into memory before it is sent
+        stream = astream_export if isinstance(request._request, ASGIRequest) else stream_export
+        response = StreamingHttpResponse(
+            stream(name, export_format, since, until), content_type=CONTENT_TYPES[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{name}.{export_format}"'
+        response['X-Export-Until'] = format_timestamp(until)
+        return response
+
+
+class ImportPostsAPIView(generics.GenericAPIView):
+    """
+        View importing posts with their comments and reactions in bulk, from a JSON list or an NDJSON body
+        # NOTE: see blog/posts/importer.py, every chunk commits on its own and invalid records
+        # are skipped and reported by index
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        if request.content_type.startswith('application/x-ndjson'):
+            # Read line by line as the records are imported, never as a whole
+            records = read_ndjson(request.stream or ())
+        else:
+            records = request.data
+            if not isinstance(records, list):
+                raise ValidationError({'non_field_errors': ['Expected a list of posts.']})
+
+        imported = {'posts': 0, 'comments': 0, 'reactions': 0}
+        errors, error_count = [], 0
+        for counts, chunk_errors in import_records(records):
+            for name, count in counts.items():
+                imported[name] += count
+            error_count += len(chunk_errors)
+            errors += chunk_errors[:IMPORT_MAX_REPORTED_ERRORS - len(errors)]
+
+        return Response({'imported': imported, 'error_count': error_count, 'errors': errors})
@@ -0,0 +1,63 @@
+import factory
+from factory.django import DjangoModelFactory
+
+from blog.accounts.factories import UserFactory
+from blog.posts.models import Post, PostComment, PostImage, PostReaction
+
+
+class PostFactory(DjangoModelFactory):
+    class Meta:
+        model = Post
+
+    title = factory.Faker("sentence", nb_words=6)
+    author = factory.SubFactory(UserFactory)
+    content = factory.Faker("paragraph", nb_sentences=5)
+    post_state = "published"
+    category = factory.Iterator([value for value, _ in Post.CATEGORY_CHOICES])
+
+
+class PostImageFactory(DjangoModelFactory):
+    """Points at a file name only, nothing is written to storage."""
+
+    class Meta:
+        model = PostImage
+
+    post = factory.SubFactory(PostFactory)
+    image = factory.Sequence(lambda n: f"posts/images/factory-{n}.png")
+
+
+class PostCommentFactory(DjangoModelFactory):
+    """Keeps the post's comment_count in step, like the comment endpoint."""
+
+    class Meta:
+        model = PostComment
+
+    post = factory.SubFactory(PostFactory)
+    user_that_comment = factory.SubFactory(UserFactory)
+    comment = factory.Faker("sentence")
+    parent_comment = None
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        comment = super()._create(model_class, *args, **kwargs)
+        Post.objects.filter(id=comment.post_id).update_comment_count()
+        return comment
+
+
+class PostReactionFactory(DjangoModelFactory):
+    """Keeps the post's reaction counters in step, like the reaction endpoint."""
+
+    class Meta:
+        model = PostReaction
+
+    post = factory.SubFactory(PostFactory)
+    user_that_react = factory.SubFactory(UserFactory)
+    reaction = "upvote"
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        reaction = super()._create(model_class, *args, **kwargs)
+        Post.objects.filter(id=reaction.post_id).update_reaction_counts(
+            added=reaction.reaction
+        )
+        return reaction
@@ -0,0 +1,166 @@
+"""
+Bulk import of posts with their comments and reactions, e.g. when
+migrating from another platform.
+
+Records (see ImportPostSerializer) are handled IMPORT_CHUNK_SIZE at a time:
+each is validated on its own, the usernames of the whole chunk are
+resolved with one query and every valid record is written in a single
+transaction of multi-row INSERTs. An invalid record is reported with its
+index and skipped, it never fails the rest of its chunk.
+
+Imported rows keep their ``created_at`` and get the import time as
+``last_modified_at``, so the next incremental export picks them up.
+Counters, excerpts and hot scores are computed while the rows are built,
+the search index and the followers' timelines are updated per chunk.
+"""
+import json
+import uuid
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from blog.posts import timeline
+from blog.posts.api.v1.serializers import ImportPostSerializer
+from blog.posts.models import Post, PostComment, PostReaction, excerpt
+from blog.posts.search import get_search_backend
+from blog.utils.bulk import insert_instances
+from blog.utils.cache import bump_versions
+from blog.utils.constants import IMPORT_CHUNK_SIZE
+
+User = get_user_model()
+
+
+def usernames(data) -> dict:
+    """Usernames a validated record refers to, by the field they are in."""
+    names = {"author": {data["author"]}, "comments": set(), "reactions": set()}
+    pending = list(data.get("comments", ()))
+    while pending:
+        comment = pending.pop()
+        names["comments"].add(comment["user"])
+        pending.extend(comment.get("replies", ()))
+    names["reactions"].update(reaction["user"] for reaction in data.get("reactions", ()))
+    return names
+
+
+def build_comments(comments, post, parent_id, user_ids, now):
+    """PostComments of a thread, every parent before its replies."""
+    for data in comments:
+        comment = PostComment(
+            id=uuid.uuid4(),
+            post_id=post.id,
+            parent_comment_id=parent_id,
+            user_that_comment_id=user_ids[data["user"]],
+            comment=data["comment"],
+            created_at=data.get("created_at", post.created_at),
+            last_modified_at=now,
+        )
+        yield comment
+        yield from build_comments(data.get("replies", ()), post, comment.id, user_ids, now)
+
+
+def build_rows(data, user_ids, now):
+    post = Post(
+        id=uuid.uuid4(),
+        author_id=user_ids[data["author"]],
+        title=data["title"],
+        content=data["content"],
+        excerpt=excerpt(data["content"]),
+        category=data["category"],
+        post_state=data["post_state"],
+        created_at=data.get("created_at", now),
+        last_modified_at=now,
+    )
+    comments = list(build_comments(data.get("comments", ()), post, None, user_ids, now))
+    reactions = [
+        PostReaction(
+            id=uuid.uuid4(),
+            post_id=post.id,
+            user_that_react_id=user_ids[reaction["user"]],
+            reaction=reaction["reaction"],
+            created_at=reaction.get("created_at", post.created_at),
+            last_modified_at=now,
+        )
+        for reaction in data.get("reactions", ())
+    ]
+    post.upvote_count = sum(reaction.reaction == "upvote" for reaction in reactions)
+    post.downvote_count = len(reactions) - post.upvote_count
+    post.comment_count = len(comments)
+    post.hot_score = post.compute_hot_score()
+    return post, comments, reactions
+
+
+def import_chunk(records, offset=0):
+    """
+    Import one chunk of records, dicts or NDJSON lines (bytes), the first one
+    being record number ``offset``. Returns ``(counts, errors)``.
+    """
+    serializer = ImportPostSerializer()
+    valid, errors = [], []
+    for index, record in enumerate(records, offset):
+        try:
+            if isinstance(record, bytes):
+                record = json.loads(record)
+            valid.append((index, serializer.run_validation(record)))
+        except json.JSONDecodeError as error:
+            errors.append({"index": index, "errors": {"non_field_errors": [f"Invalid JSON: {error}"]}})
+        except ValidationError as error:
+            errors.append({"index": index, "errors": error.detail})
+
+    record_usernames = [usernames(data) for _, data in valid]
+    users = list(User.objects.filter(
+        username__in=set().union(*(names for fields in record_usernames for names in fields.values()))
+    ).only("id", "username"))
+    user_ids = {user.username: user.id for user in users}
+
+    now = timezone.now()
+    posts, comments, reactions = [], [], []
+    for (index, data), fields in zip(valid, record_usernames):
+        unknown = {
+            field: [f"Unknown user(s): {', '.join(sorted(names - user_ids.keys()))}."]
+            for field, names in fields.items() if names - user_ids.keys()
+        }
+        if unknown:
+            errors.append({"index": index, "errors": unknown})
+            continue
+        post, post_comments, post_reactions = build_rows(data, user_ids, now)
+        posts.append(post)
+        comments += post_comments
+        reactions += post_reactions
+
+    with transaction.atomic():
+        # Parents before children. No post_save signals run, their work follows
+        insert_instances(Post, posts)
+        insert_instances(PostComment, comments)
+        insert_instances(PostReaction, reactions)
+        get_search_backend().index_posts(posts)
+        timeline.fan_out_posts([post.id for post in posts])
+        if posts:
+            bump_versions("posts")
+
+    errors.sort(key=lambda error: error["index"])
+    return {"posts": len(posts), "comments": len(comments), "reactions": len(reactions)}, errors
+
+
+def import_records(records, chunk_size=IMPORT_CHUNK_SIZE, skip=0):
+    """
+    Import an iterable of records chunk by chunk, yielding the
+    ``(counts, errors)`` of each chunk once it is committed. ``skip``
+    resumes an import after the records an earlier run committed.
+    """
+    records = iter(records)
+    offset = skip
+    for _ in islice(records, skip):
+        pass
+    while chunk := list(islice(records, chunk_size)):
+        yield import_chunk(chunk, offset)
+        offset += len(chunk)
+
+
+def read_ndjson(lines):
+    """The records of an NDJSON stream, one per non-blank line."""
+    for line in lines:
+        if line.strip():
+            yield line
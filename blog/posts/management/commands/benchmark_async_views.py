@@ -0,0 +1,142 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import reverse
+
+from blog.posts.models import Post, PostComment
+from blog.utils.authentication import refresh_token_for_user
+
+User = get_user_model()
+
+DUMMY_CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+SEED_PREFIX = "async_benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the concurrent-request throughput of the sync (WSGI) post "
+        "and comment endpoints with their async (ASGI) variants, in process. "
+        "Runs against a throwaway test database: the requests come from other "
+        "threads, which a rolled back transaction would hide the rows from."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument("--comments", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument(
+            "--cached",
+            action="store_true",
+            help="Keep the response cache enabled instead of measuring the database path.",
+        )
+
+    def handle(self, *args, **options):
+        overrides = {"ALLOWED_HOSTS": ["testserver"]}
+        if not options["cached"]:
+            overrides["CACHES"] = DUMMY_CACHES
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            author, post = self.seed(options["posts"], options["comments"])
+            with override_settings(**overrides):
+                self.run(author, post, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def run(self, author, post, options):
+        token = f"Bearer {refresh_token_for_user(author).access_token}"
+        endpoints = {
+            "feed": (
+                reverse("posts:all_posts"),
+                reverse("posts:async_all_posts"),
+            ),
+            "post detail": (
+                reverse("posts:update_post", kwargs={"id": post.id}),
+                reverse("posts:async_post_detail", kwargs={"id": post.id}),
+            ),
+            "comments": (
+                reverse("posts:post_comment", kwargs={"post_id": post.id}),
+                reverse("posts:async_post_comment", kwargs={"post_id": post.id}),
+            ),
+        }
+
+        for name, (sync_url, async_url) in endpoints.items():
+            wsgi = self.measure_wsgi(sync_url, token, options)
+            asgi = asyncio.run(self.measure_asgi(async_url, token, options))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            for label, stats in (("wsgi", wsgi), ("asgi", asgi)):
+                self.stdout.write(
+                    f"  {label}: {stats['throughput']:8.1f} req/s  "
+                    f"p50 {stats['p50']:7.2f} ms  p95 {stats['p95']:7.2f} ms"
+                )
+
+    def measure_wsgi(self, url, token, options):
+        client = Client(HTTP_AUTHORIZATION=token)
+
+        def request(_):
+            start = time.perf_counter()
+            response = client.get(url)
+            self.check_response(url, response)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            timings = list(executor.map(request, range(options["requests"])))
+        return self.summarize(timings, time.perf_counter() - start)
+
+    async def measure_asgi(self, url, token, options):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def request():
+            async with semaphore:
+                start = time.perf_counter()
+                # Client wide headers are not forwarded to the ASGI scope
+                response = await client.get(url, headers={"Authorization": token})
+                self.check_response(url, response)
+                return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(request() for _ in range(options["requests"])))
+        return self.summarize(timings, time.perf_counter() - start)
+
+    def check_response(self, url, response):
+        if response.status_code != 200:
+            raise CommandError(f"{url}: HTTP {response.status_code}")
+
+    def summarize(self, timings, elapsed):
+        percentiles = statistics.quantiles(timings, n=100)
+        return {
+            "throughput": len(timings) / elapsed,
+            "p50": statistics.median(timings),
+            "p95": percentiles[94],
+        }
+
+    def seed(self, number_of_posts, number_of_comments):
+        author = User.objects.create(
+            username=f"{SEED_PREFIX}_author",
+            email="async@bench.io",
+            first_name="Benchmark",
+        )
+        posts = Post.objects.bulk_create(
+            Post(
+                author=author,
+                title=f"Benchmark post {i}",
+                content="content",
+                category="travel",
+                post_state="published",
+            )
+            for i in range(number_of_posts)
+        )
+        PostComment.objects.bulk_create(
+            PostComment(post=posts[0], user_that_comment=author, comment=f"comment {i}")
+            for i in range(number_of_comments)
+        )
+        return author, posts[0]
@@ -0,0 +1,309 @@
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from blog.accounts.api.v1 import urls as accounts_urls
+from blog.accounts.factories import PASSWORD, UserFactory
+from blog.accounts.models import Follow
+from blog.posts import timeline
+from blog.posts.api.v1 import urls as posts_urls
+from blog.posts.factories import (
+    PostCommentFactory,
+    PostFactory,
+    PostImageFactory,
+    PostReactionFactory,
+)
+from blog.utils.authentication import refresh_token_for_user
+from blog.utils.throttling import unthrottled_buckets
+
+DUMMY_CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+# Transaction control the benchmark itself adds around every request
+SAVEPOINT_SQL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every endpoint of the accounts and posts APIs against a fixture "
+        "built from the factories and report p50/p95/p99 latency and query "
+        "counts. --output writes them as a JSON baseline, --baseline compares "
+        "against one and fails on more queries or a slower p95. Every request "
+        "is rolled back, so each one sees the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=20)
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--baseline", help="Compare the results with this JSON file.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed relative p95 slowdown against --baseline.",
+        )
+        parser.add_argument(
+            "--cached",
+            action="store_true",
+            help="Keep the response cache enabled instead of measuring the database path.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("--requests must be at least 2.")
+
+        overrides = {
+            "ALLOWED_HOSTS": ["testserver"],
+            "THROTTLE_BUCKETS": unthrottled_buckets(),
+        }
+        if not options["cached"]:
+            overrides["CACHES"] = DUMMY_CACHES
+
+        with override_settings(**overrides), transaction.atomic():
+            fixture = self.seed(options["posts"])
+            endpoints = self.get_endpoints(fixture)
+            self.warn_about_uncovered(endpoints)
+            results = {
+                name: self.measure(fixture, endpoint, options["requests"])
+                for name, endpoint in endpoints.items()
+            }
+            transaction.set_rollback(True)
+
+        self.report(results)
+        report = {
+            "environment": {
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "requests": options["requests"],
+                "posts": options["posts"],
+                "cached": options["cached"],
+            },
+            "endpoints": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2, sort_keys=True)
+            self.stdout.write(f"\nResults written to {options['output']}")
+
+        failures = [
+            f"{name}: HTTP {result['status']}"
+            for name, result in results.items()
+            if result["status"] >= 400
+        ]
+        if options["baseline"]:
+            failures += self.compare(results, options["baseline"], options["tolerance"])
+        if failures:
+            raise CommandError("\n".join(failures))
+
+    def seed(self, number_of_posts):
+        author, reader, other = UserFactory.create_batch(3)
+        staff = UserFactory(is_staff=True)
+        posts = PostFactory.create_batch(number_of_posts, author=author)
+        replies = []
+        for post in posts:
+            PostImageFactory.create_batch(2, post=post)
+            PostReactionFactory(post=post, user_that_react=reader)
+            comment = PostCommentFactory(post=post, user_that_comment=reader)
+            replies.append(PostCommentFactory(
+                post=post, user_that_comment=author, parent_comment=comment
+            ))
+        PostFactory(author=author, post_state="draft")
+
+        Follow.objects.follow(reader, author)
+        timeline.on_follow(reader, author)
+
+        return {
+            "author": author,
+            "reader": reader,
+            "other": other,
+            "staff": staff,
+            "post": posts[0],
+            "last_post": posts[-1],
+            "comment": replies[0],
+            "reaction": PostReactionFactory(post=posts[1], user_that_react=author),
+            "tokens": {
+                user: f"Bearer {refresh_token_for_user(user).access_token}"
+                for user in (author, reader, staff)
+            },
+        }
+
+    def get_endpoints(self, fixture):
+        """
+        name -> (method, url, data, user sending it), the user being
+        "author" (owns the posts), "reader" (follows the author), "staff"
+        or None.
+        """
+        author, post = fixture["author"], fixture["post"]
+        post_id = {"post_id": post.id}
+        new_password = "benchmark-new-password"
+
+        return {
+            "accounts:sign_up POST": ("post", reverse("accounts:sign_up"), {
+                "first_name": "Bench", "last_name": "Mark", "username": "benchmark_sign_up",
+                "email": "signup@bench.io", "password": PASSWORD,
+            }, None),
+            "accounts:sign_in POST": ("post", reverse("accounts:sign_in"), {
+                "email_or_username": author.username, "password": PASSWORD,
+            }, None),
+            "accounts:change_password PUT": ("put", reverse("accounts:change_password"), {
+                "old_password": PASSWORD, "new_password": new_password,
+                "confirm_password": new_password,
+            }, "author"),
+            "accounts:retrieve_update_profile GET": (
+                "get", reverse("accounts:retrieve_update_profile"), None, "author",
+            ),
+            "accounts:retrieve_update_profile PUT": (
+                "put", reverse("accounts:retrieve_update_profile"), {"first_name": "Renamed"}, "author",
+            ),
+            "accounts:follow POST": (
+                "post", reverse("accounts:follow", kwargs={"username": fixture["other"].username}), None, "author",
+            ),
+            "accounts:follow DELETE": (
+                "delete", reverse("accounts:follow", kwargs={"username": author.username}), None, "reader",
+            ),
+            "posts:create_post POST": ("post", reverse("posts:create_post"), {
+                "title": "Benchmark post", "content": "content", "category": "travel",
+                "post_state": "published",
+            }, "author"),
+            "posts:update_post GET": (
+                "get", reverse("posts:update_post", kwargs={"id": post.id}), None, "author",
+            ),
+            "posts:update_post PUT": ("put", reverse("posts:update_post", kwargs={"id": post.id}), {
+                "title": "Updated", "content": "content", "category": "travel",
+                "post_state": "published",
+            }, "author"),
+            "posts:delete_post DELETE": (
+                "delete", reverse("posts:delete_post", kwargs={"id": fixture["last_post"].id}), None, "author",
+            ),
+            "posts:user_posts GET": ("get", reverse("posts:user_posts"), None, "author"),
+            "posts:all_posts GET": ("get", reverse("posts:all_posts"), None, None),
+            "posts:search_posts GET": (
+                "get", f"{reverse('posts:search_posts')}?q={post.title.split()[0]}", None, None,
+            ),
+            "posts:home_timeline GET": ("get", reverse("posts:home_timeline"), None, "reader"),
+            "posts:trending_posts GET": ("get", reverse("posts:trending_posts"), None, None),
+            "posts:user_published_posts GET": (
+                "get", reverse("posts:user_published_posts", kwargs={"username": author.username}), None, "reader",
+            ),
+            "posts:post_comment GET": (
+                "get", reverse("posts:post_comment", kwargs=post_id), None, "reader",
+            ),
+            "posts:post_comment POST": (
+                "post", reverse("posts:post_comment", kwargs=post_id), {"comment": "Benchmark"}, "reader",
+            ),
+            "posts:post_comment_tree GET": (
+                "get", reverse("posts:post_comment_tree", kwargs=post_id), None, "reader",
+            ),
+            "posts:edit_comment GET": (
+                "get", reverse("posts:edit_comment", kwargs={"comment_id": fixture["comment"].id}), None, "author",
+            ),
+            "posts:edit_comment PUT": (
+                "put", reverse("posts:edit_comment", kwargs={"comment_id": fixture["comment"].id}),
+                {"comment": "Edited"}, "author",
+            ),
+            "posts:post_reaction POST": ("post", reverse("posts:post_reaction"), {
+                "post": str(post.id), "reaction": "downvote",
+            }, "reader"),
+            "posts:delete_reaction DELETE": (
+                "delete", reverse("posts:delete_reaction", kwargs={"reaction_id": fixture["reaction"].id}),
+                None, "author",
+            ),
+            "posts:export GET": (
+                "get", reverse("posts:export", kwargs={"name": "posts"}), None, "staff",
+            ),
+            "posts:import_posts POST": ("post", reverse("posts:import_posts"), [{
+                "author": author.username, "title": "Imported post", "content": "content",
+                "category": "travel", "post_state": "published",
+                "comments": [{"user": fixture["reader"].username, "comment": "Imported"}],
+                "reactions": [{"user": fixture["reader"].username, "reaction": "upvote"}],
+            }], "staff"),
+            "posts:async_all_posts GET": ("get", reverse("posts:async_all_posts"), None, None),
+            "posts:async_post_detail GET": (
+                "get", reverse("posts:async_post_detail", kwargs={"id": post.id}), None, "author",
+            ),
+            "posts:async_post_comment GET": (
+                "get", reverse("posts:async_post_comment", kwargs=post_id), None, "reader",
+            ),
+        }
+
+    def warn_about_uncovered(self, endpoints):
+        covered = {name.split()[0] for name in endpoints}
+        for urls in (accounts_urls, posts_urls):
+            for pattern in urls.urlpatterns:
+                url_name = f"{urls.app_name}:{pattern.name}"
+                if url_name not in covered:
+                    self.stdout.write(self.style.WARNING(f"{url_name} is not benchmarked"))
+
+    def measure(self, fixture, endpoint, requests):
+        method, url, data, user = endpoint
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=fixture["tokens"][fixture[user]])
+
+        timings, query_counts, status = [], [], None
+        # The first request warms up imports and lazy setup and is not counted
+        for _ in range(requests + 1):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = getattr(client, method)(url, data, format="json")
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                    timings.append((time.perf_counter() - start) * 1000)
+                transaction.set_rollback(True)
+
+            status = response.status_code
+            query_counts.append(sum(
+                not query["sql"].startswith(SAVEPOINT_SQL) for query in queries
+            ))
+
+        percentiles = statistics.quantiles(timings[1:], n=100, method="inclusive")
+        return {
+            "status": status,
+            "queries": max(query_counts[1:]),
+            "p50_ms": round(percentiles[49], 3),
+            "p95_ms": round(percentiles[94], 3),
+            "p99_ms": round(percentiles[98], 3),
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'endpoint':45} {'status':>6} {'queries':>7} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:45} {result['status']:>6} {result['queries']:>7} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+            )
+
+    def compare(self, results, baseline_path, tolerance):
+        with open(baseline_path) as file:
+            baseline = json.load(file)["endpoints"]
+
+        failures = []
+        for name, result in results.items():
+            if name not in baseline:
+                self.stdout.write(f"{name}: not in the baseline")
+                continue
+            expected = baseline[name]
+            if result["queries"] > expected["queries"]:
+                failures.append(
+                    f"{name}: {result['queries']} queries, baseline {expected['queries']}"
+                )
+            if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+                failures.append(
+                    f"{name}: p95 {result['p95_ms']:.2f} ms, "
+                    f"baseline {expected['p95_ms']:.2f} ms (+{tolerance:.0%} allowed)"
+                )
+        if not failures:
+            self.stdout.write(self.style.SUCCESS(f"\nNo regressions against {baseline_path}"))
+        return failures
@@ -0,0 +1,167 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.posts.models import Post, PostComment, PostReaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset and report query plans and latency of the "
+        "hot feed/comment/reaction lookups with and without the indexes from "
+        "migration 0006. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--posts", type=int, default=20000)
+        parser.add_argument("--comments", type=int, default=20000)
+        parser.add_argument("--reactions", type=int, default=50000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        with transaction.atomic():
+            self.stdout.write("Seeding...")
+            lookups = self.get_lookups(self.seed(rng, options))
+
+            after = self.measure(lookups, options["repeat"], "after")
+            self.drop_indexes()
+            before = self.measure(lookups, options["repeat"], "before")
+
+            for name in lookups:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+                self.stdout.write(
+                    f"  before: {before[name]['latency']:.3f} ms\n"
+                    f"    {self.indent(before[name]['plan'])}\n"
+                    f"  after:  {after[name]['latency']:.3f} ms\n"
+                    f"    {self.indent(after[name]['plan'])}"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, rng, options):
+        users = User.objects.bulk_create(
+            User(
+                username=f"benchmark_user_{i}",
+                # CustomUser.email is at most 20 characters
+                email=f"b{i}@bench.io",
+                first_name="Benchmark",
+            )
+            for i in range(options["users"])
+        )
+        posts = Post.objects.bulk_create(
+            (
+                Post(
+                    author=rng.choice(users),
+                    title=f"Benchmark post {i}",
+                    content="content",
+                    category=rng.choice(Post.CATEGORY_CHOICES)[0],
+                    post_state=rng.choice(Post.POST_CHOICES)[0],
+                )
+                for i in range(options["posts"])
+            ),
+            batch_size=1000,
+        )
+        PostComment.objects.bulk_create(
+            (
+                PostComment(
+                    post=rng.choice(posts),
+                    user_that_comment=rng.choice(users),
+                    comment="comment",
+                )
+                for _ in range(options["comments"])
+            ),
+            batch_size=1000,
+        )
+
+        pairs = set()
+        while len(pairs) < min(options["reactions"], len(posts) * len(users)):
+            pairs.add((rng.randrange(len(posts)), rng.randrange(len(users))))
+        PostReaction.objects.bulk_create(
+            (
+                PostReaction(
+                    post=posts[post_index],
+                    user_that_react=users[user_index],
+                    reaction=rng.choice(PostReaction.REACTION_CHOICES)[0],
+                )
+                for post_index, user_index in pairs
+            ),
+            batch_size=1000,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return users, posts
+
+    def get_lookups(self, seeded):
+        users, posts = seeded
+        author, post = users[0], posts[0]
+        reaction = PostReaction.objects.first()
+
+        return {
+            "all posts feed": Post.objects.filter(
+                post_state="published"
+            ).order_by("-created_at", "-id")[:20],
+            "author published feed": Post.objects.filter(
+                author=author, post_state="published"
+            ).order_by("-created_at", "-id")[:20],
+            "author posts feed": Post.objects.filter(
+                author=author
+            ).order_by("-created_at", "-id")[:20],
+            "post comments": PostComment.objects.filter(
+                post=post, parent_comment=None
+            ).order_by("created_at", "id")[:20],
+            "reaction lookup": PostReaction.objects.filter(
+                post=reaction.post_id, user_that_react=reaction.user_that_react_id
+            )[:1],
+        }
+
+    def measure(self, lookups, repeat, phase):
+        results = {}
+        for name, queryset in lookups.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = {
+                "plan": self.explain(queryset, phase),
+                "latency": statistics.median(timings),
+            }
+        return results
+
+    def explain(self, queryset, phase):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # The comment keeps SQLite from reusing a plan cached in the other phase
+            cursor.execute(
+                f"{connection.ops.explain_query_prefix()} {sql} /* {phase} */", params
+            )
+            return "\n".join(
+                " ".join(str(column) for column in row) for row in cursor.fetchall()
+            )
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in (Post, PostComment):
+                for index in model._meta.indexes:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+
+            # SQLite keeps the unique constraint inside the table definition
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    f"ALTER TABLE {PostReaction._meta.db_table} "
+                    "DROP CONSTRAINT unique_post_reaction"
+                )
+
+    def indent(self, plan):
+        return plan.replace("\n", "\n    ")
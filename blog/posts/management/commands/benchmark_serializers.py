@@ -0,0 +1,129 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from blog.posts.api.v1.fast_serializers import FastPostCommentSerializer, FastPostSerializer
+from blog.posts.api.v1.serializers import PostCommentSerializer, PostSerializer
+from blog.posts.models import CommentToPostImages, Post, PostComment, PostImage, excerpt
+from blog.utils.renderers import FastJSONRenderer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway page of posts and comments and compare rows/s of "
+        "PostSerializer and PostCommentSerializer with their fast read "
+        "serializers, from query to JSON bytes. Fails if the bytes differ. "
+        "Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        request = Request(RequestFactory().get("/"))
+        context = {"request": request}
+
+        with override_settings(ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+            post = self.seed(rows)
+            posts = Post.objects.filter(author__username="serializer_benchmark")
+            comments = PostComment.objects.filter(post=post)
+
+            cases = {
+                "posts": (
+                    lambda: self.drf(
+                        posts.with_feed_data(), PostSerializer, context
+                    ),
+                    lambda: self.fast(posts, FastPostSerializer, context),
+                ),
+                "comments": (
+                    lambda: self.drf(
+                        comments.select_related("user_that_comment").prefetch_related(
+                            "comment_to_post_images"
+                        ),
+                        PostCommentSerializer,
+                        context,
+                    ),
+                    lambda: self.fast(comments, FastPostCommentSerializer, context),
+                ),
+            }
+            for name, (drf, fast) in cases.items():
+                if drf() != fast():
+                    raise CommandError(f"{name}: fast serializer output differs")
+
+                drf_seconds = self.measure(drf, repeat)
+                fast_seconds = self.measure(fast, repeat)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name} ({rows} rows)"))
+                self.stdout.write(
+                    f"  DRF serializer:  {drf_seconds * 1000:8.2f} ms  {rows / drf_seconds:10,.0f} rows/s\n"
+                    f"  fast serializer: {fast_seconds * 1000:8.2f} ms  {rows / fast_seconds:10,.0f} rows/s"
+                    f"  ({drf_seconds / fast_seconds:.1f}x)"
+                )
+
+            transaction.set_rollback(True)
+
+    def drf(self, queryset, serializer_class, context):
+        data = serializer_class(list(queryset), many=True, context=context).data
+        return JSONRenderer().render(data)
+
+    def fast(self, queryset, serializer_class, context):
+        serializer = serializer_class(context=context)
+        data = serializer.get_data(list(serializer.get_queryset(queryset)))
+        return FastJSONRenderer().render(data)
+
+    def measure(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
+
+    def seed(self, rows):
+        author = User.objects.create(
+            username="serializer_benchmark",
+            email="serializer@bench.io",
+            first_name="Serializer",
+            image="accounts/images/benchmark.png",
+            image_variants={"thumbnail": "variants/benchmark-320.webp"},
+        )
+        content = "Some content. " * 20
+        posts = Post.objects.bulk_create(
+            Post(
+                author=author,
+                title=f"Benchmark post {i}",
+                content=content,
+                excerpt=excerpt(content),
+                category="travel",
+                post_state="published",
+            )
+            for i in range(rows)
+        )
+        PostImage.objects.bulk_create(
+            PostImage(
+                post=post,
+                image=f"posts/images/benchmark-{i}-{n}.png",
+                image_variants={"thumbnail": f"variants/benchmark-{i}-{n}-320.webp"},
+            )
+            for i, post in enumerate(posts)
+            for n in range(2)
+        )
+        comments = PostComment.objects.bulk_create(
+            PostComment(post=posts[0], user_that_comment=author, comment=f"Comment {i}")
+            for i in range(rows)
+        )
+        CommentToPostImages.objects.bulk_create(
+            CommentToPostImages(comment_to_post=comment, post_image=f"comments/{i}.png")
+            for i, comment in enumerate(comments)
+        )
+        return posts[0]
@@ -0,0 +1,55 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.posts.export import (
+    CONTENT_TYPES,
+    EXPORTS,
+    format_timestamp,
+    parse_timestamp,
+    stream_export,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every post, comment or reaction as NDJSON or CSV to --output "
+        "(stdout by default) in constant memory. --since exports only the "
+        "rows modified after it, pass the 'until' a previous export printed. "
+        "Rows modified shortly before --since are exported again, upsert them "
+        "by id."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=list(EXPORTS))
+        parser.add_argument("--format", choices=list(CONTENT_TYPES), default="ndjson")
+        parser.add_argument("--since", help="ISO 8601 date and time, e.g. 2026-01-31T00:00:00Z.")
+        parser.add_argument("--output", help="Write the export to this file.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = parse_timestamp(options["since"])
+            except ValueError as error:
+                raise CommandError(str(error))
+        until = timezone.now()
+
+        chunks = stream_export(options["name"], options["format"], since, until)
+        written = 0
+        if options["output"]:
+            with open(options["output"], "wb") as file:
+                for chunk in chunks:
+                    written += file.write(chunk)
+        else:
+            for chunk in chunks:
+                written += sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+
+        # stderr, stdout may be the export itself
+        self.stderr.write(
+            f"Exported {options['name']} modified until {format_timestamp(until)} "
+            f"({written:,} bytes), pass it as --since to the next export.",
+            style_func=self.style.SUCCESS,
+        )
@@ -0,0 +1,69 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.posts.importer import import_records, read_ndjson
+from blog.utils.constants import IMPORT_CHUNK_SIZE
+from blog.utils.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts with their comments and reactions from an NDJSON file, "
+        "one post per line (or a JSON list), see blog/posts/importer.py. "
+        "Every chunk commits on its own: after a failure, rerun with --skip "
+        "set to the number of records already processed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, - for stdin.")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument("--skip", type=int, default=0)
+        parser.add_argument(
+            "--errors", help="Write the invalid records' errors to this NDJSON file."
+        )
+
+    def handle(self, *args, **options):
+        file = sys.stdin.buffer if options["path"] == "-" else open(options["path"], "rb")
+        errors_file = open(options["errors"], "wb") if options["errors"] else None
+        render = FastJSONRenderer().render
+        start = time.perf_counter()
+
+        try:
+            if file.peek(64).lstrip().startswith(b"["):
+                records = json.load(file)
+            else:
+                records = read_ndjson(file)
+
+            totals = {"posts": 0, "comments": 0, "reactions": 0}
+            processed, invalid = options["skip"], 0
+            for counts, errors in import_records(records, options["chunk_size"], options["skip"]):
+                for name, count in counts.items():
+                    totals[name] += count
+                processed += counts["posts"] + len(errors)
+                invalid += len(errors)
+
+                for error in errors:
+                    if errors_file:
+                        errors_file.write(render(error) + b"\n")
+                    else:
+                        self.stderr.write(f"record {error['index']}: {render(error['errors']).decode()}")
+                self.stdout.write(
+                    f"  {processed:,} records processed: {totals['posts']:,} posts, "
+                    f"{totals['comments']:,} comments, {totals['reactions']:,} reactions, "
+                    f"{invalid:,} invalid"
+                )
+        finally:
+            if file is not sys.stdin.buffer:
+                file.close()
+            if errors_file:
+                errors_file.close()
+
+        elapsed = time.perf_counter() - start
+        rows = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s), "
+            f"{invalid:,} invalid records skipped."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.comment_count and, with it, Post.hot_score."
+
+    def handle(self, *args, **options):
+        updated = Post.objects.recompute_comment_counts()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed hot scores for {updated} posts"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.upvote_count/downvote_count from PostReaction rows."
+
+    def handle(self, *args, **options):
+        updated = Post.objects.recompute_reaction_counts()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed reaction counts for {updated} posts"))
@@ -0,0 +1,236 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.posts.models import (
+    Post,
+    PostComment,
+    PostImage,
+    PostReaction,
+    excerpt,
+    hot_score,
+)
+from blog.posts.search import get_search_backend
+from blog.utils.bulk import insert_rows
+
+User = get_user_model()
+
+SEED_PREFIX = "seed"
+# Every seeded user signs in with this password
+SEED_PASSWORD = "seed-password"
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a reproducible dataset of users, posts, images, "
+        "comments and reactions using bulk inserts, e.g. --users 100000 "
+        "--posts 1000000 --reactions 10000000. The same --seed always yields "
+        "the same rows. Activity is long-tailed: a few posts get most of it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--posts", type=int, default=10000)
+        parser.add_argument("--images-per-post", type=int, default=1)
+        parser.add_argument("--comments", type=int, default=20000)
+        parser.add_argument("--reactions", type=int, default=50000)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{SEED_PREFIX}_").exists():
+            raise CommandError(
+                "Seeded users already exist, seed into an empty database "
+                "(e.g. after `manage.py flush`)."
+            )
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+
+        rng = random.Random(options["seed"])
+        start = time.perf_counter()
+
+        user_ids = self.seed_users(rng, options["users"], options["batch_size"])
+        totals = self.seed_posts(rng, user_ids, options)
+
+        self.stdout.write("Rebuilding the search index...")
+        get_search_backend().rebuild()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        elapsed = time.perf_counter() - start
+        rows = len(user_ids) + sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(user_ids):,} users, "
+            + ", ".join(f"{count:,} {name}" for name, count in totals.items())
+            + f" in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s)"
+        ))
+
+    def new_id(self, rng):
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def seed_users(self, rng, number_of_users, batch_size):
+        # Hashing is the slow part of creating users, every one shares a hash
+        password = make_password(SEED_PASSWORD)
+        user_ids = [self.new_id(rng) for _ in range(number_of_users)]
+
+        for start in range(0, number_of_users, batch_size):
+            User.objects.bulk_create(
+                User(
+                    id=user_ids[i],
+                    username=f"{SEED_PREFIX}_{i}",
+                    # CustomUser.email is at most 20 characters
+                    email=f"s{i}@seed.io",
+                    first_name="Seed",
+                    last_name=str(i),
+                    password=password,
+                )
+                for i in range(start, min(start + batch_size, number_of_users))
+            )
+            self.stdout.write(f"  users: {min(start + batch_size, number_of_users):,}")
+        return user_ids
+
+    def long_tail(self, rng, total, buckets, cap=None):
+        """
+        Split ``total`` over ``buckets`` following a Pareto distribution,
+        none getting more than ``cap``.
+        """
+        if buckets == 0:
+            return []
+        if cap is not None:
+            total = min(total, buckets * cap)
+            if cap == 0:
+                return [0] * buckets
+
+        weights = [rng.paretovariate(1.2) for _ in range(buckets)]
+        scale = total / sum(weights)
+        counts = [int(weight * scale) for weight in weights]
+        if cap is not None:
+            counts = [min(count, cap) for count in counts]
+
+        # Hand out what rounding and the cap left over, one at a time
+        remaining, i = total - sum(counts), rng.randrange(buckets)
+        while remaining:
+            if cap is None or counts[i] < cap:
+                counts[i] += 1
+                remaining -= 1
+            i = (i + 1) % buckets
+        return counts
+
+    def seed_posts(self, rng, user_ids, options):
+        number_of_posts, batch_size = options["posts"], options["batch_size"]
+        comment_counts = self.long_tail(rng, options["comments"], number_of_posts)
+        # A user reacts to a post at most once
+        reaction_counts = self.long_tail(
+            rng, options["reactions"], number_of_posts, cap=len(user_ids)
+        )
+        categories = [value for value, _ in Post.CATEGORY_CHOICES]
+        totals = {"posts": 0, "images": 0, "comments": 0, "reactions": 0}
+
+        db_uuid = self.get_uuid_adapter()
+        db_datetime = connection.ops.adapt_datetimefield_value
+        no_variants = PostImage._meta.get_field("image_variants").get_db_prep_save(
+            {}, connection
+        )
+        # Posts are spread evenly over the last --days, oldest first
+        now = timezone.now()
+        first_post_at = now - timedelta(days=options["days"])
+        post_interval = timedelta(days=options["days"]) / max(number_of_posts, 1)
+
+        for start in range(0, number_of_posts, batch_size):
+            posts, images, comments, reactions = [], [], [], []
+
+            for i in range(start, min(start + batch_size, number_of_posts)):
+                post_id = db_uuid(self.new_id(rng))
+                created_at = first_post_at + post_interval * i
+                db_created_at = db_datetime(created_at)
+
+                upvotes = downvotes = 0
+                for user_index in rng.sample(range(len(user_ids)), reaction_counts[i]):
+                    reaction = "upvote" if rng.random() < 0.8 else "downvote"
+                    if reaction == "upvote":
+                        upvotes += 1
+                    else:
+                        downvotes += 1
+                    reactions.append({
+                        "id": db_uuid(self.new_id(rng)),
+                        "created_at": db_created_at,
+                        "last_modified_at": db_created_at,
+                        "post_id": post_id,
+                        "user_that_react_id": db_uuid(user_ids[user_index]),
+                        "reaction": reaction,
+                    })
+
+                comment_ids = []
+                for _ in range(comment_counts[i]):
+                    # Roughly a third of the comments reply to an earlier one
+                    parent_id = None
+                    if comment_ids and rng.random() < 0.3:
+                        parent_id = rng.choice(comment_ids)
+                    comment_ids.append(db_uuid(self.new_id(rng)))
+                    comments.append({
+                        "id": comment_ids[-1],
+                        "created_at": db_created_at,
+                        "last_modified_at": db_created_at,
+                        "post_id": post_id,
+                        "parent_comment_id": parent_id,
+                        "user_that_comment_id": db_uuid(rng.choice(user_ids)),
+                        "comment": f"Seeded comment {len(comment_ids)} on post {i}",
+                    })
+
+                for n in range(options["images_per_post"]):
+                    images.append({
+                        "id": db_uuid(self.new_id(rng)),
+                        "created_at": db_created_at,
+                        "last_modified_at": db_created_at,
+                        "post_id": post_id,
+                        "image": f"posts/images/{SEED_PREFIX}-{i}-{n}.png",
+                        "image_variants": no_variants,
+                    })
+
+                content = f"Seeded content of post {i}. " * rng.randint(1, 20)
+                posts.append({
+                    "id": post_id,
+                    "created_at": db_created_at,
+                    "last_modified_at": db_created_at,
+                    "title": f"Seeded post {i} about {rng.choice(categories)}",
+                    "author_id": db_uuid(rng.choice(user_ids)),
+                    "content": content,
+                    "excerpt": excerpt(content),
+                    "post_state": "published" if rng.random() < 0.9 else "draft",
+                    "category": rng.choice(categories),
+                    "upvote_count": upvotes,
+                    "downvote_count": downvotes,
+                    "comment_count": len(comment_ids),
+                    "hot_score": hot_score(upvotes, downvotes, len(comment_ids), created_at),
+                })
+
+            # Parents before children. No post_save signals run, the search
+            # index is rebuilt at the end
+            with transaction.atomic():
+                insert_rows(Post, posts)
+                insert_rows(PostImage, images)
+                insert_rows(PostComment, comments)
+                insert_rows(PostReaction, reactions)
+
+            totals["posts"] += len(posts)
+            totals["images"] += len(images)
+            totals["comments"] += len(comments)
+            totals["reactions"] += len(reactions)
+            self.stdout.write(
+                f"  posts: {totals['posts']:,}  comments: {totals['comments']:,}  "
+                f"reactions: {totals['reactions']:,}"
+            )
+        return totals
+
+    def get_uuid_adapter(self):
+        """What UUIDField.get_db_prep_value() does, without the per-value overhead."""
+        if connection.features.has_native_uuid_field:
+            return lambda value: value
+        return lambda value: value.hex
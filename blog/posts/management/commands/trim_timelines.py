@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.posts import timeline
+from blog.utils.constants import TIMELINE_MAX_LENGTH
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill the timelines of authors who dropped back under the fan-out "
+        "limit, then cut every home timeline back to its newest --max-length "
+        "entries. Run it periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-length", type=int, default=TIMELINE_MAX_LENGTH)
+
+    def handle(self, *args, **options):
+        backfilled = timeline.run_backfills()
+        deleted = timeline.trim(options["max_length"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {backfilled} authors, deleted {deleted} timeline entries"
+        ))
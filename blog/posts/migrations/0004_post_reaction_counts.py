@@ -0,0 +1,42 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_reaction_counts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostReaction = apps.get_model('posts', 'PostReaction')
+
+    def reaction_count(reaction):
+        counts = PostReaction.objects.filter(
+            post=OuterRef('pk'), reaction=reaction
+        ).order_by().values('post').annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counts), 0)
+
+    Post.objects.update(
+        upvote_count=reaction_count('upvote'),
+        downvote_count=reaction_count('downvote'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_post_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='downvote_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='upvote_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_reaction_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE posts_post ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+            ") STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX posts_post_search_vector_idx ON posts_post USING GIN (search_vector)"
+        )
+    else:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+            "post_id UNINDEXED, title, content, tokenize='unicode61', prefix='2 3')"
+        )
+        schema_editor.execute(
+            "INSERT INTO posts_post_fts (post_id, title, content) "
+            "SELECT id, title, content FROM posts_post WHERE post_state = 'published'"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE posts_post DROP COLUMN search_vector")
+    else:
+        schema_editor.execute("DROP TABLE posts_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_reaction_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
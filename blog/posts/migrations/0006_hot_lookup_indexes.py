@@ -0,0 +1,67 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_reactions(apps, schema_editor):
+    """Keep each user's latest reaction per post, then recount the posts."""
+    Post = apps.get_model('posts', 'Post')
+    PostReaction = apps.get_model('posts', 'PostReaction')
+
+    duplicates = PostReaction.objects.values('post', 'user_that_react').annotate(
+        total=Count('id')
+    ).filter(total__gt=1)
+
+    for duplicate in duplicates:
+        reactions = PostReaction.objects.filter(
+            post=duplicate['post'], user_that_react=duplicate['user_that_react']
+        ).order_by('-last_modified_at')
+        PostReaction.objects.filter(
+            id__in=list(reactions.values_list('id', flat=True)[1:])
+        ).delete()
+
+    def reaction_count(reaction):
+        counts = PostReaction.objects.filter(
+            post=OuterRef('pk'), reaction=reaction
+        ).order_by().values('post').annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counts), 0)
+
+    Post.objects.update(
+        upvote_count=reaction_count('upvote'),
+        downvote_count=reaction_count('downvote'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('post_state', 'published')), fields=['-created_at', '-id'], name='post_published_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('post_state', 'published')), fields=['author', '-created_at', '-id'], name='post_author_published_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='post_author_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'parent_comment', 'created_at', 'id'], name='postcomment_thread_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_reactions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='postreaction',
+            constraint=models.UniqueConstraint(fields=('post', 'user_that_react'), name='unique_post_reaction'),
+        ),
+    ]
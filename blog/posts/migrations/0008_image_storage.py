@@ -0,0 +1,25 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:19
+
+import blog.media.storage
+import blog.posts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='commenttopostimages',
+            name='post_image',
+            field=models.ImageField(blank=True, null=True, storage=blog.media.storage.get_content_addressed_storage, upload_to=blog.posts.models.post_images_upload_location),
+        ),
+        migrations.AlterField(
+            model_name='postimage',
+            name='image',
+            field=models.ImageField(storage=blog.media.storage.get_content_addressed_storage, upload_to=blog.posts.models.post_images_upload_location),
+        ),
+    ]
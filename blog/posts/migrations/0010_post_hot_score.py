@@ -0,0 +1,68 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:27
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def hot_score(upvotes, downvotes, comments, created_at):
+    # blog.posts.models.hot_score() as of this migration, with the constants
+    # inlined, so later changes to either don't change what this one does
+    activity = upvotes - downvotes + 0.5 * comments
+    order = math.log10(max(abs(activity), 1))
+    sign = (activity > 0) - (activity < 0)
+    return round(sign * order + (created_at.timestamp() - 1704067200) / 45000, 7)
+
+
+def backfill_hot_scores(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostComment = apps.get_model('posts', 'PostComment')
+
+    counts = PostComment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('id')).values('total')
+    Post.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+    # Batches in primary key order, only BATCH_SIZE posts are loaded at once
+    posts = Post.objects.only(
+        'id', 'created_at', 'upvote_count', 'downvote_count', 'comment_count'
+    ).order_by('pk')
+    batch = list(posts[:BATCH_SIZE])
+    while batch:
+        for post in batch:
+            post.hot_score = hot_score(
+                post.upvote_count, post.downvote_count, post.comment_count, post.created_at
+            )
+        Post.objects.bulk_update(batch, ['hot_score'])
+        batch = list(posts.filter(pk__gt=batch[-1].pk)[:BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_timeline_entry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('post_state', 'published')), fields=['-hot_score', '-id'], name='post_published_hot_idx'),
+        ),
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+from blog.posts.models import excerpt
+
+
+def backfill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+
+    batch = []
+    for post in Post.objects.only('id', 'content').iterator(chunk_size=1000):
+        post.excerpt = excerpt(post.content)
+        batch.append(post)
+        if len(batch) == 1000:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['last_modified_at', 'id'], name='post_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['last_modified_at', 'id'], name='postcomment_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postreaction',
+            index=models.Index(fields=['last_modified_at', 'id'], name='postreaction_modified_idx'),
+        ),
+    ]
@@ -1,6 +1,21 @@
-from django.db import models
+import math
+import uuid
+
+from django.db import connection, models
+from django.db.models import Count, F, FloatField, Func, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Abs, Coalesce, Greatest, Log, Round, Sign
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.text import Truncator
+from blog.media.storage import get_content_addressed_storage
 from blog.utils.base_class import BaseModel
+from blog.utils.conditional import make_etag
+from blog.utils.constants import (
+    HOT_SCORE_COMMENT_WEIGHT,
+    HOT_SCORE_EPOCH,
+    HOT_SCORE_TIME_SCALE,
+    POST_EXCERPT_LENGTH,
+)
 User = get_user_model()
 
 # Create your models here.
@@ -10,6 +25,172 @@ def post_images_upload_location(instance, filename: str) -> str:
     return f"posts/images/{filename}"
 
 
+def hot_score(upvotes: int, downvotes: int, comments: int, created_at) -> float:
+    """
+    Time-decayed ranking score in the style of Reddit's "hot" sort.
+
+    The decay lives in the created_at term, which grows with time instead
+    of shrinking with age, so a score only changes when the post's own
+    activity does and can be stored and indexed.
+    """
+    activity = upvotes - downvotes + HOT_SCORE_COMMENT_WEIGHT * comments
+    order = math.log10(max(abs(activity), 1))
+    sign = (activity > 0) - (activity < 0)
+    return round(
+        sign * order + (created_at.timestamp() - HOT_SCORE_EPOCH) / HOT_SCORE_TIME_SCALE, 7
+    )
+
+
+class Epoch(Func):
+    """A datetime as seconds since 1970-01-01 UTC, with their fraction."""
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="((julianday(%(expressions)s) - 2440587.5) * 86400.0)",
+            **extra_context,
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="EXTRACT(EPOCH FROM %(expressions)s)::double precision",
+            **extra_context,
+        )
+
+
+def hot_score_expression(upvotes, downvotes, comments):
+    """
+    hot_score() as a database expression over the counter expressions
+    given, so an UPDATE can move the counters and the score at once.
+    """
+    activity = upvotes - downvotes + Value(HOT_SCORE_COMMENT_WEIGHT) * comments
+    order = Log(10, Greatest(Abs(activity), Value(1.0)))
+    age = (Epoch("created_at") - HOT_SCORE_EPOCH) / Value(float(HOT_SCORE_TIME_SCALE))
+    return Round(Sign(activity) * order + age, 7, output_field=FloatField())
+
+
+def excerpt(content: str) -> str:
+    """
+    ``content`` with its whitespace collapsed, cut to POST_EXCERPT_LENGTH
+    characters with a trailing ellipsis when it is longer.
+    """
+    return Truncator(" ".join(content.split())).chars(POST_EXCERPT_LENGTH)
+
+
+class PostQuerySet(models.QuerySet):
+    def with_feed_data(self):
+        """
+        Eager-load everything PostSerializer renders so a feed page costs a
+        fixed number of queries regardless of its size.
+        """
+        return self.select_related("author").prefetch_related("post_images")
+
+    def validator_state(self) -> dict:
+        return {
+            "posts": Count("id", distinct=True),
+            "modified_at": Max("last_modified_at"),
+            "authors_modified_at": Max("author__last_modified_at"),
+            "images": Count("post_images", distinct=True),
+            "images_modified_at": Max("post_images__last_modified_at"),
+        }
+
+    def get_validators(self):
+        """
+        ``(etag, last_modified)`` of what PostSerializer renders for these
+        posts, from one aggregate query over the posts, their authors and
+        images instead of loading them. ``(None, None)`` when there are none.
+        """
+        return self.to_validators(self.order_by().aggregate(**self.validator_state()))
+
+    async def aget_validators(self):
+        """Async counterpart of get_validators()."""
+        return self.to_validators(await self.order_by().aaggregate(**self.validator_state()))
+
+    def to_validators(self, state):
+        if not state["posts"]:
+            return None, None
+        last_modified = max(
+            timestamp for timestamp in (
+                state["modified_at"], state["authors_modified_at"], state["images_modified_at"]
+            ) if timestamp is not None
+        )
+        return make_etag(*state.values()), last_modified
+
+    def update_reaction_counts(self, added=None, removed=None):
+        """
+        Atomically move the denormalized reaction counters, e.g. a flip from
+        downvote to upvote is ``added="upvote", removed="downvote"``.
+        """
+        changes = {}
+        if added is not None:
+            field = f"{added}_count"
+            changes[field] = F(field) + 1
+        if removed is not None:
+            field = f"{removed}_count"
+            changes[field] = F(field) - 1
+
+        if not changes:
+            return 0
+        return self.update_counters(**changes)
+
+    def update_comment_count(self, delta=1):
+        return self.update_counters(comment_count=F("comment_count") + delta)
+
+    def update_counters(self, **changes):
+        """
+        Apply counter ``changes`` and rescore the posts in one UPDATE: every
+        column it reads holds the value from before the UPDATE, so the score
+        is computed from the changed counter expressions themselves.
+        """
+        counters = {
+            "upvote_count": F("upvote_count"),
+            "downvote_count": F("downvote_count"),
+            "comment_count": F("comment_count"),
+            **changes,
+        }
+        # update() skips auto_now, the counters are part of what clients revalidate
+        return self.update(
+            **changes,
+            hot_score=hot_score_expression(
+                counters["upvote_count"], counters["downvote_count"], counters["comment_count"]
+            ),
+            last_modified_at=timezone.now(),
+        )
+
+    def refresh_hot_scores(self):
+        """Recompute hot_score from the counters as stored, in one UPDATE."""
+        return self.update(hot_score=hot_score_expression(
+            F("upvote_count"), F("downvote_count"), F("comment_count")
+        ))
+
+    def recompute_comment_counts(self):
+        counts = PostComment.objects.filter(
+            post=OuterRef("pk")
+        ).order_by().values("post").annotate(total=Count("id")).values("total")
+        updated = self.update(comment_count=Coalesce(Subquery(counts), 0))
+        self.refresh_hot_scores()
+        return updated
+
+    def recompute_reaction_counts(self):
+        """
+        Rebuild the reaction counters from PostReaction in a single UPDATE,
+        repairing any drift (e.g. reactions removed by a user cascade).
+        """
+        def reaction_count(reaction):
+            counts = PostReaction.objects.filter(
+                post=OuterRef("pk"), reaction=reaction
+            ).order_by().values("post").annotate(total=Count("id")).values("total")
+            return Coalesce(Subquery(counts), 0)
+
+        updated = self.update(
+            upvote_count=reaction_count("upvote"),
+            downvote_count=reaction_count("downvote"),
+        )
+        self.refresh_hot_scores()
+        return updated
+
 
 class Post(BaseModel):
     CATEGORY_CHOICES = [
@@ -29,19 +210,152 @@ class Post(BaseModel):
     content = models.TextField()
     post_state = models.CharField(max_length=15, default=POST_CHOICES[0][0], choices=POST_CHOICES)
     category = models.CharField(max_length=20, choices= CATEGORY_CHOICES, null=False, blank=False)
+    # NOTE: denormalized from PostReaction, see PostQuerySet.update_reaction_counts
+    upvote_count = models.IntegerField(default=0)
+    downvote_count = models.IntegerField(default=0)
+    # NOTE: denormalized from PostComment, replies included
+    comment_count = models.IntegerField(default=0)
+    # NOTE: see hot_score(), kept current by the PostQuerySet counter updates
+    hot_score = models.FloatField(default=0)
+    # NOTE: see excerpt(), derived from content on every save
+    excerpt = models.CharField(max_length=POST_EXCERPT_LENGTH, blank=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # Feeds page newest first on (created_at, id), see KeysetPagination
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=Q(post_state="published"),
+                name="post_published_feed_idx",
+            ),
+            models.Index(
+                fields=["author", "-created_at", "-id"],
+                condition=Q(post_state="published"),
+                name="post_author_published_feed_idx",
+            ),
+            models.Index(
+                fields=["author", "-created_at", "-id"],
+                name="post_author_feed_idx",
+            ),
+            models.Index(
+                fields=["-hot_score", "-id"],
+                condition=Q(post_state="published"),
+                name="post_published_hot_idx",
+            ),
+            # Exports read in (last_modified_at, id) order, see blog/posts/export.py
+            models.Index(fields=["last_modified_at", "id"], name="post_modified_idx"),
+        ]
     
     def __str__(self) -> str:
         return self.title[:30]
 
+    def save(self, *args, **kwargs):
+        # created_at is only set by the first save, score brand new posts from now
+        self.hot_score = self.compute_hot_score()
+        self.excerpt = excerpt(self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "excerpt"}
+        super().save(*args, **kwargs)
+
+    @property
+    def score(self) -> int:
+        return self.upvote_count - self.downvote_count
+
+    def compute_hot_score(self) -> float:
+        return hot_score(
+            self.upvote_count,
+            self.downvote_count,
+            self.comment_count,
+            self.created_at or timezone.now(),
+        )
+
+    def cache_scopes(self) -> list:
+        """
+        Cache scopes of every feed the post is listed in, see
+        VersionedCacheMixin. Images and reactions only know their post_id,
+        so the feeds of a single author depend on "posts" as well.
+        """
+        return ["posts"]
+
 class PostImage(BaseModel):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='post_images')
-    image = models.ImageField(upload_to=post_images_upload_location)
+    image = models.ImageField(
+        upload_to=post_images_upload_location, storage=get_content_addressed_storage
+    )
+    # NOTE: filled by the image job workers, see blog/media/processing.py
+    image_variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self) -> str:
         return self.image.name
 
 
+class PostCommentQuerySet(models.QuerySet):
+    def tree(self, post_id, parent_id=None, after_id=None, max_depth=3, children_limit=20):
+        """
+        Load a (sub)tree of comments for a post in a single recursive query.
+
+        The first level holds up to ``children_limit`` replies to
+        ``parent_id`` (top-level comments when None) after ``after_id``;
+        every deeper node keeps only its first ``children_limit`` replies,
+        down to ``max_depth`` levels. Each comment gets ``depth``,
+        ``reply_count`` and a ``replies`` list; the first level is returned.
+        """
+        table = self.model._meta.db_table
+        pk_field = self.model._meta.pk
+        params = [pk_field.get_db_prep_value(post_id, connection)]
+
+        if parent_id is None:
+            first_level = "parent_comment_id IS NULL"
+        else:
+            first_level = "parent_comment_id = %s"
+            params.append(pk_field.get_db_prep_value(parent_id, connection))
+        if after_id is not None:
+            first_level += f" AND (created_at, id) > (SELECT created_at, id FROM {table} WHERE id = %s)"
+            params.append(pk_field.get_db_prep_value(after_id, connection))
+        params += [children_limit, children_limit, max_depth]
+
+        comments = list(self.raw(
+            f"""
+            WITH RECURSIVE ranked AS (
+                SELECT id, parent_comment_id, created_at, ROW_NUMBER() OVER (
+                    PARTITION BY parent_comment_id ORDER BY created_at, id
+                ) AS sibling_rank
+                FROM {table} WHERE post_id = %s
+            ),
+            tree AS (
+                SELECT id, 0 AS depth FROM (
+                    SELECT id FROM ranked WHERE {first_level}
+                    ORDER BY created_at, id LIMIT %s
+                ) first_level
+                UNION ALL
+                SELECT ranked.id, tree.depth + 1 FROM ranked
+                JOIN tree ON ranked.parent_comment_id = tree.id
+                WHERE ranked.sibling_rank <= %s AND tree.depth + 1 < %s
+            )
+            SELECT node.*, tree.depth, (
+                SELECT COUNT(*) FROM {table} reply WHERE reply.parent_comment_id = node.id
+            ) AS reply_count
+            FROM tree JOIN {table} node ON node.id = tree.id
+            ORDER BY tree.depth, node.created_at, node.id
+            """,
+            params,
+        ))
+
+        nodes = {comment.id: comment for comment in comments}
+        first_level_comments = []
+        for comment in comments:
+            comment.replies = []
+            if comment.depth == 0:
+                first_level_comments.append(comment)
+            else:
+                nodes[comment.parent_comment_id].replies.append(comment)
+
+        return first_level_comments
+
+
 class PostComment(BaseModel):
     post = models.ForeignKey(
         Post, on_delete=models.CASCADE, related_name="post_comment"
@@ -52,6 +366,17 @@ class PostComment(BaseModel):
     user_that_comment = models.ForeignKey(User, on_delete=models.CASCADE)
     comment = models.TextField()
 
+    objects = PostCommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["post", "parent_comment", "created_at", "id"],
+                name="postcomment_thread_idx",
+            ),
+            models.Index(fields=["last_modified_at", "id"], name="postcomment_modified_idx"),
+        ]
+
     def __str__(self):
         return self.comment[:20]
 
@@ -62,9 +387,65 @@ class CommentToPostImages(BaseModel):
         PostComment, on_delete=models.CASCADE, related_name="comment_to_post_images"
     )
     post_image = models.ImageField(
-        upload_to=post_images_upload_location, blank=True, null=True
+        upload_to=post_images_upload_location,
+        storage=get_content_addressed_storage,
+        blank=True,
+        null=True,
     )
+    post_image_variants = models.JSONField(default=dict, blank=True)
+
+
+
+class PostReactionQuerySet(models.QuerySet):
+    def upsert(self, post_id, user_id, reaction):
+        """
+        Insert or flip a user's reaction to a post in one
+        ``INSERT ... ON CONFLICT DO UPDATE`` statement, backed by the
+        unique_post_reaction constraint.
+
+        Returns ``(reaction_id, outcome)`` where outcome is one of
+        PostReaction.CREATED, FLIPPED or UNCHANGED (reaction_id is None
+        when unchanged). The id RETURNING hands back tells the cases apart:
+        ours for an insert, the existing row's for a flip, and no row when
+        the ``WHERE`` skipped an update to the same reaction.
+        """
+        opts = self.model._meta
+        now = timezone.now()
+        new_id = uuid.uuid4()
+        values = {
+            "id": new_id,
+            "created_at": now,
+            "last_modified_at": now,
+            "post": post_id,
+            "user_that_react": user_id,
+            "reaction": reaction,
+        }
+        columns, params = [], []
+        for name, value in values.items():
+            field = opts.get_field(name)
+            columns.append(connection.ops.quote_name(field.column))
+            params.append(field.get_db_prep_value(value, connection))
+
+        table = connection.ops.quote_name(opts.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(params))}) "
+                "ON CONFLICT (post_id, user_that_react_id) DO UPDATE "
+                "SET reaction = excluded.reaction, last_modified_at = excluded.last_modified_at "
+                f"WHERE {table}.reaction <> excluded.reaction "
+                "RETURNING id",
+                params,
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            return None, self.model.UNCHANGED
 
+        reaction_id = opts.pk.to_python(row[0])
+        if reaction_id == new_id:
+            return reaction_id, self.model.CREATED
+        return reaction_id, self.model.FLIPPED
 
 
 class PostReaction(BaseModel):
@@ -72,6 +453,7 @@ class PostReaction(BaseModel):
         ("upvote", "upvote"),
         ("downvote", "downvote"),
     ]
+    CREATED, FLIPPED, UNCHANGED = "created", "flipped", "unchanged"
 
     post = models.ForeignKey(
         Post, on_delete=models.CASCADE, related_name="comment_to_post_reaction"
@@ -81,5 +463,57 @@ class PostReaction(BaseModel):
         max_length=20, null=False, blank=False, choices=REACTION_CHOICES
     )
 
+    objects = PostReactionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "user_that_react"], name="unique_post_reaction"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["last_modified_at", "id"], name="postreaction_modified_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.reaction}"
+
+
+class TimelineEntry(models.Model):
+    """
+    A published post pushed into a follower's home timeline, see
+    blog/posts/timeline.py. The post's author and created_at are copied so
+    a timeline page is a range scan over this table alone.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timeline_entries")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="timeline_entries")
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    post_created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_timeline_entry"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-post_created_at", "-post"],
+                name="timeline_entry_feed_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.post_id}"
+
+
+class TimelineBackfill(models.Model):
+    """
+    An author dropped back under the fan-out limit whose recent posts still
+    have to be copied into their followers' timelines, see
+    blog/posts/timeline.py. Their posts are pulled at read time until then.
+    """
+    author = models.OneToOneField(User, on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self) -> str:
-        return f"{self.reaction}"
\ No newline at end of file
+        return f"{self.author_id}"
+
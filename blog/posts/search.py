@@ -0,0 +1,119 @@
+"""
+Full-text search over published posts.
+
+SQLite keeps a separate FTS5 table in sync from the post signals, Postgres
+uses a generated ``tsvector`` column on ``posts_post`` with a GIN index, so
+the database keeps it up to date by itself. Both are created by migration
+``0005_post_search_index``.
+"""
+import re
+import uuid
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+SQLITE_INDEX_TABLE = "posts_post_fts"
+# No stemming: a stemmed index would stop "runn" from prefix-matching "running"
+POSTGRES_SEARCH_CONFIG = "simple"
+
+
+def search_terms(term: str) -> list:
+    """Split user input into lowercase word tokens, dropping query syntax."""
+    return re.findall(r"\w+", term.lower())
+
+
+class SQLiteSearchBackend:
+    def to_match_query(self, terms):
+        # Every term must match as a prefix, e.g. "lag foo" -> "lag"* "foo"*
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def matching_ids(self, terms):
+        return RawSQL(
+            f"SELECT post_id FROM {SQLITE_INDEX_TABLE} WHERE {SQLITE_INDEX_TABLE} MATCH %s",
+            (self.to_match_query(terms),),
+        )
+
+    def ranked_ids(self, terms, limit):
+        # bm25() weights are per column: post_id, title, content
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT post_id FROM {SQLITE_INDEX_TABLE} "
+                f"WHERE {SQLITE_INDEX_TABLE} MATCH %s "
+                f"ORDER BY bm25({SQLITE_INDEX_TABLE}, 0.0, 10.0, 1.0) LIMIT %s",
+                (self.to_match_query(terms), limit),
+            )
+            return [uuid.UUID(row[0]) for row in cursor.fetchall()]
+
+    def index_post(self, post):
+        self.remove_post(post.pk)
+        if post.post_state == "published":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {SQLITE_INDEX_TABLE} (post_id, title, content) VALUES (%s, %s, %s)",
+                    (post.pk.hex, post.title, post.content),
+                )
+
+    def index_posts(self, posts):
+        """index_post() for posts that were just created, in one statement."""
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_INDEX_TABLE} (post_id, title, content) VALUES (%s, %s, %s)",
+                [
+                    (post.pk.hex, post.title, post.content)
+                    for post in posts if post.post_state == "published"
+                ],
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SQLITE_INDEX_TABLE} WHERE post_id = %s", (post_id.hex,)
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_INDEX_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SQLITE_INDEX_TABLE} (post_id, title, content) "
+                "SELECT id, title, content FROM posts_post WHERE post_state = 'published'"
+            )
+
+
+class PostgresSearchBackend:
+    def to_tsquery(self, terms):
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def matching_ids(self, terms):
+        return RawSQL(
+            "SELECT id FROM posts_post WHERE search_vector @@ to_tsquery(%s, %s)",
+            (POSTGRES_SEARCH_CONFIG, self.to_tsquery(terms)),
+        )
+
+    def ranked_ids(self, terms, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id FROM posts_post, to_tsquery(%s, %s) query "
+                "WHERE post_state = 'published' AND search_vector @@ query "
+                "ORDER BY ts_rank(search_vector, query) DESC LIMIT %s",
+                (POSTGRES_SEARCH_CONFIG, self.to_tsquery(terms), limit),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # The generated column is maintained by Postgres itself
+    def index_post(self, post):
+        pass
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+def get_search_backend():
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return SQLiteSearchBackend()
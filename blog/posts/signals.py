@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog.posts.models import (
+    Post,
+    PostImage,
+    PostComment,
+    CommentToPostImages,
+    PostReaction,
+)
+from blog.posts.search import get_search_backend
+from blog.utils.cache import bump_versions
+
+
+@receiver(post_save, sender=Post)
+def index_post_for_search(sender, instance, **kwargs):
+    get_search_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search(sender, instance, **kwargs):
+    get_search_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    # Also covers the images, reactions and comments a deleted post takes
+    # with it, which is why the receivers below only handle saves: a
+    # post_delete receiver on them would turn the cascade into a signal
+    # per row. Single reactions are deleted by DeleteReactionAPIView.
+    bump_versions(*instance.cache_scopes())
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_post_comment_lists(sender, instance, **kwargs):
+    # Cached comment pages of a deleted post must not outlive it
+    bump_versions(f"post:{instance.pk}")
+
+
+@receiver(post_save, sender=PostImage)
+@receiver(post_save, sender=PostReaction)
+def invalidate_post_child_feeds(sender, instance, **kwargs):
+    bump_versions("posts")
+
+
+@receiver(post_save, sender=PostComment)
+def invalidate_comment_lists(sender, instance, **kwargs):
+    bump_versions(f"post:{instance.post_id}")
+
+
+@receiver(post_save, sender=CommentToPostImages)
+def invalidate_comment_image_lists(sender, instance, **kwargs):
+    bump_versions(f"post:{instance.comment_to_post.post_id}")
@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+from django.urls import reverse
+
+from blog.accounts.factories import UserFactory
+from blog.posts.factories import PostCommentFactory, PostFactory, PostImageFactory
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("post_state", ["published", "draft"])
+def test_post_detail_matches_the_sync_view(client_for, post_state):
+    post = PostFactory(post_state=post_state)
+    PostImageFactory(post=post)
+    client = client_for(post.author)
+
+    sync = client.get(reverse("posts:update_post", kwargs={"id": post.id}))
+    response = client.get(reverse("posts:async_post_detail", kwargs={"id": post.id}))
+
+    assert response.status_code == sync.status_code == 200
+    assert response.json() == sync.json()
+
+
+@pytest.mark.django_db
+def test_post_detail_is_only_for_the_author(client_for):
+    post = PostFactory()
+    client = client_for(UserFactory())
+
+    sync = client.get(reverse("posts:update_post", kwargs={"id": post.id}))
+    response = client.get(reverse("posts:async_post_detail", kwargs={"id": post.id}))
+
+    assert response.status_code == sync.status_code == 403
+    assert response.json() == sync.json()
+
+
+@pytest.mark.django_db
+def test_post_detail_of_a_missing_post(client_for):
+    response = client_for(UserFactory()).get(
+        reverse("posts:async_post_detail", kwargs={"id": uuid.uuid4()})
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_feeds_match_the_sync_views(client_for):
+    post = PostFactory()
+    PostImageFactory(post=post)
+    PostCommentFactory.create_batch(3, post=post)
+    client = client_for(UserFactory())
+
+    for sync_name, async_name, kwargs in [
+        ("posts:all_posts", "posts:async_all_posts", {}),
+        ("posts:post_comment", "posts:async_post_comment", {"post_id": post.id}),
+    ]:
+        sync = client.get(reverse(sync_name, kwargs=kwargs), {"page_size": 2})
+        response = client.get(reverse(async_name, kwargs=kwargs), {"page_size": 2})
+        assert response.status_code == sync.status_code == 200
+        # The links point at each view's own URL
+        assert response.json()["results"] == sync.json()["results"]
@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.accounts.factories import PASSWORD, UserFactory
+from blog.posts.factories import PostCommentFactory, PostFactory, PostReactionFactory
+from blog.utils.cache import get_versions
+
+
+def post_with_children(number_of_children):
+    post = PostFactory()
+    for user in UserFactory.create_batch(number_of_children):
+        PostReactionFactory(post=post, user_that_react=user)
+        PostCommentFactory(post=post, user_that_comment=user)
+    return post
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deleting_a_post_costs_the_same_whatever_its_children():
+    counts = []
+    for number_of_children in (1, 6):
+        post = post_with_children(number_of_children)
+        with CaptureQueriesContext(connection) as queries:
+            post.delete()
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reaction_and_post_changes_refresh_cached_feeds(api_client, client_for):
+    post = PostFactory()
+    url = reverse("posts:all_posts")
+    assert api_client.get(url).json()["results"][0]["upvote_count"] == 0
+
+    PostReactionFactory(post=post)
+    assert api_client.get(url).json()["results"][0]["upvote_count"] == 1
+
+    reaction = PostReactionFactory(post=post, reaction="downvote")
+    client_for(reaction.user_that_react).delete(
+        reverse("posts:delete_reaction", kwargs={"reaction_id": reaction.id})
+    )
+    own_posts = client_for(post.author).get(reverse("posts:user_posts")).json()
+    assert own_posts["results"][0]["downvote_count"] == 0
+
+    post.delete()
+    assert api_client.get(url).json()["results"] == []
+    assert client_for(post.author).get(reverse("posts:user_posts")).json()["results"] == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_only_profile_changes_invalidate_embedded_profiles(api_client):
+    user = UserFactory()
+    before = get_versions("profiles")
+
+    response = api_client.post(reverse("accounts:sign_in"), {
+        "email_or_username": user.username, "password": PASSWORD,
+    })
+    assert response.status_code == 200
+    user.save(update_fields=["last_login"])
+    assert get_versions("profiles") == before
+
+    user.first_name = "Renamed"
+    user.save(update_fields=["first_name"])
+    assert get_versions("profiles") != before
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deleting_a_post_refreshes_its_cached_comments(client_for):
+    post = post_with_children(2)
+    client = client_for(UserFactory())
+    urls = [
+        reverse("posts:post_comment", kwargs={"post_id": post.id}),
+        reverse("posts:async_post_comment", kwargs={"post_id": post.id}),
+    ]
+    for url in urls:
+        assert len(client.get(url).json()["results"]) == 2
+
+    post.delete()
+    for url in urls:
+        assert client.get(url).json()["results"] == []
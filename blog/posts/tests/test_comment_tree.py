@@ -0,0 +1,85 @@
+import pytest
+from django.urls import reverse
+
+from blog.accounts.factories import UserFactory
+from blog.posts.factories import PostCommentFactory, PostFactory
+from blog.posts.models import PostComment
+
+
+@pytest.fixture
+def thread():
+    """
+    Two top-level comments; the first has three replies and its first reply
+    has a reply of its own, which again has one.
+    """
+    post = PostFactory()
+    first, second = PostCommentFactory.create_batch(2, post=post)
+    replies = PostCommentFactory.create_batch(3, post=post, parent_comment=first)
+    nested = PostCommentFactory(post=post, parent_comment=replies[0])
+    deepest = PostCommentFactory(post=post, parent_comment=nested)
+    # Comments of another post never show up
+    PostCommentFactory(parent_comment=None)
+    return {
+        "post": post, "first": first, "second": second, "replies": replies,
+        "nested": nested, "deepest": deepest,
+    }
+
+
+def ids(comments):
+    return [comment.id for comment in comments]
+
+
+@pytest.mark.django_db
+def test_tree_nests_replies_in_one_query(thread, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        tree = PostComment.objects.tree(thread["post"].id)
+
+    assert ids(tree) == [thread["first"].id, thread["second"].id]
+    first = tree[0]
+    assert first.reply_count == 3
+    assert ids(first.replies) == ids(thread["replies"])
+    assert ids(first.replies[0].replies) == [thread["nested"].id]
+    assert first.replies[0].replies[0].depth == 2
+    assert tree[1].replies == []
+
+
+@pytest.mark.django_db
+def test_tree_stops_at_max_depth(thread):
+    tree = PostComment.objects.tree(thread["post"].id, max_depth=2)
+
+    reply = tree[0].replies[0]
+    assert reply.reply_count == 1
+    assert reply.replies == []
+
+
+@pytest.mark.django_db
+def test_tree_limits_children_per_node(thread):
+    tree = PostComment.objects.tree(thread["post"].id, children_limit=2)
+
+    assert ids(tree[0].replies) == ids(thread["replies"][:2])
+    assert tree[0].reply_count == 3
+
+
+@pytest.mark.django_db
+def test_subtree_pages_after_a_sibling(thread):
+    tree = PostComment.objects.tree(
+        thread["post"].id, parent_id=thread["first"].id, after_id=thread["replies"][0].id
+    )
+
+    assert ids(tree) == ids(thread["replies"][1:])
+    assert all(comment.depth == 0 for comment in tree)
+
+
+@pytest.mark.django_db
+def test_tree_endpoint_links_to_next_siblings(thread, client_for):
+    url = reverse("posts:post_comment_tree", kwargs={"post_id": thread["post"].id})
+    client = client_for(UserFactory())
+
+    data = client.get(f"{url}?children_limit=1&depth=10").json()
+
+    assert [comment["id"] for comment in data["results"]] == [str(thread["first"].id)]
+    reply = data["results"][0]["replies"][0]
+    assert reply["replies"][0]["replies"][0]["id"] == str(thread["deepest"].id)
+    next_page = client.get(data["next"]).json()
+    assert [comment["id"] for comment in next_page["results"]] == [str(thread["second"].id)]
+    assert client.get(next_page["next"]).json()["results"] == []
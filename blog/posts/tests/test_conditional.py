@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+
+from blog.posts.factories import PostFactory, PostImageFactory
+
+FEEDS = ["posts:all_posts", "posts:async_all_posts"]
+DETAILS = ["posts:update_post", "posts:async_post_detail"]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("url_name", FEEDS)
+def test_feed_revalidates_from_the_versions(api_client, django_assert_num_queries, url_name):
+    PostFactory()
+    url = reverse(url_name)
+    response = api_client.get(url)
+    etag = response["ETag"]
+    assert response.status_code == 200
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+    PostFactory()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", DETAILS)
+def test_post_detail_validators(client_for, url_name):
+    post = PostFactory()
+    client = client_for(post.author)
+    url = reverse(url_name, kwargs={"id": post.id})
+    response = client.get(url)
+    etag, last_modified = response["ETag"], response["Last-Modified"]
+    assert response.status_code == 200
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    # Anything PostSerializer renders changes the ETag: the post, its images...
+    PostImageFactory(post=post)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    etag = response["ETag"]
+
+    # ...and its author
+    post.author.first_name = "Renamed"
+    post.author.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_sync_and_async_post_detail_share_validators(client_for):
+    post = PostFactory()
+    client = client_for(post.author)
+    sync = client.get(reverse("posts:update_post", kwargs={"id": post.id}))
+    response = client.get(reverse("posts:async_post_detail", kwargs={"id": post.id}))
+
+    assert response["ETag"] == sync["ETag"]
+    assert response["Last-Modified"] == sync["Last-Modified"]
+
+
+@pytest.mark.django_db
+def test_post_detail_checks_ownership_before_304(client_for):
+    post = PostFactory()
+    etag = client_for(post.author).get(
+        reverse("posts:update_post", kwargs={"id": post.id})
+    )["ETag"]
+    other = client_for(PostFactory().author)
+
+    for url_name in DETAILS:
+        response = other.get(reverse(url_name, kwargs={"id": post.id}), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 403
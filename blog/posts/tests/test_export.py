@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.accounts.factories import UserFactory
+from blog.posts.export import format_timestamp
+from blog.posts.factories import PostCommentFactory, PostFactory
+from blog.posts.models import Post
+from blog.utils.constants import EXPORT_SINCE_OVERLAP
+
+
+def export(client, name="posts", **params):
+    response = client.get(reverse("posts:export", kwargs={"name": name}), params)
+    return response, b"".join(response.streaming_content).decode()
+
+
+@pytest.fixture
+def staff_client(client_for):
+    return client_for(UserFactory(is_staff=True))
+
+
+@pytest.mark.django_db
+def test_ndjson_export(staff_client):
+    posts = PostFactory.create_batch(3)
+
+    response, body = export(staff_client)
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert [row["id"] for row in rows] == [str(post.id) for post in posts]
+    assert response["X-Export-Until"]
+
+
+@pytest.mark.django_db
+def test_csv_export(staff_client):
+    comment = PostCommentFactory()
+
+    response, body = export(staff_client, "comments", output="csv")
+
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert len(rows) == 1
+    assert rows[0]["id"] == str(comment.id)
+    assert rows[0]["parent_comment_id"] == ""
+
+
+@pytest.mark.django_db
+def test_incremental_export_overlaps_since(staff_client):
+    since = timezone.now()
+    old, late, new = PostFactory.create_batch(3)
+    Post.objects.filter(id=old.id).update(
+        last_modified_at=since - timedelta(seconds=EXPORT_SINCE_OVERLAP + 1)
+    )
+    # Modified before since, but committed after the previous export read
+    Post.objects.filter(id=late.id).update(last_modified_at=since - timedelta(seconds=1))
+
+    response, body = export(staff_client, since=format_timestamp(since))
+
+    ids = {json.loads(line)["id"] for line in body.splitlines()}
+    assert ids == {str(late.id), str(new.id)}
+
+
+@pytest.mark.django_db
+def test_export_errors(client_for, staff_client):
+    url = reverse("posts:export", kwargs={"name": "posts"})
+    assert client_for(UserFactory()).get(url).status_code == 403
+    assert staff_client.get(reverse("posts:export", kwargs={"name": "users"})).status_code == 404
+    for params in ({"output": "xml"}, {"since": "yesterday"}):
+        assert staff_client.get(url, params).status_code == 400
+
+
+@pytest.mark.django_db
+def test_export_data_command(tmp_path):
+    PostFactory.create_batch(2)
+    output = tmp_path / "posts.ndjson"
+
+    call_command("export_data", "posts", output=str(output), stderr=io.StringIO())
+
+    assert len(output.read_text().splitlines()) == 2
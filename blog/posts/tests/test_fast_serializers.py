@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from blog.accounts.factories import UserFactory
+from blog.posts.api.v1.fast_serializers import FastPostCommentSerializer, FastPostSerializer
+from blog.posts.api.v1.serializers import PostCommentSerializer, PostSerializer
+from blog.posts.factories import (
+    PostCommentFactory, PostFactory, PostImageFactory, PostReactionFactory,
+)
+from blog.posts.models import CommentToPostImages, Post, PostComment
+
+
+def request_for(query=""):
+    return Request(APIRequestFactory().get(f"/feed/{query}"))
+
+
+def rendered(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+def both_outputs(serializer_class, fast_serializer_class, queryset, query=""):
+    context = {"request": request_for(query)}
+    slow = serializer_class(queryset, many=True, context=context).data
+    fast_serializer = fast_serializer_class(context=context)
+    fast = fast_serializer.get_data(list(fast_serializer.get_queryset(queryset)))
+    return rendered(slow), rendered(fast)
+
+
+@pytest.fixture
+def feed():
+    author = UserFactory(
+        image="accounts/avatar.png", image_variants={"thumbnail": "variants/avatar-320.webp"}
+    )
+    with_images = PostFactory(author=author)
+    PostImageFactory(post=with_images, image_variants={"thumbnail": "variants/a-320.webp"})
+    PostImageFactory(post=with_images)
+    PostReactionFactory(post=with_images)
+    PostReactionFactory(post=with_images, reaction="downvote")
+    PostReactionFactory(post=with_images)
+    plain = PostFactory()
+
+    comment = PostCommentFactory(post=with_images, user_that_comment=author)
+    CommentToPostImages.objects.create(
+        comment_to_post=comment, post_image="comments/a.png",
+        post_image_variants={"thumbnail": "variants/c-320.webp"},
+    )
+    PostCommentFactory(post=with_images, parent_comment=comment)
+    return with_images, plain
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["", "?fields=id,title,score", "?exclude=author,images"])
+def test_fast_post_serializer_matches_post_serializer(feed, query):
+    queryset = Post.objects.with_feed_data().order_by("-created_at")
+
+    slow, fast = both_outputs(PostSerializer, FastPostSerializer, queryset, query)
+
+    assert fast == slow
+    assert [post["id"] for post in fast] == [str(post.id) for post in reversed(feed)]
+    if not query:
+        assert fast[1]["score"] == 1
+        assert len(fast[1]["images"]) == 2
+        assert fast[1]["author"]["image_variants"]["thumbnail"].endswith("avatar-320.webp")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["", "?fields=id,comment_to_post_images"])
+def test_fast_comment_serializer_matches_post_comment_serializer(feed, query):
+    queryset = PostComment.objects.filter(post=feed[0]).select_related(
+        "user_that_comment"
+    ).prefetch_related("comment_to_post_images").order_by("created_at")
+
+    slow, fast = both_outputs(
+        PostCommentSerializer, FastPostCommentSerializer, queryset, query
+    )
+
+    assert fast == slow
+    assert len(fast) == 2
+    assert len(fast[0]["comment_to_post_images"]) == 1
+    if not query:
+        assert fast[1]["parent_comment"] == fast[0]["id"]
@@ -0,0 +1,55 @@
+import pytest
+from django.urls import reverse
+
+from blog.accounts.factories import UserFactory
+from blog.accounts.models import Follow
+from blog.posts import timeline
+from blog.posts.factories import (
+    PostCommentFactory,
+    PostFactory,
+    PostImageFactory,
+    PostReactionFactory,
+)
+
+# Queries for one uncached feed page, whatever the number of posts on it.
+# Authentication reads the token claims and costs none.
+FEED_QUERY_BUDGETS = {
+    "posts:all_posts": 2,
+    "posts:user_posts": 2,
+    "posts:user_published_posts": 2,
+    "posts:home_timeline": 4,
+    "posts:trending_posts": 2,
+    "posts:search_posts": 3,
+    "posts:async_all_posts": 2,
+}
+URLS_TAKING_USERNAME = {"posts:user_published_posts"}
+
+
+def feed_url(url_name, author):
+    kwargs = {"username": author.username} if url_name in URLS_TAKING_USERNAME else {}
+    return f"{reverse(url_name, kwargs=kwargs)}?page_size=20&q=feed"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("number_of_posts", [1, 10])
+@pytest.mark.parametrize("url_name", list(FEED_QUERY_BUDGETS))
+def test_feed_query_budget(url_name, number_of_posts, client_for, django_assert_num_queries):
+    author, *readers = UserFactory.create_batch(4)
+    for post in PostFactory.create_batch(number_of_posts, author=author, title="Feed post"):
+        PostImageFactory.create_batch(2, post=post)
+        for reader in readers:
+            PostReactionFactory(post=post, user_that_react=reader)
+            PostCommentFactory(post=post, user_that_comment=reader)
+    Follow.objects.follow(readers[0], author)
+    timeline.on_follow(readers[0], author)
+    client = client_for(author if url_name == "posts:user_posts" else readers[0])
+
+    with django_assert_num_queries(FEED_QUERY_BUDGETS[url_name]):
+        response = client.get(feed_url(url_name, author))
+
+    assert response.status_code == 200
+    data = response.json()
+    posts = data["results"] if isinstance(data, dict) else data
+    assert len(posts) == number_of_posts
+    assert all(len(post["images"]) == 2 for post in posts)
+    assert all(post["upvote_count"] == len(readers) for post in posts)
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.accounts.factories import UserFactory
+from blog.posts.factories import PostCommentFactory, PostFactory, PostReactionFactory
+from blog.posts.models import Post, hot_score
+
+
+def assert_scored(post):
+    post.refresh_from_db()
+    assert post.hot_score == pytest.approx(
+        hot_score(post.upvote_count, post.downvote_count, post.comment_count, post.created_at),
+        abs=1e-6,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("upvotes, downvotes, comments", [(0, 0, 0), (5, 1, 3), (1, 7, 0), (0, 0, 1)])
+def test_counter_updates_rescore_in_the_same_update(upvotes, downvotes, comments, django_assert_num_queries):
+    post = PostFactory()
+    Post.objects.filter(id=post.id).update(created_at=timezone.now() - timedelta(days=3))
+    posts = Post.objects.filter(id=post.id)
+
+    for _ in range(upvotes):
+        with django_assert_num_queries(1):
+            posts.update_reaction_counts(added="upvote")
+    for _ in range(downvotes):
+        posts.update_reaction_counts(added="downvote")
+    for _ in range(comments):
+        with django_assert_num_queries(1):
+            posts.update_comment_count()
+    # A flip moves both counters
+    posts.update_reaction_counts(added="upvote", removed="downvote")
+    posts.update_reaction_counts(added="downvote", removed="upvote")
+
+    post.refresh_from_db()
+    assert (post.upvote_count, post.downvote_count, post.comment_count) == (
+        upvotes, downvotes, comments
+    )
+    assert_scored(post)
+
+
+@pytest.mark.django_db
+def test_refresh_hot_scores_repairs_every_post():
+    posts = PostFactory.create_batch(3)
+    Post.objects.update(upvote_count=4, hot_score=0)
+
+    assert Post.objects.refresh_hot_scores() == 3
+    for post in posts:
+        assert_scored(post)
+
+
+@pytest.mark.django_db
+def test_trending_ranks_activity_against_age(api_client):
+    old_busy, new_quiet, old_quiet = PostFactory.create_batch(3)
+    Post.objects.filter(id__in=[old_busy.id, old_quiet.id]).update(
+        created_at=timezone.now() - timedelta(hours=6)
+    )
+    Post.objects.refresh_hot_scores()
+    for user in UserFactory.create_batch(12):
+        PostReactionFactory(post=old_busy, user_that_react=user)
+    PostCommentFactory(post=old_quiet)
+
+    results = api_client.get(reverse("posts:trending_posts")).json()
+
+    assert [post["id"] for post in results] == [str(old_busy.id), str(new_quiet.id), str(old_quiet.id)]
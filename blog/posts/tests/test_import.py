@@ -0,0 +1,153 @@
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.accounts.factories import UserFactory
+from blog.accounts.models import Follow
+from blog.posts.factories import PostFactory
+from blog.posts.importer import import_records
+from blog.posts.models import Post, PostComment, PostReaction, TimelineEntry
+
+LEGACY_DATE = "2015-06-01T12:00:00Z"
+
+
+def record(author, **fields):
+    return {
+        "author": author.username, "title": "Imported", "content": "Imported content",
+        "category": "travel", "post_state": "published", **fields,
+    }
+
+
+@pytest.fixture
+def staff_client(client_for):
+    return client_for(UserFactory(is_staff=True))
+
+
+@pytest.mark.django_db
+def test_import_api_reports_invalid_records_by_index(staff_client):
+    author, reader = UserFactory.create_batch(2)
+    records = [
+        record(author, created_at=LEGACY_DATE, comments=[{
+            "user": reader.username, "comment": "First",
+            "replies": [{"user": author.username, "comment": "Reply", "replies": [
+                {"user": reader.username, "comment": "Reply to the reply"},
+            ]}],
+        }], reactions=[
+            {"user": reader.username, "reaction": "upvote"},
+            {"user": author.username, "reaction": "downvote"},
+        ]),
+        record(author, category="not-a-category"),
+        record(author, reactions=[{"user": "nobody", "reaction": "upvote"}]),
+    ]
+
+    response = staff_client.post(reverse("posts:import_posts"), records, format="json")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["imported"] == {"posts": 1, "comments": 3, "reactions": 2}
+    assert body["error_count"] == 2
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    assert "category" in body["errors"][0]["errors"]
+    assert body["errors"][1]["errors"] == {"reactions": ["Unknown user(s): nobody."]}
+
+    post = Post.objects.get()
+    assert post.created_at == datetime(2015, 6, 1, 12, tzinfo=dt_timezone.utc)
+    assert post.last_modified_at > post.created_at
+    assert (post.upvote_count, post.downvote_count, post.comment_count) == (1, 1, 3)
+    assert post.excerpt == "Imported content"
+    assert post.hot_score == post.compute_hot_score()
+
+    reply_to_reply = PostComment.objects.get(comment="Reply to the reply")
+    assert reply_to_reply.parent_comment.comment == "Reply"
+    assert reply_to_reply.parent_comment.parent_comment.comment == "First"
+    # Comments and reactions without a created_at take the post's
+    assert reply_to_reply.created_at == post.created_at
+    assert PostReaction.objects.filter(post=post).count() == 2
+
+
+@pytest.mark.django_db
+def test_import_api_reads_ndjson(staff_client):
+    author = UserFactory()
+    body = b"\n".join([
+        json.dumps(record(author)).encode(),
+        b"",
+        b"{not json",
+        json.dumps(record(author, post_state="draft")).encode(),
+    ])
+
+    response = staff_client.post(
+        reverse("posts:import_posts"), body, content_type="application/x-ndjson"
+    )
+
+    body = response.json()
+    assert body["imported"]["posts"] == 2
+    assert body["error_count"] == 1
+    assert body["errors"][0]["index"] == 1
+    assert body["errors"][0]["errors"]["non_field_errors"][0].startswith("Invalid JSON")
+
+
+@pytest.mark.django_db
+def test_import_api_rejects(client_for, staff_client):
+    url = reverse("posts:import_posts")
+    assert client_for(UserFactory()).post(url, [], format="json").status_code == 403
+    assert staff_client.post(url, {"author": "x"}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_duplicate_reactions_are_invalid(staff_client):
+    author = UserFactory()
+    reaction = {"user": author.username, "reaction": "upvote"}
+
+    response = staff_client.post(
+        reverse("posts:import_posts"), [record(author, reactions=[reaction, reaction])], format="json"
+    )
+
+    assert response.json()["error_count"] == 1
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_records_in_chunks_and_resume():
+    author, follower = UserFactory.create_batch(2)
+    Follow.objects.follow(follower, author)
+    records = [record(author, title=f"Imported {i}") for i in range(5)]
+
+    results = list(import_records(records, chunk_size=2, skip=1))
+
+    assert [counts["posts"] for counts, _ in results] == [2, 2]
+    assert set(Post.objects.values_list("title", flat=True)) == {
+        f"Imported {i}" for i in range(1, 5)
+    }
+    # Published imports reach the followers' timelines
+    assert TimelineEntry.objects.filter(user=follower).count() == 4
+
+
+@pytest.mark.django_db
+def test_import_posts_command(tmp_path):
+    author = UserFactory()
+    path = tmp_path / "posts.ndjson"
+    path.write_text("\n".join(json.dumps(record(author)) for _ in range(3)) + "\n")
+
+    call_command("import_posts", str(path), chunk_size=2, stdout=io.StringIO())
+
+    assert Post.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_import_fans_out_only_the_imported_posts():
+    author, follower = UserFactory.create_batch(2)
+    Follow.objects.follow(follower, author)
+    # An older post trimmed out of the follower's timeline stays out
+    PostFactory(author=author, post_state="published")
+    records = [record(author, title=f"Imported {i}") for i in range(3)]
+    records.append(record(author, title="Draft", post_state="draft"))
+
+    list(import_records(records, chunk_size=2))
+
+    assert set(
+        TimelineEntry.objects.filter(user=follower).values_list("post__title", flat=True)
+    ) == {"Imported 0", "Imported 1", "Imported 2"}
@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+
+from blog.accounts.factories import UserFactory
+from blog.posts.factories import PostCommentFactory, PostFactory
+from blog.posts.models import Post, PostComment
+
+
+def walk(client, url):
+    """Every result of a keyset paginated endpoint, following the next links."""
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        results += response.json()["results"]
+        url = response.json()["next"]
+    return results
+
+
+@pytest.mark.django_db
+def test_posts_are_paged_newest_first_without_gaps_or_repeats(api_client):
+    posts = PostFactory.create_batch(7)
+    # Ties on created_at are broken by id
+    Post.objects.filter(id__in=[post.id for post in posts[2:5]]).update(
+        created_at=posts[2].created_at
+    )
+    expected = list(Post.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+    results = walk(api_client, f"{reverse('posts:all_posts')}?page_size=2")
+
+    assert [result["id"] for result in results] == [str(pk) for pk in expected]
+
+
+@pytest.mark.django_db
+def test_page_does_not_shift_when_posts_are_added(api_client):
+    PostFactory.create_batch(4)
+    expected = list(Post.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+    first_page = api_client.get(f"{reverse('posts:all_posts')}?page_size=2").json()
+    PostFactory.create_batch(3)
+
+    second_page = api_client.get(first_page["next"]).json()
+
+    assert [result["id"] for result in second_page["results"]] == [str(pk) for pk in expected[2:]]
+
+
+@pytest.mark.django_db
+def test_comments_are_paged_oldest_first(client_for):
+    post = PostFactory()
+    PostCommentFactory.create_batch(5, post=post)
+    expected = PostComment.objects.filter(post=post).order_by("created_at", "id")
+
+    results = walk(
+        client_for(UserFactory()),
+        f"{reverse('posts:post_comment', kwargs={'post_id': post.id})}?page_size=2",
+    )
+
+    assert [result["id"] for result in results] == [str(comment.id) for comment in expected]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ["garbage", "bm90LWEtY3Vyc29y"])
+def test_invalid_cursor_is_not_found(api_client, cursor):
+    response = api_client.get(f"{reverse('posts:all_posts')}?cursor={cursor}")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_last_page_has_no_next_link(api_client):
+    PostFactory.create_batch(2)
+
+    data = api_client.get(f"{reverse('posts:all_posts')}?page_size=2").json()
+
+    assert data["next"] is None
+    assert len(data["results"]) == 2
+    assert "cursor" not in data["first"]
@@ -0,0 +1,106 @@
+import io
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from blog.accounts.factories import UserFactory
+from blog.media.models import ImageJob, MediaBlob
+from blog.media.storage import content_addressed_storage as storage
+from blog.posts.factories import PostCommentFactory, PostFactory
+from blog.posts.models import CommentToPostImages, Post, PostImage
+
+
+def png(name, color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+def stored_files():
+    return {
+        os.path.join(directory, filename)
+        for directory, _, filenames in os.walk(storage.path(storage.prefix))
+        for filename in filenames
+    }
+
+
+def create_post(client, *images):
+    return client.post(reverse("posts:create_post"), {
+        "title": "With images", "content": "content", "category": "travel",
+        "post_state": "published", "uploaded_images": list(images),
+    }, format="multipart")
+
+
+@pytest.mark.django_db
+def test_post_images_are_inserted_together_and_referenced(client_for):
+    response = create_post(client_for(UserFactory()), png("a.png", "red"), png("b.png", "blue"))
+
+    assert response.status_code == 201
+    images = PostImage.objects.filter(post_id=response.json()["id"])
+    assert images.count() == 2
+    assert ImageJob.objects.filter(object_id__in=images.values("id")).count() == 2
+    assert set(MediaBlob.objects.values_list("ref_count", flat=True)) == {1}
+
+
+@pytest.mark.django_db
+def test_files_of_a_rolled_back_post_are_collected(client_for, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("queue down")
+
+    # Fails after bulk_create_with_files() stored the files and returned
+    monkeypatch.setattr(ImageJob.objects, "enqueue", fail)
+    with pytest.raises(RuntimeError):
+        create_post(client_for(UserFactory()), png("a.png", "green"))
+
+    assert not Post.objects.exists()
+    assert not MediaBlob.objects.exists()
+    assert stored_files()
+
+    call_command("collect_media_garbage", "--grace-period=0", stdout=io.StringIO())
+    assert not stored_files()
+
+
+def post_with_images(number_of_images):
+    post = PostFactory()
+    comment = PostCommentFactory(post=post)
+    for n in range(number_of_images):
+        # Every image twice, the post's and a comment's copy share the blob
+        content = ContentFile(f"{post.id}-{n}".encode(), name="a.png")
+        PostImage.objects.create(post=post, image=content)
+        CommentToPostImages.objects.create(comment_to_post=comment, post_image=content)
+    return post
+
+
+@pytest.mark.django_db
+def test_deleting_a_post_releases_its_images_in_one_update():
+    counts = []
+    for number_of_images in (1, 4):
+        post = post_with_images(number_of_images)
+        with CaptureQueriesContext(connection) as queries:
+            post.delete()
+        counts.append(sum(query["sql"].startswith("UPDATE") for query in queries))
+        counts.append(len(queries))
+
+    assert counts[0] == 1
+    assert counts[0:2] == counts[2:4]
+    assert set(MediaBlob.objects.values_list("ref_count", flat=True)) == {0}
+
+
+@pytest.mark.django_db
+def test_deleting_one_image_releases_only_its_blob():
+    post = post_with_images(2)
+    kept, dropped = PostImage.objects.filter(post=post)
+
+    dropped.delete()
+    PostImage.objects.filter(id=kept.id).delete()
+    PostImage.objects.filter(id=kept.id).delete()
+
+    assert MediaBlob.objects.get(name=dropped.image.name).ref_count == 1
+    assert MediaBlob.objects.get(name=kept.image.name).ref_count == 1
@@ -0,0 +1,92 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+
+from blog.accounts.factories import UserFactory
+from blog.posts.api.v1.serializers import PostSerializer
+from blog.posts.api.v1.views import DeleteReactionAPIView
+from blog.posts.factories import PostFactory
+from blog.posts.models import Post, PostReaction
+
+
+@pytest.mark.django_db
+def test_upsert_creates_flips_and_skips():
+    post, user = PostFactory(), UserFactory()
+
+    reaction_id, outcome = PostReaction.objects.upsert(post.id, user.id, "upvote")
+    assert outcome == PostReaction.CREATED
+    assert PostReaction.objects.get(id=reaction_id).reaction == "upvote"
+
+    flipped_id, outcome = PostReaction.objects.upsert(post.id, user.id, "downvote")
+    assert (flipped_id, outcome) == (reaction_id, PostReaction.FLIPPED)
+    assert PostReaction.objects.get(id=reaction_id).reaction == "downvote"
+
+    assert PostReaction.objects.upsert(post.id, user.id, "downvote") == (
+        None, PostReaction.UNCHANGED
+    )
+    assert PostReaction.objects.filter(post=post).count() == 1
+
+
+@pytest.mark.django_db
+def test_reaction_endpoint_keeps_counters_in_step(client_for):
+    post, user = PostFactory(), UserFactory()
+    client, url = client_for(user), reverse("posts:post_reaction")
+
+    for reaction, counts in [
+        ("upvote", (1, 0)),
+        ("upvote", (1, 0)),
+        ("downvote", (0, 1)),
+        ("upvote", (1, 0)),
+    ]:
+        response = client.post(url, {"post": str(post.id), "reaction": reaction})
+        assert response.status_code == 201
+        post.refresh_from_db()
+        assert (post.upvote_count, post.downvote_count) == counts
+
+    other = client_for(UserFactory())
+    other.post(url, {"post": str(post.id), "reaction": "downvote"})
+    post.refresh_from_db()
+    assert (post.upvote_count, post.downvote_count) == (1, 1)
+    assert PostReaction.objects.filter(post=post).count() == 2
+
+    reaction = PostReaction.objects.get(post=post, user_that_react=user)
+    response = client.delete(reverse("posts:delete_reaction", kwargs={"reaction_id": reaction.id}))
+    assert response.status_code == 204
+    assert Post.objects.values_list("upvote_count", "downvote_count").get(id=post.id) == (0, 1)
+
+
+@pytest.mark.django_db
+def test_racing_reaction_deletes_decrement_once():
+    post, user = PostFactory(), UserFactory()
+    reaction_id, _ = PostReaction.objects.upsert(post.id, user.id, "upvote")
+    Post.objects.filter(id=post.id).update_reaction_counts(added="upvote")
+    # Both requests loaded the reaction before either deleted it
+    first = PostReaction.objects.get(id=reaction_id)
+    second = PostReaction.objects.get(id=reaction_id)
+
+    DeleteReactionAPIView().perform_destroy(first)
+    DeleteReactionAPIView().perform_destroy(second)
+
+    post.refresh_from_db()
+    assert (post.upvote_count, post.downvote_count) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_post_edit_keeps_concurrent_counter_updates():
+    post = PostFactory()
+    stale = Post.objects.get(id=post.id)
+    Post.objects.filter(id=post.id).update_reaction_counts(added="upvote")
+    Post.objects.filter(id=post.id).update_comment_count()
+    request = APIRequestFactory().put("/")
+    request.user = post.author
+
+    serializer = PostSerializer(
+        stale, data={"content": "Edited content"}, partial=True, context={"request": request}
+    )
+    assert serializer.is_valid(), serializer.errors
+    serializer.save()
+
+    post.refresh_from_db()
+    assert (post.content, post.excerpt) == ("Edited content", "Edited content")
+    assert (post.upvote_count, post.comment_count) == (1, 1)
+    assert post.hot_score == post.compute_hot_score()
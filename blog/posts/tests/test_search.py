@@ -0,0 +1,77 @@
+import pytest
+from django.urls import reverse
+
+from blog.posts.factories import PostFactory
+
+SEARCH = reverse("posts:search_posts")
+
+
+def search(client, query):
+    response = client.get(SEARCH, {"q": query})
+    assert response.status_code == 200
+    return [post["id"] for post in response.json()]
+
+
+@pytest.mark.django_db
+def test_title_matches_rank_above_content_matches(api_client):
+    in_content = PostFactory(title="Notes", content="A week of sailing along the coast.")
+    in_title = PostFactory(title="Sailing", content="A week along the coast.")
+
+    assert search(api_client, "sailing") == [str(in_title.id), str(in_content.id)]
+
+
+@pytest.mark.django_db
+def test_every_term_must_match_as_a_prefix(api_client):
+    both = PostFactory(title="Running shoes", content="Trail running in the rain.")
+    PostFactory(title="Running", content="Road only.")
+
+    assert search(api_client, "runn trai") == [str(both.id)]
+    assert search(api_client, "RUNNING") and search(api_client, "walking") == []
+
+
+@pytest.mark.django_db
+def test_only_published_posts_are_found_and_the_index_follows_edits(api_client):
+    post = PostFactory(title="Draft about kayaks", post_state="draft")
+    assert search(api_client, "kayaks") == []
+
+    post.post_state = "published"
+    post.save()
+    assert search(api_client, "kayaks") == [str(post.id)]
+
+    post.title = "Canoes"
+    post.save()
+    assert search(api_client, "kayaks") == []
+    assert search(api_client, "canoes") == [str(post.id)]
+
+    post.delete()
+    assert search(api_client, "canoes") == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query, found", [
+    ("", False), ('"', False), ("*", False), ("NEAR(kayak trips)", False),
+    ('"kayak*', True), ("(trips) kayak*", True), ("kayak OR canoe", False),
+])
+def test_query_syntax_is_not_passed_through(api_client, query, found):
+    post = PostFactory(title="Kayak trips")
+
+    assert search(api_client, query) == ([str(post.id)] if found else [])
+
+
+@pytest.mark.django_db
+def test_limit_is_clamped(api_client):
+    PostFactory.create_batch(3, title="Mountain hikes")
+
+    assert len(api_client.get(SEARCH, {"q": "mountain", "limit": 2}).json()) == 2
+    assert len(api_client.get(SEARCH, {"q": "mountain", "limit": 0}).json()) == 1
+    assert len(api_client.get(SEARCH, {"q": "mountain", "limit": "many"}).json()) == 3
+
+
+@pytest.mark.django_db
+def test_feeds_filter_with_search(api_client):
+    match = PostFactory(title="Bread baking")
+    PostFactory(title="Cheese making")
+
+    results = api_client.get(reverse("posts:all_posts"), {"search": "bread"}).json()["results"]
+
+    assert [post["id"] for post in results] == [str(match.id)]
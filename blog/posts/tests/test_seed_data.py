@@ -0,0 +1,23 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.posts.models import Post, PostComment, PostImage, PostReaction
+
+
+@pytest.mark.django_db
+def test_seed_data_inserts_consistent_rows():
+    call_command(
+        "seed_data", users=5, posts=8, comments=20, reactions=15, batch_size=3,
+        stdout=StringIO(),
+    )
+
+    assert Post.objects.count() == 8
+    assert PostImage.objects.count() == 8
+    assert PostComment.objects.count() == 20
+    assert PostReaction.objects.count() == 15
+    for post in Post.objects.all():
+        assert post.comment_count == post.post_comment.count()
+        assert post.upvote_count == post.comment_to_post_reaction.filter(reaction="upvote").count()
+        assert post.excerpt
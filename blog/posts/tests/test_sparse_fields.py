@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.accounts.factories import UserFactory
+from blog.posts.factories import PostCommentFactory, PostFactory, PostImageFactory
+from blog.utils.constants import POST_EXCERPT_LENGTH
+
+ALL_POSTS = reverse("posts:all_posts")
+
+
+@pytest.mark.django_db
+def test_fields_keeps_only_the_named_fields_in_serializer_order(api_client):
+    post = PostFactory(content="word " * POST_EXCERPT_LENGTH)
+
+    results = api_client.get(f"{ALL_POSTS}?fields=excerpt, title,id").json()["results"]
+
+    assert results == [{"id": str(post.id), "title": post.title, "excerpt": post.excerpt}]
+    assert len(post.excerpt) <= POST_EXCERPT_LENGTH < len(post.content)
+
+
+@pytest.mark.django_db
+def test_exclude_drops_fields_and_combines_with_fields(api_client):
+    PostFactory()
+
+    [excluded] = api_client.get(f"{ALL_POSTS}?exclude=content,author").json()["results"]
+    [both] = api_client.get(f"{ALL_POSTS}?fields=id,title,score&exclude=score").json()["results"]
+
+    assert "content" not in excluded and "author" not in excluded
+    assert {"id", "title", "excerpt", "images", "score"} <= set(excluded)
+    assert list(both) == ["id", "title"]
+
+
+@pytest.mark.django_db
+def test_unrequested_fields_are_not_read(api_client):
+    PostImageFactory(post=PostFactory())
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(f"{ALL_POSTS}?fields=id,title,excerpt")
+
+    assert response.status_code == 200
+    sql = " ".join(query["sql"] for query in queries)
+    assert "posts_postimage" not in sql
+    assert '"content"' not in sql
+    assert "accounts_customuser" not in sql
+
+
+@pytest.mark.django_db
+def test_unknown_fields_are_rejected(api_client):
+    response = api_client.get(f"{ALL_POSTS}?fields=id,password")
+
+    assert response.status_code == 400
+    assert "password" in response.json()["errors"][0]["detail"]
+
+
+@pytest.mark.django_db
+def test_sparse_and_full_pages_are_cached_apart(api_client):
+    PostFactory()
+
+    assert set(api_client.get(f"{ALL_POSTS}?fields=id").json()["results"][0]) == {"id"}
+    assert "content" in api_client.get(ALL_POSTS).json()["results"][0]
+
+
+@pytest.mark.django_db
+def test_comment_lists_take_fields(client_for):
+    comment = PostCommentFactory()
+    url = reverse("posts:post_comment", kwargs={"post_id": comment.post_id})
+
+    results = client_for(UserFactory()).get(f"{url}?fields=id,comment").json()["results"]
+
+    assert results == [{"id": str(comment.id), "comment": comment.comment}]
+
+
+@pytest.mark.django_db
+def test_drf_serializer_reads_take_fields_and_writes_see_every_field(client_for):
+    post = PostFactory()
+    client = client_for(post.author)
+    url = reverse("posts:update_post", kwargs={"id": post.id})
+
+    assert client.get(f"{url}?fields=id,title").json() == {"id": str(post.id), "title": post.title}
+
+    response = client.patch(f"{url}?fields=id", {"title": "Renamed"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert "content" in response.json()
@@ -0,0 +1,89 @@
+import io
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.accounts.factories import UserFactory
+from blog.accounts.models import ClaimsUser, Follow
+from blog.posts import timeline
+from blog.posts.models import TimelineBackfill, TimelineEntry
+
+User = get_user_model()
+
+
+@pytest.fixture
+def fanout_limit(monkeypatch):
+    monkeypatch.setattr(timeline, "TIMELINE_FANOUT_LIMIT", 2)
+    return 2
+
+
+def publish(client):
+    response = client.post(reverse("posts:create_post"), {
+        "title": "Timeline post", "content": "content", "category": "travel",
+        "post_state": "published",
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def timeline_ids(client):
+    return [post["id"] for post in client.get(reverse("posts:home_timeline")).json()["results"]]
+
+
+@pytest.mark.django_db
+def test_published_posts_are_pushed_to_followers(client_for, fanout_limit):
+    author, follower = UserFactory.create_batch(2)
+    Follow.objects.follow(follower, author)
+
+    post_id = publish(client_for(author))
+
+    assert list(TimelineEntry.objects.values_list("user_id", flat=True)) == [follower.id]
+    assert timeline_ids(client_for(follower)) == [post_id]
+
+
+@pytest.mark.django_db
+def test_push_or_pull_uses_the_current_followers_count(client_for, fanout_limit):
+    author, *followers = UserFactory.create_batch(3)
+    client = client_for(author)
+    # Cache the author's profile while they have no followers yet
+    client.get(reverse("posts:user_posts"))
+    ClaimsUser.get_cached_values(author.pk)
+    for follower in followers:
+        Follow.objects.follow(follower, author)
+    assert User.objects.get(pk=author.pk).followers_count == fanout_limit
+
+    post_id = publish(client)
+
+    # Pulled at read time instead, the stale cached count is not used
+    assert not TimelineEntry.objects.exists()
+    assert timeline_ids(client_for(followers[0])) == [post_id]
+
+
+@pytest.mark.django_db
+def test_unfollow_below_the_limit_queues_the_backfill(client_for, fanout_limit):
+    author, leaving, staying = UserFactory.create_batch(3)
+    for follower in (leaving, staying):
+        Follow.objects.follow(follower, author)
+    post_id = publish(client_for(author))
+    assert not TimelineEntry.objects.exists()
+
+    response = client_for(leaving).delete(
+        reverse("accounts:follow", kwargs={"username": author.username})
+    )
+    assert response.status_code == 204
+
+    # Nothing is copied in the request, the author's posts are still pulled
+    assert TimelineBackfill.objects.filter(author=author).exists()
+    assert not TimelineEntry.objects.exists()
+    assert timeline_ids(client_for(staying)) == [post_id]
+
+    call_command("trim_timelines", stdout=io.StringIO())
+
+    assert not TimelineBackfill.objects.exists()
+    assert list(TimelineEntry.objects.values_list("user_id", "post_id")) == [
+        (staying.id, uuid.UUID(post_id))
+    ]
+    assert timeline_ids(client_for(staying)) == [post_id]
@@ -0,0 +1,193 @@
+"""
+Home timelines, precomputed on write.
+
+Publishing a post pushes it into a TimelineEntry for every follower of its
+author (fan-out on write), so reading a home timeline is a range scan over
+the reader's own entries instead of an ``author__in`` join over everyone
+they follow. Authors with TIMELINE_FANOUT_LIMIT followers or more are not
+pushed: their posts are pulled at read time and merged in, which keeps a
+single publish from writing thousands of rows. An author dropping back
+under the limit is queued as a TimelineBackfill and still pulled until
+``manage.py trim_timelines`` has copied their recent posts, so an unfollow
+never writes a timeline entry per follower. That command also cuts
+timelines back to TIMELINE_MAX_LENGTH entries.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+
+from blog.accounts.models import Follow
+from blog.posts.models import Post, TimelineBackfill, TimelineEntry
+from blog.utils.constants import (
+    TIMELINE_BACKFILL_LENGTH,
+    TIMELINE_FANOUT_LIMIT,
+    TIMELINE_MAX_LENGTH,
+)
+from blog.utils.pagination import keyset_filter
+
+User = get_user_model()
+
+
+def db_value(model, field_name, value):
+    return model._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+
+def pushed_sql(author_id):
+    """
+    ``(sql, params)`` of a condition holding while the author is under the
+    fan-out limit. followers_count is read in the writing statement itself:
+    the one on request.user (a ClaimsUser) comes from the user cache and
+    can be minutes old.
+    """
+    return (
+        f"EXISTS (SELECT 1 FROM {User._meta.db_table} "
+        "WHERE id = %s AND followers_count < %s)",
+        [db_value(User, "id", author_id), TIMELINE_FANOUT_LIMIT],
+    )
+
+
+def fan_out(post):
+    """Push a published post into the timeline of every follower of its author."""
+    if post.post_state != "published":
+        return
+    fan_out_posts([post.id])
+
+
+def fan_out_posts(post_ids):
+    """
+    fan_out() of many posts in one INSERT, e.g. a chunk of imported posts.
+    Posts that aren't published or whose author is pulled are skipped.
+    """
+    if not post_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(post_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TimelineEntry._meta.db_table} "
+            "(user_id, post_id, author_id, post_created_at) "
+            "SELECT follow.follower_id, post.id, post.author_id, post.created_at "
+            f"FROM {Post._meta.db_table} post "
+            f"JOIN {Follow._meta.db_table} follow ON follow.following_id = post.author_id "
+            f"JOIN {User._meta.db_table} author ON author.id = post.author_id "
+            f"WHERE post.id IN ({placeholders}) AND post.post_state = 'published' "
+            # followers_count read here, see pushed_sql()
+            "AND author.followers_count < %s "
+            "ON CONFLICT (user_id, post_id) DO NOTHING",
+            [*(db_value(Post, "id", post_id) for post_id in post_ids), TIMELINE_FANOUT_LIMIT],
+        )
+
+
+def retract(post):
+    """Take a post that is no longer published out of every timeline."""
+    TimelineEntry.objects.filter(post=post).delete()
+
+
+def backfill(author, follower=None):
+    """
+    Copy the latest published posts of ``author`` into the timelines of
+    their followers, or only into ``follower``'s right after a new follow.
+    """
+    params = [
+        db_value(User, "id", author.id),
+        TIMELINE_BACKFILL_LENGTH,
+        db_value(User, "id", author.id),
+    ]
+    only_follower = ""
+    if follower is not None:
+        only_follower = "AND follow.follower_id = %s"
+        params.append(db_value(User, "id", follower.id))
+    pushed, pushed_params = pushed_sql(author.id)
+    params += pushed_params
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TimelineEntry._meta.db_table} "
+            "(user_id, post_id, author_id, post_created_at) "
+            "SELECT follow.follower_id, recent.id, recent.author_id, recent.created_at "
+            f"FROM {Follow._meta.db_table} follow, ("
+            f"    SELECT id, author_id, created_at FROM {Post._meta.db_table} "
+            "    WHERE author_id = %s AND post_state = 'published' "
+            "    ORDER BY created_at DESC, id DESC LIMIT %s"
+            ") recent "
+            f"WHERE follow.following_id = %s {only_follower} AND {pushed} "
+            "ON CONFLICT (user_id, post_id) DO NOTHING",
+            params,
+        )
+
+
+def on_post_state_change(post, was_published):
+    """Fan a post out once it gets published, retract it when it is unpublished."""
+    is_published = post.post_state == "published"
+    if is_published and not was_published:
+        fan_out(post)
+    elif was_published and not is_published:
+        retract(post)
+
+
+def on_follow(follower, author):
+    backfill(author, follower)
+
+
+def on_unfollow(follower, author):
+    TimelineEntry.objects.filter(user=follower, author=author).delete()
+    # The author dropped back under the limit: their posts published while
+    # they were pulled would otherwise vanish from their followers' timelines.
+    # Copying them is up to run_backfills(), they are pulled until then
+    if author.followers_count == TIMELINE_FANOUT_LIMIT - 1:
+        TimelineBackfill.objects.get_or_create(author=author)
+
+
+def run_backfills() -> int:
+    """Backfill every author queued by on_unfollow(), oldest first."""
+    done = 0
+    for pending in TimelineBackfill.objects.select_related("author").order_by("created_at"):
+        with transaction.atomic():
+            backfill(pending.author)
+            pending.delete()
+        done += 1
+    return done
+
+
+def trim(max_length=TIMELINE_MAX_LENGTH) -> int:
+    """Delete all but the newest ``max_length`` entries of every timeline."""
+    table = TimelineEntry._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            "    SELECT id FROM ("
+            "        SELECT id, ROW_NUMBER() OVER ("
+            "            PARTITION BY user_id ORDER BY post_created_at DESC, post_id DESC"
+            "        ) AS position"
+            f"        FROM {table}"
+            "    ) ranked WHERE position > %s"
+            ")",
+            (max_length,),
+        )
+        return cursor.rowcount
+
+
+def home_timeline(user, position, limit) -> list:
+    """
+    Up to ``limit`` posts for ``user``'s home timeline, newest first,
+    following the keyset ``position`` (a ``(created_at, id)`` pair).
+    """
+    pushed = keyset_filter(
+        TimelineEntry.objects.filter(user=user),
+        position,
+        fields=("post_created_at", "post_id"),
+    ).values_list("post_created_at", "post_id")[:limit]
+
+    pulled_authors = Follow.objects.filter(follower=user).filter(
+        Q(following__followers_count__gte=TIMELINE_FANOUT_LIMIT)
+        | Q(following__in=TimelineBackfill.objects.values("author"))
+    ).values("following")
+    pulled = keyset_filter(
+        Post.objects.filter(author__in=pulled_authors, post_state="published"),
+        position,
+    ).values_list("created_at", "id")[:limit]
+
+    # Both sides are sorted on the same key; a post can be in both while
+    # its author crosses the fan-out limit
+    keys = sorted(set(pushed) | set(pulled), reverse=True)[:limit]
+    posts = Post.objects.filter(id__in=[pk for _, pk in keys]).with_feed_data().in_bulk()
+    return [posts[pk] for _, pk in keys if pk in posts]
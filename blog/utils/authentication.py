@@ -0,0 +1,139 @@
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from blog.accounts.models import ClaimsUser
+
+# Profile fields signed into every token issued by refresh_token_for_user()
+USER_CLAIMS = ("username", "first_name", "last_name", "image")
+
+
+def refresh_token_for_user(user) -> RefreshToken:
+    """RefreshToken.for_user() plus USER_CLAIMS, which its access tokens inherit."""
+    refresh = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        refresh[claim] = str(getattr(user, claim) or "")
+    return refresh
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the signed USER_CLAIMS instead of loading
+    the user row on every request. request.user is a ClaimsUser: a real
+    CustomUser whose other fields load lazily, so relations, permissions
+    and writes keep working and only the requests that need more than the
+    claims touch the cache or the database.
+
+    Tokens issued without the claims fall back to the database lookup.
+    Requests with an unsafe method also check, through the user cache,
+    that the user still exists, is active and, with CHECK_REVOKE_TOKEN, has
+    not changed the password since the token was issued. Safe requests
+    trust the claims until the access token expires.
+    """
+
+    def authenticate(self, request):
+        user_auth = super().authenticate(request)
+        if user_auth is not None and request.method not in SAFE_METHODS:
+            self.check_user_state(*user_auth)
+        return user_auth
+
+    def check_user_state(self, user, validated_token):
+        # Users loaded by the fallback went through the same checks already
+        if not isinstance(user, ClaimsUser):
+            return
+
+        try:
+            values = ClaimsUser.get_cached_values(user.pk)
+        except ClaimsUser.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not values["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != values["password_md5"]:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        return self.get_claims_user(validated_token)
+
+    def get_claims_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        values = {
+            api_settings.USER_ID_FIELD: ClaimsUser._meta.get_field(
+                api_settings.USER_ID_FIELD
+            ).to_python(user_id),
+        }
+        for claim in USER_CLAIMS:
+            values[claim] = validated_token[claim]
+        # from_db() wants the loaded values in field order
+        field_names = [
+            field.attname for field in ClaimsUser._meta.concrete_fields
+            if field.attname in values
+        ]
+        return ClaimsUser.from_db(
+            DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+        )
+
+
+class AsyncJWTAuthentication(StatelessJWTAuthentication):
+    """
+    JWTAuthentication for async views: the token is checked exactly like the
+    DRF views do, only the user lookup goes through the async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user = await self.aget_user(validated_token)
+        if request.method not in SAFE_METHODS:
+            await sync_to_async(self.check_user_state)(user, validated_token)
+        return user, validated_token
+
+    async def aget_user(self, validated_token):
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            return self.get_claims_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
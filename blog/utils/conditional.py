@@ -0,0 +1,41 @@
+"""
+Conditional GETs: responses carry validators (ETag, Last-Modified) that
+are cheap to recompute, so a request whose If-None-Match or
+If-Modified-Since still matches is answered 304 Not Modified before any
+row is loaded or serialized.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts) -> str:
+    """
+    Weak ETag over ``parts``: the same data is served as JSON or through
+    the browsable API, equal in meaning rather than byte for byte.
+    """
+    return f'W/"{hashlib.md5(repr(parts).encode()).hexdigest()}"'
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified_response(request, etag=None, last_modified=None):
+    """
+    The 304 (or 412 for a failed If-Match) answering ``request``, or None
+    when it has to be served.
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        return None
+    return set_validators(response, etag, last_modified)
@@ -1 +1,49 @@
-OTP_TIMEOUT = 1800
\ No newline at end of file
+OTP_TIMEOUT = 1800
+
+# Users authenticated from token claims load any other field through this
+# cache, see blog.accounts.models.ClaimsUser
+USER_CACHE_TIMEOUT = 60
+
+# Cached feed responses are invalidated by version bumps, the timeout only
+# bounds how long unreachable entries occupy the cache
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Longest side in pixels of each WebP rendition made for uploaded images
+IMAGE_VARIANTS = {
+    "thumbnail": 320,
+    "medium": 1080,
+}
+IMAGE_VARIANT_QUALITY = 80
+
+# Home timelines: posts are pushed into at most TIMELINE_MAX_LENGTH entries
+# per follower, authors with TIMELINE_FANOUT_LIMIT followers or more are
+# pulled at read time instead. A new follow copies TIMELINE_BACKFILL_LENGTH
+# recent posts of the author.
+TIMELINE_MAX_LENGTH = 800
+TIMELINE_FANOUT_LIMIT = 5000
+TIMELINE_BACKFILL_LENGTH = 100
+
+# Trending: hot score = log10 of net activity + created_at / time scale, so a
+# post needs 10x the activity to outrank one HOT_SCORE_TIME_SCALE seconds
+# newer. A comment counts as HOT_SCORE_COMMENT_WEIGHT upvotes.
+HOT_SCORE_EPOCH = 1704067200  # 2024-01-01 UTC
+HOT_SCORE_TIME_SCALE = 45000
+HOT_SCORE_COMMENT_WEIGHT = 0.5
+
+# Posts store a plain text excerpt of their content, so feeds can list
+# ?fields=...,excerpt without loading the full content
+POST_EXCERPT_LENGTH = 200
+
+# Rows fetched per server-side cursor round trip and written per chunk by
+# the streaming exports, see blog/posts/export.py
+EXPORT_CHUNK_SIZE = 2000
+# Incremental exports re-read the rows modified this many seconds before
+# their since, which a transaction committing late could otherwise skip.
+# Longer than any write transaction should run.
+EXPORT_SINCE_OVERLAP = 5 * 60
+
+# Bulk imports validate and write this many posts (with their comments and
+# reactions) per transaction, see blog/posts/importer.py. The API reports
+# at most IMPORT_MAX_REPORTED_ERRORS invalid records in full.
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_REPORTED_ERRORS = 1000
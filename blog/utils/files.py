@@ -0,0 +1,28 @@
+from django.db import transaction
+
+
+def bulk_create_with_files(model, instances: list, file_field: str) -> list:
+    """
+    Store the uploaded file of every instance, then insert all rows with a
+    single bulk_create.
+
+    Files are written before the rows, and storage is not transactional:
+    when this or the caller's transaction rolls back (later in the same
+    request, too) the stored files stay. For the content-addressed image
+    fields (blog.media.storage) collect_media_garbage sweeps them once the
+    grace period is over; other storages keep them.
+    """
+    storage = model._meta.get_field(file_field).storage
+    for instance in instances:
+        field_file = getattr(instance, file_field)
+        if field_file and not field_file._committed:
+            field_file.save(field_file.name, field_file.file, save=False)
+
+    with transaction.atomic():
+        created = model.objects.bulk_create(instances)
+        # bulk_create sends no post_save, see blog/media/signals.py
+        if hasattr(storage, "add_references"):
+            storage.add_references(
+                [getattr(instance, file_field).name for instance in created]
+            )
+        return created
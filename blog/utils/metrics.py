@@ -0,0 +1,302 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware measures every request: wall time, database queries
+and their time, cache hits and misses, time spent rendering the response
+body (blog.utils.renderers.TimedJSONRenderer) and the response size. The numbers are added up per endpoint (the URL name, so
+unmatched paths share one series) and served in the Prometheus text format
+by ``metrics_view``, sent back in a ``Server-Timing`` header when
+SERVER_TIMING is on, and requests slower than SLOW_REQUEST_THRESHOLD_MS log
+their query trace to the ``blog.performance`` logger.
+
+The totals live in the memory of each worker process, so every worker is
+its own Prometheus target.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger("blog.performance")
+
+# Upper bounds in seconds of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_current_request = ContextVar("request_metrics", default=None)
+_install_lock = threading.Lock()
+_installed = False
+
+
+class RequestMetrics:
+    """What a single request spent, filled in while it runs."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = []
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_time = 0.0
+        self.rendering = False
+
+    def server_timing(self, duration) -> str:
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{len(self.queries)} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f"render;dur={self.render_time * 1000:.1f}",
+            f"total;dur={duration * 1000:.1f}",
+        ])
+
+
+class EndpointMetrics:
+    """Running totals of every request to one endpoint and method."""
+
+    def __init__(self):
+        self.requests = 0
+        self.duration = 0.0
+        self.duration_buckets = [0] * len(DURATION_BUCKETS)
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_time = 0.0
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def observe(self, view, method, status, duration, metrics, response_bytes):
+        with self.lock:
+            endpoint = self.endpoints.setdefault((view, method), EndpointMetrics())
+            endpoint.requests += 1
+            endpoint.duration += duration
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    endpoint.duration_buckets[i] += 1
+            endpoint.queries += len(metrics.queries)
+            endpoint.db_time += metrics.db_time
+            endpoint.cache_hits += metrics.cache_hits
+            endpoint.cache_misses += metrics.cache_misses
+            endpoint.render_time += metrics.render_time
+            endpoint.response_bytes += response_bytes
+            endpoint.statuses[status] = endpoint.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        """All totals in the Prometheus text exposition format."""
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+            lines = [
+                "# HELP blog_http_requests_total Requests handled.",
+                "# TYPE blog_http_requests_total counter",
+            ]
+            for (view, method), endpoint in endpoints:
+                for status, count in sorted(endpoint.statuses.items()):
+                    labels = format_labels(view=view, method=method, status=status)
+                    lines.append(f"blog_http_requests_total{{{labels}}} {count}")
+
+            lines += [
+                "# HELP blog_http_request_duration_seconds Wall time of a request.",
+                "# TYPE blog_http_request_duration_seconds histogram",
+            ]
+            for (view, method), endpoint in endpoints:
+                for bound, count in zip(DURATION_BUCKETS, endpoint.duration_buckets):
+                    labels = format_labels(view=view, method=method, le=bound)
+                    lines.append(f"blog_http_request_duration_seconds_bucket{{{labels}}} {count}")
+                labels = format_labels(view=view, method=method, le="+Inf")
+                lines.append(
+                    f"blog_http_request_duration_seconds_bucket{{{labels}}} {endpoint.requests}"
+                )
+                labels = format_labels(view=view, method=method)
+                lines.append(f"blog_http_request_duration_seconds_sum{{{labels}}} {endpoint.duration}")
+                lines.append(f"blog_http_request_duration_seconds_count{{{labels}}} {endpoint.requests}")
+
+            for name, attr, help_text in (
+                ("blog_db_queries_total", "queries", "Database queries run."),
+                ("blog_db_query_duration_seconds_total", "db_time", "Time spent in database queries."),
+                ("blog_cache_hits_total", "cache_hits", "Cache lookups that found a value."),
+                ("blog_cache_misses_total", "cache_misses", "Cache lookups that found nothing."),
+                ("blog_render_duration_seconds_total", "render_time", "Time spent rendering response bodies."),
+                ("blog_http_response_size_bytes_total", "response_bytes", "Response body bytes sent."),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (view, method), endpoint in endpoints:
+                    labels = format_labels(view=view, method=method)
+                    lines.append(f"{name}{{{labels}}} {getattr(endpoint, attr)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def format_labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def record_cache_lookup(hit: bool):
+    """Count a cache lookup towards the current request, if there is one."""
+    metrics = _current_request.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper timing every query of the current request."""
+    metrics = _current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.queries.append((sql, elapsed))
+        metrics.db_time += elapsed
+
+
+def add_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def record_render():
+    """
+    Add the time spent in the block to the render time of the current
+    request. Nested blocks run inside the outermost one and aren't counted
+    again.
+    """
+    metrics = _current_request.get()
+    if metrics is None or metrics.rendering:
+        yield
+        return
+
+    metrics.rendering = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.rendering = False
+        metrics.render_time += time.perf_counter() - start
+
+
+def install():
+    """Hook the query recorder into every database connection, once per process."""
+    global _installed
+
+    with _install_lock:
+        if _installed:
+            return
+        # Connections are per thread, every new one gets the recorder
+        connection_created.connect(add_query_recorder)
+        for connection in connections.all(initialized_only=True):
+            add_query_recorder(connection)
+        _installed = True
+
+
+class PerformanceMiddleware:
+    """
+    Record RequestMetrics for every request into the registry. Works under
+    WSGI and ASGI; the async ORM and sync_to_async run in a copy of the
+    request's context, so their queries are counted too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = _current_request.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_request.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        # Streaming responses are timed up to their first byte
+        duration = time.perf_counter() - metrics.start
+        view = request.resolver_match.view_name if request.resolver_match else "unmatched"
+        response_bytes = 0 if response.streaming else len(response.content)
+        registry.observe(
+            view, request.method, response.status_code, duration, metrics, response_bytes
+        )
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing(duration)
+
+        if duration * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            self.log_slow_request(request, view, duration, metrics)
+        return response
+
+    def log_slow_request(self, request, view, duration, metrics):
+        trace = "".join(
+            f"\n  {elapsed * 1000:8.2f} ms  {sql}" for sql, elapsed in metrics.queries
+        )
+        logger.warning(
+            "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms, "
+            "rendering %.1f ms%s",
+            request.method,
+            request.get_full_path(),
+            view,
+            duration * 1000,
+            len(metrics.queries),
+            metrics.db_time * 1000,
+            metrics.render_time * 1000,
+            trace,
+        )
+
+
+def metrics_view(request):
+    """
+    The registry in the Prometheus text format, for requests sending
+    METRICS_TOKEN and for staff sessions. Without METRICS_TOKEN only staff
+    get in.
+    """
+    token = settings.METRICS_TOKEN
+    has_token = bool(token) and constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    )
+    if not has_token and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,167 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_filter(queryset, position, fields=("created_at", "id"), newest_first=True):
+    """
+    Order ``queryset`` on the two keyset ``fields`` and keep only the rows
+    after ``position``, a ``(value, pk)`` pair taken from the last row seen.
+    """
+    value_field, pk_field = fields
+    if newest_first:
+        queryset = queryset.order_by(f"-{value_field}", f"-{pk_field}")
+    else:
+        queryset = queryset.order_by(value_field, pk_field)
+
+    if position is None:
+        return queryset
+
+    value, pk = position
+    lookup = "lt" if newest_first else "gt"
+    return queryset.filter(
+        Q(**{f"{value_field}__{lookup}": value})
+        | Q(**{value_field: value, f"{pk_field}__{lookup}": pk})
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over BaseModel's ``(created_at, id)``.
+
+    Each page is a range scan that starts right after the last row of the
+    previous page, so there is no COUNT(*) and no OFFSET: page 10,000 costs
+    the same as page one.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    newest_first = True
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        The unevaluated queryset for the requested page, evaluate it (sync or
+        async) and hand the rows to set_page().
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = keyset_filter(
+            queryset, self.decode_cursor(request), newest_first=self.newest_first
+        )
+        # Fetch one extra row to know whether there is a next page
+        return queryset[:self.page_size + 1]
+
+    def paginate_with(self, get_rows, request):
+        """
+        paginate_queryset() for pages that are not a single queryset:
+        ``get_rows(position, limit)`` returns up to ``limit`` instances
+        following the cursor position (None on the first page).
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        return self.set_page(get_rows(self.decode_cursor(request), self.page_size + 1))
+
+    def set_page(self, results):
+        self.page = results[:self.page_size]
+        self.has_next = len(results) > self.page_size
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "first": self.get_first_link(),
+            "results": data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "first": {
+                    "type": "string",
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results to return per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def encode_cursor(self, instance):
+        raw = f"{instance.created_at.isoformat()}|{instance.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            created_at, pk = raw.split("|")
+            return datetime.fromisoformat(created_at), uuid.UUID(pk)
+        except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class OldestFirstKeysetPagination(KeysetPagination):
+    newest_first = False
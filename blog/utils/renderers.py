@@ -0,0 +1,56 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+from blog.utils.metrics import record_render
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that counts its time towards the request's metrics."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with record_render():
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONRenderer(TimedJSONRenderer):
+    """
+    JSONRenderer with the same output byte for byte, encoded by orjson when
+    it is installed. Anything orjson can't reproduce exactly (indented or
+    ASCII-only output, integers beyond 64 bits) falls back to JSONRenderer.
+
+    orjson writes floats outside 1e-4..1e16 in a shorter exponent form than
+    ``json``, so only use it for payloads without floats, like the feeds.
+    """
+    options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if orjson is not None else 0
+    )
+    # datetimes, Decimals, lazy strings... are encoded like JSONRenderer does
+    default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with record_render():
+            return self.render_fast(data, accepted_media_type, renderer_context)
+
+    def render_fast(self, data, accepted_media_type, renderer_context):
+        if (
+            data is None
+            or orjson is None
+            or not api_settings.UNICODE_JSON
+            or not api_settings.COMPACT_JSON
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, these break JavaScript string literals
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,53 @@
+"""
+Sparse fieldsets: ``?fields=id,title`` keeps only those fields of every
+result, ``?exclude=content`` drops fields. Both name top-level fields and
+can be combined, the output keeps the serializer's field order.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_names(value) -> list:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def requested_fields(request, available):
+    """
+    The names of ``available`` picked by the request's ``fields`` and
+    ``exclude`` query parameters, or None when it asks for every field.
+    """
+    fields = parse_field_names(request.query_params.get("fields", ""))
+    exclude = parse_field_names(request.query_params.get("exclude", ""))
+    if not fields and not exclude:
+        return None
+
+    unknown = [name for name in fields + exclude if name not in available]
+    if unknown:
+        raise ValidationError({
+            "fields": f"Unknown field(s): {', '.join(unknown)}. "
+                      f"Available: {', '.join(available)}."
+        })
+
+    return [
+        name for name in available
+        if (not fields or name in fields) and name not in exclude
+    ]
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin dropping the fields a read request leaves out with
+    ``?fields=`` or ``?exclude=``. Writes always see every field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        readable = [name for name, field in self.fields.items() if not field.write_only]
+        keep = requested_fields(request, readable)
+        if keep is not None:
+            for name in set(readable) - set(keep):
+                self.fields.pop(name)
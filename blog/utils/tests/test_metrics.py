@@ -0,0 +1,44 @@
+import pytest
+from django.urls import reverse
+from rest_framework.serializers import BaseSerializer
+
+from blog.accounts.factories import UserFactory
+from blog.posts.factories import PostFactory
+from blog.utils.metrics import registry
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("token", [None, ""])
+def test_metrics_are_closed_without_a_token(settings, client, token):
+    settings.METRICS_TOKEN = token
+
+    assert client.get(reverse("metrics")).status_code == 403
+    client.force_login(UserFactory())
+    assert client.get(reverse("metrics")).status_code == 403
+
+
+@pytest.mark.django_db
+def test_metrics_for_the_token_and_staff(settings, client):
+    settings.METRICS_TOKEN = "scraper-token"
+
+    assert client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code == 403
+    response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scraper-token")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    client.force_login(UserFactory(is_staff=True))
+    assert client.get(reverse("metrics")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_render_time_is_recorded(settings, api_client):
+    settings.SERVER_TIMING = True
+    PostFactory.create_batch(2)
+
+    response = api_client.get(reverse("posts:all_posts"))
+
+    assert "render;dur=" in response["Server-Timing"]
+    endpoint = registry.endpoints[("posts:all_posts", "GET")]
+    assert endpoint.render_time > 0
+    # Serializers are left alone, the renderers do the timing
+    assert BaseSerializer.data.fget.__module__ == "rest_framework.serializers"
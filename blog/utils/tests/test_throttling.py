@@ -0,0 +1,184 @@
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+
+from blog.accounts.factories import UserFactory
+from blog.utils import throttling
+from blog.utils.throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
+
+
+class View:
+    throttle_scope = "test"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A frozen time.time() for the throttles, move it with clock.now += seconds."""
+    class Clock:
+        now = 1_000_000.0
+    monkeypatch.setattr(throttling.time, "time", lambda: Clock.now)
+    return Clock
+
+
+@pytest.fixture(autouse=True)
+def buckets(settings):
+    settings.THROTTLE_BUCKETS = {"test": {"rate": "6/minute", "burst": 3}}
+
+
+def request(method="post", user=None, ip="10.0.0.1", **headers):
+    request = getattr(APIRequestFactory(), method)("/", REMOTE_ADDR=ip, **headers)
+    request.user = user or AnonymousUser()
+    return request
+
+
+def allowed(throttle_class, request):
+    return throttle_class().allow_request(request, View())
+
+
+def test_burst_then_refill_rate(clock):
+    results = [allowed(IPTokenBucketThrottle, request()) for _ in range(4)]
+    assert results == [True, True, True, False]
+
+    throttle = IPTokenBucketThrottle()
+    assert not throttle.allow_request(request(), View())
+    assert throttle.wait() == pytest.approx(10)
+
+    # One token every 10 seconds
+    clock.now += 10
+    assert allowed(IPTokenBucketThrottle, request())
+    assert not allowed(IPTokenBucketThrottle, request())
+
+    # A full bucket after an idle period, never more than the burst
+    clock.now += 3600
+    results = [allowed(IPTokenBucketThrottle, request()) for _ in range(4)]
+    assert results == [True, True, True, False]
+
+
+def test_safe_methods_and_views_without_scope_are_not_throttled(clock):
+    for _ in range(5):
+        assert allowed(IPTokenBucketThrottle, request("get"))
+        assert IPTokenBucketThrottle().allow_request(request(), object())
+
+
+def test_buckets_are_per_client(clock):
+    for _ in range(3):
+        assert allowed(IPTokenBucketThrottle, request(ip="10.0.0.1"))
+    assert not allowed(IPTokenBucketThrottle, request(ip="10.0.0.1"))
+    assert allowed(IPTokenBucketThrottle, request(ip="10.0.0.2"))
+
+
+@pytest.mark.django_db
+def test_user_buckets_follow_the_user_across_ips(clock):
+    user = UserFactory()
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        assert allowed(UserTokenBucketThrottle, request(user=user, ip=ip))
+    assert not allowed(UserTokenBucketThrottle, request(user=user, ip="10.0.0.4"))
+    # Anonymous requests from the same IPs have their own buckets
+    assert allowed(UserTokenBucketThrottle, request(ip="10.0.0.1"))
+
+
+def test_falls_back_to_process_memory_without_the_cache(clock, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("cache is down")
+    for method in ("get", "set", "add", "delete"):
+        monkeypatch.setattr(cache, method, unreachable)
+    monkeypatch.setattr(throttling, "_local_buckets", {})
+
+    results = [allowed(IPTokenBucketThrottle, request()) for _ in range(4)]
+    assert results == [True, True, True, False]
+
+
+def test_parallel_requests_share_one_burst(clock, monkeypatch):
+    # Every thread has its own cache backend instance, patch them all
+    backend_class = type(caches["default"])
+    get = backend_class.get
+
+    def slow_get(*args, **kwargs):
+        # A network round trip, long enough for the threads to interleave
+        value = get(*args, **kwargs)
+        time.sleep(0.005)
+        return value
+    monkeypatch.setattr(backend_class, "get", slow_get)
+    barrier = threading.Barrier(20)
+    results = []
+
+    def send():
+        barrier.wait()
+        results.append(allowed(IPTokenBucketThrottle, request()))
+
+    threads = [threading.Thread(target=send) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 3
+
+
+def test_ip_ignores_client_sent_forwarded_for(clock):
+    results = [
+        allowed(IPTokenBucketThrottle, request(HTTP_X_FORWARDED_FOR=f"203.0.113.{i}"))
+        for i in range(4)
+    ]
+    assert results == [True, True, True, False]
+
+
+def test_trusted_proxies_forward_the_client_ip(settings, clock):
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+    for i in range(3):
+        assert allowed(IPTokenBucketThrottle, request(HTTP_X_FORWARDED_FOR="203.0.113.1"))
+    assert not allowed(IPTokenBucketThrottle, request(HTTP_X_FORWARDED_FOR="203.0.113.1"))
+    assert allowed(IPTokenBucketThrottle, request(HTTP_X_FORWARDED_FOR="203.0.113.2"))
+
+
+@pytest.mark.django_db
+def test_sign_in_returns_429_after_the_burst(settings, api_client, clock):
+    settings.THROTTLE_BUCKETS = {"sign_in": {"rate": "10/minute", "burst": 2}}
+    data = {"email_or_username": "nobody", "password": "wrong"}
+
+    statuses = [
+        api_client.post(reverse("accounts:sign_in"), data, format="json").status_code
+        for _ in range(3)
+    ]
+
+    assert 429 not in statuses[:2]
+    assert statuses[2] == 429
+
+
+@pytest.mark.django_db
+def test_sign_in_is_throttled_per_ip_whatever_forwarded_for_says(settings, api_client, clock):
+    settings.THROTTLE_BUCKETS = {"sign_in": {"rate": "10/minute", "burst": 2}}
+
+    statuses = [
+        api_client.post(
+            reverse("accounts:sign_in"),
+            {"email_or_username": f"user{i}", "password": "wrong"},
+            format="json",
+            HTTP_X_FORWARDED_FOR=f"203.0.113.{i}",
+        ).status_code
+        for i in range(3)
+    ]
+
+    assert statuses == [400, 400, 429]
+
+
+@pytest.mark.django_db
+def test_sign_in_is_throttled_per_account_across_ips(settings, api_client, clock):
+    settings.THROTTLE_BUCKETS = {"sign_in": {"rate": "10/minute", "burst": 2}}
+
+    statuses = [
+        api_client.post(
+            reverse("accounts:sign_in"),
+            {"email_or_username": "Victim" if i % 2 else "victim", "password": "wrong"},
+            format="json",
+            REMOTE_ADDR=f"198.51.100.{i}",
+        ).status_code
+        for i in range(3)
+    ]
+
+    assert statuses == [400, 400, 429]
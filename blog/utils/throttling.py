@@ -0,0 +1,180 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+# Used while the shared cache is unreachable, limits are then per process
+_local_buckets = {}
+_local_lock = threading.Lock()
+
+# Caches other than Redis update a bucket under a lock taken with
+# cache.add(). How long a lock is held at most, and waited for at most
+# before the request is throttled
+BUCKET_LOCK_TIMEOUT = 1
+BUCKET_LOCK_WAIT = 0.05
+
+# Takes one token from the bucket in KEYS[1] in a single atomic step.
+# ARGV: now, interval, capacity (seconds). Returns the seconds to wait as
+# a string, "0" when the token was taken
+TAKE_TOKEN_SCRIPT = """
+local now = tonumber(ARGV[1])
+local full_at = math.max(tonumber(redis.call("GET", KEYS[1]) or ARGV[1]), now) + tonumber(ARGV[2])
+local allowed_at = full_at - tonumber(ARGV[3])
+if now < allowed_at then
+    return tostring(allowed_at - now)
+end
+redis.call("SET", KEYS[1], tostring(full_at), "PX", math.ceil(tonumber(ARGV[3]) * 1000) + 1000)
+return "0"
+"""
+
+
+class BucketBusy(Exception):
+    pass
+
+
+def unthrottled_buckets() -> dict:
+    """THROTTLE_BUCKETS no benchmark runs into, for override_settings()."""
+    return {
+        scope: {"rate": "1000000/s", "burst": 1000000} for scope in settings.THROTTLE_BUCKETS
+    }
+
+
+def parse_rate(rate: str):
+    """``"10/minute"`` -> ``(10, 60)``, like DRF's SimpleRateThrottle."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+def take_token(full_at, now, interval, capacity):
+    """
+    GCRA step over the time ``full_at`` a bucket is full again (None for
+    an unknown bucket): ``(new full_at, 0)`` when a token was taken,
+    ``(full_at, seconds to wait)`` when the bucket is empty.
+    """
+    new_full_at = max(full_at or now, now) + interval
+    allowed_at = new_full_at - capacity
+    if now < allowed_at:
+        return full_at, allowed_at - now
+    return new_full_at, 0
+
+
+@contextmanager
+def bucket_lock(key):
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + BUCKET_LOCK_WAIT
+    while not cache.add(lock_key, 1, timeout=BUCKET_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            raise BucketBusy(key)
+        time.sleep(0.001)
+    try:
+        yield
+    finally:
+        cache.delete(lock_key)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client and view scope, configured in THROTTLE_BUCKETS:
+    ``{"rate": "10/minute", "burst": 20}`` refills 10 tokens a minute into
+    a bucket that holds at most 20, each write takes one.
+
+    Implemented as GCRA, the equivalent of a token bucket that only stores
+    the time the bucket will be full again. State lives in the shared cache
+    so every worker enforces the same budget, and is read and written in
+    one atomic step: a Lua script on Redis, a cache.add() lock on other
+    caches. When the cache is down the buckets fall back to process memory
+    instead of letting everything in. Safe methods are never throttled.
+    """
+    scope_attr = "throttle_scope"
+
+    def get_ident_key(self, request):
+        raise NotImplementedError("TokenBucketThrottle requires get_ident_key()")
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+
+        scope = getattr(view, self.scope_attr, None)
+        if scope is None:
+            return True
+
+        bucket = settings.THROTTLE_BUCKETS[scope]
+        num, period = parse_rate(bucket["rate"])
+        interval = period / num
+        capacity = interval * bucket.get("burst", num)
+        key = f"throttle:{scope}:{self.get_ident_key(request)}"
+
+        self.wait_seconds = self.take(key, time.time(), interval, capacity)
+        return self.wait_seconds == 0
+
+    def take(self, key, now, interval, capacity):
+        """Take a token from bucket ``key``, returns the seconds to wait or 0."""
+        backend = caches[DEFAULT_CACHE_ALIAS]
+        try:
+            if isinstance(backend, RedisCache):
+                return self.take_from_redis(backend, key, now, interval, capacity)
+            with bucket_lock(key):
+                full_at, wait = take_token(cache.get(key), now, interval, capacity)
+                if not wait:
+                    cache.set(key, full_at, timeout=int(capacity) + 1)
+                return wait
+        except BucketBusy:
+            # Another request holds the bucket far longer than an update takes
+            return interval
+        except Exception:
+            with _local_lock:
+                full_at, wait = take_token(_local_buckets.get(key), now, interval, capacity)
+                _local_buckets[key] = full_at
+                return wait
+
+    def take_from_redis(self, backend, key, now, interval, capacity):
+        key = backend.make_and_validate_key(key)
+        client = backend._cache.get_client(key, write=True)
+        return float(client.eval(TAKE_TOKEN_SCRIPT, 1, key, now, interval, capacity))
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Buckets per client IP, for the endpoints that run before sign-in. The
+    IP is REMOTE_ADDR unless REST_FRAMEWORK's NUM_PROXIES says how many
+    X-Forwarded-For entries trusted proxies added.
+    """
+
+    def get_ident_key(self, request):
+        return f"ip:{self.get_ident(request)}"
+
+
+class AccountTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Buckets per account a sign-in names in ``email_or_username``, whatever
+    IP the attempts come from. Used next to IPTokenBucketThrottle.
+    """
+    account_field = "email_or_username"
+
+    def get_ident_key(self, request):
+        data = request.data
+        account = data.get(self.account_field) if hasattr(data, "get") else None
+        if not isinstance(account, str):
+            return f"ip:{self.get_ident(request)}"
+        digest = hashlib.md5(account.strip().lower().encode()).hexdigest()
+        return f"account:{digest}"
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Buckets per signed in user, per client IP for anonymous requests."""
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.utils.metrics.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,6 +96,35 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# New passwords are hashed with PASSWORD_HASHER, the others only verify old
+# hashes, which are upgraded on the next sign-in. Compare options and costs
+# with `manage.py benchmark_password_hashers`.
+
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "argon2")
+PASSWORD_HASHER_CLASSES = {
+    "argon2": "blog.accounts.hashers.Argon2PasswordHasher",
+    "scrypt": "blog.accounts.hashers.ScryptPasswordHasher",
+    "pbkdf2_sha256": "blog.accounts.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+PASSWORD_HASHER_COSTS = {
+    "argon2": {
+        "time_cost": int(os.environ.get("ARGON2_TIME_COST", 2)),
+        "memory_cost": int(os.environ.get("ARGON2_MEMORY_COST", 19456)),
+        "parallelism": int(os.environ.get("ARGON2_PARALLELISM", 1)),
+    },
+    "scrypt": {
+        "work_factor": int(os.environ.get("SCRYPT_WORK_FACTOR", 2 ** 14)),
+    },
+    "pbkdf2_sha256": {
+        "iterations": int(os.environ.get("PBKDF2_ITERATIONS", 720000)),
+    },
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -113,6 +144,51 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Shared by every worker process: Redis when REDIS_URL is set, otherwise a
+# file-based cache as the local stand-in.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / ".django_cache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# Throttling
+# Token buckets per view `throttle_scope`, see blog.utils.throttling. `rate`
+# is the sustained refill, `burst` how many writes may arrive at once.
+# sign_in keeps one bucket per client IP and one per account tried.
+
+THROTTLE_BUCKETS = {
+    "sign_in": {"rate": "10/minute", "burst": 5},
+    "sign_up": {"rate": "5/hour", "burst": 3},
+    "comment": {"rate": "30/minute", "burst": 10},
+    "reaction": {"rate": "60/minute", "burst": 20},
+}
+
+
+# Performance instrumentation
+# blog.utils.metrics.PerformanceMiddleware totals per endpoint for the
+# Prometheus endpoint at /metrics/, which only answers `Authorization: Bearer
+# <METRICS_TOKEN>` requests and staff sessions; leave METRICS_TOKEN unset to
+# keep scrapers out. Server-Timing headers expose query counts and are off
+# outside DEBUG unless SERVER_TIMING is set.
+
+SERVER_TIMING = DEBUG or bool(os.environ.get("SERVER_TIMING"))
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get("SLOW_REQUEST_THRESHOLD_MS", 500))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
@@ -13,13 +13,18 @@ THIRD_PARTY_APPS = [
 LOCAL_APPS = [
     "blog.accounts",
     "blog.posts",
+    "blog.media",
 ]
 
 INSTALLED_APPS += THIRD_PARTY_APPS + LOCAL_APPS
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "blog.utils.authentication.StatelessJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "blog.utils.renderers.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -28,6 +33,10 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 2, 
+    # X-Forwarded-For entries added by trusted proxies in front of the app.
+    # 0 keys throttles on REMOTE_ADDR: without it DRF would trust whatever
+    # X-Forwarded-For the client sends
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
 
 # DATABASES = {
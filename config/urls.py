@@ -14,14 +14,30 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import os
+
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from blog.media.storage import content_addressed_storage
+from blog.media.views import serve_immutable
+from blog.utils.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/accounts/', include('blog.accounts.api.v1.urls'), name='accounts'),
-    path('api/v1/posts/', include('blog.posts.api.v1.urls'), name='posts')
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('api/v1/posts/', include('blog.posts.api.v1.urls'), name='posts'),
+    path('metrics/', metrics_view, name='metrics'),
+]
+
+if settings.DEBUG:
+    urlpatterns += [
+        path(
+            f"{settings.MEDIA_URL.lstrip('/')}{content_addressed_storage.prefix}/<path:path>",
+            serve_immutable,
+            {'document_root': os.path.join(settings.MEDIA_ROOT, content_addressed_storage.prefix)},
+        ),
+    ]
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
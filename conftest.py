@@ -0,0 +1,37 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from blog.utils.authentication import refresh_token_for_user
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """An empty in-memory cache per test instead of the shared file cache."""
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    return settings.MEDIA_ROOT
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def client_for():
+    """``client_for(user)``: an APIClient sending ``user``'s access token."""
+    def make_client(user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {refresh_token_for_user(user).access_token}"
+        )
+        return client
+    return make_client